@@ -1,36 +1,380 @@
 import os
 import logging
 import json
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 import numpy
 import pandas as pd
-from azureml.ai.monitoring import Collector
 import joblib
 
+try:
+    # orjson parses the request body several times faster than the standard library.
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+# Fixed request schema: every row carries this many numeric features, in training order.
+FEATURE_COUNT = 10
+# Collected frames keep the positional column names the collectors have always received.
+INPUT_COLUMNS = pd.RangeIndex(FEATURE_COUNT)
+# JSON numbers parse to exactly these types; bool, None and str are not features.
+_NUMBER_TYPES = (int, float)
+
+# Share of requests whose inputs and outputs are collected, and how many may wait for the collector.
+SAMPLING_RATE_VARIABLE = "DATA_COLLECTION_SAMPLING_RATE"
+MAX_QUEUED_VARIABLE = "DATA_COLLECTION_MAX_QUEUED"
+
+# Micro-batching of concurrent requests; a maximum of 0 rows keeps one predict call per request.
+BATCH_MAX_ROWS_VARIABLE = "BATCH_MAX_ROWS"
+BATCH_MAX_WAIT_MS_VARIABLE = "BATCH_MAX_WAIT_MS"
+
+# Opt-in cache of per-row predictions; a size of 0 disables it and a TTL of 0 never expires entries.
+CACHE_SIZE_VARIABLE = "PREDICTION_CACHE_SIZE"
+CACHE_TTL_SECONDS_VARIABLE = "PREDICTION_CACHE_TTL_SECONDS"
+CACHE_LOG_INTERVAL_SECONDS_VARIABLE = "PREDICTION_CACHE_LOG_INTERVAL_SECONDS"
+
+
+class BackgroundCollector:
+    """
+    Collects request inputs and outputs on a worker thread so scoring never waits for the monitoring sink.
+    At most max_queued requests wait; when the queue is full the oldest one is dropped. Only a
+    sampling_rate share of requests is queued at all.
+    """
+
+    def __init__(self, inputs_collector, outputs_collector, max_queued=1000, sampling_rate=1.0):
+        self.inputs_collector = inputs_collector
+        self.outputs_collector = outputs_collector
+        self.sampling_rate = sampling_rate
+        self._queue = deque(maxlen=max_queued)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._busy = False
+        self.counters = {"queued": 0, "sampled_out": 0, "dropped": 0, "collected": 0, "failed": 0}
+        self._worker = threading.Thread(target=self._work, name="data-collection", daemon=True)
+        self._worker.start()
+
+    def submit(self, data_array, result):
+        """Queue one request for collection; returns False when it was sampled out."""
+        sampled_out = self.sampling_rate < 1.0 and random.random() >= self.sampling_rate
+        with self._condition:
+            if sampled_out:
+                self.counters["sampled_out"] += 1
+                return False
+            if len(self._queue) == self._queue.maxlen:
+                self.counters["dropped"] += 1
+                if self.counters["dropped"] % 1000 == 1:
+                    logging.warning("Data collection queue full; dropped %d requests so far", self.counters["dropped"])
+            self._queue.append((data_array, result))
+            self.counters["queued"] += 1
+            self._condition.notify()
+        return True
+
+    def stats(self):
+        """Counters since start plus the number of requests still waiting."""
+        with self._condition:
+            return dict(self.counters, pending=len(self._queue))
+
+    def _work(self):
+        outcome = None
+        while True:
+            with self._condition:
+                if outcome:
+                    self.counters[outcome] += 1
+                self._busy = False
+                self._condition.notify_all()
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                data_array, result = self._queue.popleft()
+                self._busy = True
+            try:
+                # Collect input data and get correlation context to link inputs and outputs
+                context = self.inputs_collector.collect(input_frame(data_array))
+                self.outputs_collector.collect(output_frame(result), context)
+                outcome = "collected"
+            except Exception:
+                outcome = "failed"
+                logging.exception("Data collection failed")
+
+    def flush(self, timeout=None):
+        """Wait until every queued request has been collected."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        """Collect what is still queued, then stop the worker."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        logging.info("Data collection counters: %s", self.stats())
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one model.predict call and hands every caller its own rows back.
+    Requests arriving while a batch is being predicted form the next batch. With max_wait_ms > 0 a batch
+    also waits that long after its first request for more rows, up to max_batch_rows, which raises
+    throughput under heavy load at the cost of latency when traffic is light. Batching only pays off
+    when the server calls run() from several threads at once.
+    """
+
+    def __init__(self, predict, max_batch_rows=256, max_wait_ms=0.0):
+        self._predict = predict
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = deque()
+        self._pending_rows = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.counters = {"requests": 0, "batches": 0, "rows": 0}
+        self._worker = threading.Thread(target=self._work, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def predict(self, data_array):
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((data_array, future))
+            self._pending_rows += len(data_array)
+            self._condition.notify()
+        return future.result()
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+            deadline = time.monotonic() + self.max_wait
+            while self._pending_rows < self.max_batch_rows and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch, rows = [], 0
+            while self._pending and (not batch or rows + len(self._pending[0][0]) <= self.max_batch_rows):
+                data_array, future = self._pending.popleft()
+                batch.append((data_array, future))
+                rows += len(data_array)
+            self._pending_rows -= rows
+            self.counters["requests"] += len(batch)
+            self.counters["batches"] += 1
+            self.counters["rows"] += rows
+            return batch
+
+    def _work(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                results = self._predict(numpy.concatenate([data_array for data_array, _ in batch]))
+            except Exception:
+                # Predict the requests one by one so a single bad request fails alone.
+                for data_array, future in batch:
+                    try:
+                        future.set_result(self._predict(data_array))
+                    except Exception as exc:
+                        future.set_exception(exc)
+                continue
+            offset = 0
+            for data_array, future in batch:
+                future.set_result(results[offset:offset + len(data_array)])
+                offset += len(data_array)
+
+    def stats(self):
+        with self._condition:
+            return dict(self.counters)
+
+    def close(self, timeout=None):
+        """Finish the queued requests, then stop the worker."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+
+
+class PredictionCache:
+    """
+    LRU cache of predictions keyed on the normalised feature row, with an optional time to live.
+    Hit and miss counts are logged at most every log_interval seconds.
+    """
+
+    def __init__(self, max_entries, ttl_seconds=0.0, log_interval_seconds=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.log_interval = log_interval_seconds
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self._last_log = clock()
+
+    @staticmethod
+    def keys(data_array):
+        # Requests are already parsed to float32 against the fixed schema, so the raw bytes of a row
+        # are an exact key; adding 0.0 folds -0.0 into 0.0.
+        normalised = numpy.ascontiguousarray(data_array + numpy.float32(0.0))
+        return [row.tobytes() for row in normalised]
+
+    def get_many(self, keys):
+        """Return the cached prediction for every key, or None where there is none."""
+        now = self.clock()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl and entry[1] <= now:
+                    del self._entries[key]
+                    self.counters["expired"] += 1
+                    entry = None
+                if entry is None:
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[0])
+            hits = sum(value is not None for value in values)
+            self.counters["hits"] += hits
+            self.counters["misses"] += len(values) - hits
+            if now - self._last_log >= self.log_interval:
+                self._last_log = now
+                self._log()
+        return values
+
+    def put_many(self, keys, values):
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evicted"] += 1
+
+    def _log(self):
+        lookups = self.counters["hits"] + self.counters["misses"]
+        logging.info(
+            "Prediction cache: %d hits, %d misses (%.1f%% hit rate), %d entries, %d expired, %d evicted",
+            self.counters["hits"],
+            self.counters["misses"],
+            100.0 * self.counters["hits"] / lookups if lookups else 0.0,
+            len(self._entries),
+            self.counters["expired"],
+            self.counters["evicted"],
+        )
+
+
+def predict(data_array):
+    """Predict through the micro-batcher when enabled, and only for rows the cache does not hold."""
+    predict_rows = batcher.predict if batcher is not None else model.predict
+    if cache is None:
+        return predict_rows(data_array)
+
+    keys = cache.keys(data_array)
+    values = cache.get_many(keys)
+    missing = [index for index, value in enumerate(values) if value is None]
+    if missing:
+        fresh = predict_rows(data_array[missing])
+        cache.put_many([keys[index] for index in missing], fresh)
+        for index, value in zip(missing, fresh):
+            values[index] = value
+    return numpy.asarray(values)
+
 
 def init():
     """
     This function is called when the container is initialized/started, typically after create/update of the deployment.
     You can write the logic here to perform init operations like caching the model in memory
     """
-    global model, model_path, inputs_collector, outputs_collector
-    
+    global model, model_path, inputs_collector, outputs_collector, collection, batcher, cache
+    from azureml.ai.monitoring import Collector
+
     # AZUREML_MODEL_DIR is an environment variable created during deployment.
     # It is the path to the model folder (./azureml-models/$MODEL_NAME/$VERSION)
     model_path = os.getenv("AZUREML_MODEL_DIR")
     model_path = os.path.join(
         os.getenv("AZUREML_MODEL_DIR"), "sklearn_regression_model.pkl"
     )
-    
+
     # Initialize data collectors for production inference logging
     # Using standard names 'model_inputs' and 'model_outputs' for seamless model monitoring
     inputs_collector = Collector(name='model_inputs')
     outputs_collector = Collector(name='model_outputs')
-    
+
+    # Collection runs in the background so monitoring I/O stays off the request path
+    collection = BackgroundCollector(
+        inputs_collector,
+        outputs_collector,
+        max_queued=int(os.getenv(MAX_QUEUED_VARIABLE, "1000")),
+        sampling_rate=float(os.getenv(SAMPLING_RATE_VARIABLE, "1.0")),
+    )
+
     # deserialize the model file back into a sklearn model
     model = joblib.load(model_path)
+
+    # Opt-in micro-batching of concurrent requests into one vectorized predict call
+    max_batch_rows = int(os.getenv(BATCH_MAX_ROWS_VARIABLE, "0"))
+    batcher = None
+    if max_batch_rows > 0:
+        batcher = MicroBatcher(
+            model.predict,
+            max_batch_rows=max_batch_rows,
+            max_wait_ms=float(os.getenv(BATCH_MAX_WAIT_MS_VARIABLE, "0")),
+        )
+
+    # Opt-in cache so repeated feature rows skip the model
+    cache_size = int(os.getenv(CACHE_SIZE_VARIABLE, "0"))
+    cache = None
+    if cache_size > 0:
+        cache = PredictionCache(
+            cache_size,
+            ttl_seconds=float(os.getenv(CACHE_TTL_SECONDS_VARIABLE, "0")),
+            log_interval_seconds=float(os.getenv(CACHE_LOG_INTERVAL_SECONDS_VARIABLE, "60")),
+        )
     logging.info("Init complete")
 
 
+def parse_request(raw_data):
+    """
+    Parse a {"data": [[...], ...]} request straight into a float32 array of shape (rows, FEATURE_COUNT).
+    Rows are checked before the array is filled, since numpy would otherwise broadcast a scalar row and
+    coerce null, true/false and numeric strings; non-finite values are rejected afterwards.
+    """
+    try:
+        rows = _loads(raw_data)["data"]
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError('Request body must be a JSON object with a "data" list of rows') from exc
+    if not isinstance(rows, list) or not rows:
+        raise ValueError('"data" must be a non-empty list of rows')
+    for row in rows:
+        # type() rather than isinstance(), so JSON true/false (bool is an int subclass) are rejected too.
+        if not (isinstance(row, list) and len(row) == FEATURE_COUNT and all(type(value) in _NUMBER_TYPES for value in row)):
+            raise ValueError(f"Every row of \"data\" must be a list of {FEATURE_COUNT} numbers")
+
+    data_array = numpy.empty((len(rows), FEATURE_COUNT), dtype=numpy.float32)
+    with numpy.errstate(over="ignore"):
+        data_array[...] = rows
+    if not numpy.isfinite(data_array).all():
+        raise ValueError(f"Every row of \"data\" must hold {FEATURE_COUNT} finite float32 numbers")
+    return data_array
+
+
+def input_frame(data_array):
+    # A single-dtype frame wraps the array without copying it.
+    return pd.DataFrame(data_array, columns=INPUT_COLUMNS, copy=False)
+
+
+def output_frame(result):
+    return pd.DataFrame({"prediction": result}, copy=False)
+
+
 def run(raw_data):
     """
     This function is called for every invocation of the endpoint to perform the actual scoring/prediction.
@@ -38,26 +382,16 @@ def run(raw_data):
     method and return the result back
     """
     logging.info("Request received")
-    
-    # Parse incoming data
-    data = json.loads(raw_data)["data"]
-    data_array = numpy.array(data)
-    
-    # Convert input to DataFrame for data collection
-    # The collector requires pandas DataFrames
-    input_df = pd.DataFrame(data_array)
-    
-    # Collect input data and get correlation context
-    context = inputs_collector.collect(input_df)
-    
-    # Perform prediction
-    result = model.predict(data_array)
-    
-    # Convert output to DataFrame for data collection
-    output_df = pd.DataFrame(result, columns=["prediction"])
-    
-    # Collect output data with correlation context to link inputs and outputs
-    outputs_collector.collect(output_df, context)
-    
+
+    # Parse incoming data against the fixed schema
+    data_array = parse_request(raw_data)
+
+    # Perform prediction, batched with concurrent requests and skipping cached rows when enabled
+    result = predict(data_array)
+
+    # Hand inputs and outputs to the background collector; the collector DataFrames are built there
+    if collection is not None:
+        collection.submit(data_array, result)
+
     logging.info("Request processed")
     return result.tolist()
@@ -1,84 +1,222 @@
 import os
 import logging
 import json
+import threading
+import time
+from datetime import datetime
 import numpy
 import joblib
 import requests
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotModifiedError
 from azure.identity import ManagedIdentityCredential
 from azure.storage.blob import BlobClient
 
+STORAGE_RESOURCE = "https://storage.azure.com/"
+# Tokens are renewed this long before they expire.
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+# Seconds after which cached blob contents are revalidated with their ETag; unset never revalidates.
+BLOB_REVALIDATE_VARIABLE = "BLOB_CACHE_REVALIDATE_SECONDS"
+
+# One pooled session keeps connections (and their TLS handshakes) to the MSI endpoint and storage alive.
+session = requests.Session()
+
+
+def _token_expiry(payload, now):
+    """Return when an MSI token response expires, as a Unix timestamp."""
+    expires_on = payload.get("expires_on")
+    if expires_on is not None:
+        try:
+            return float(expires_on)
+        except ValueError:
+            # The App Service style endpoint reports e.g. "10/16/2026 18:30:00 +00:00".
+            try:
+                return datetime.strptime(expires_on, "%m/%d/%Y %H:%M:%S %z").timestamp()
+            except ValueError:
+                pass
+    if payload.get("expires_in") is not None:
+        return now + float(payload["expires_in"])
+    return now + TOKEN_REFRESH_MARGIN_SECONDS
+
+
+class MsiTokenProvider:
+    """
+    Fetches managed identity tokens from MSI_ENDPOINT over the pooled session and reuses each token
+    until refresh_margin seconds before it expires.
+    """
+
+    def __init__(self, msi_endpoint, msi_secret, client_id=None, resource=STORAGE_RESOURCE,
+                 refresh_margin=TOKEN_REFRESH_MARGIN_SECONDS, clock=time.time):
+        self.msi_endpoint = msi_endpoint
+        self.msi_secret = msi_secret
+        self.client_id = client_id
+        self.resource = resource
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self._token = None
+        self._expires_on = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def get_token(self):
+        with self._lock:
+            now = self.clock()
+            if self._token is None or now >= self._expires_on - self.refresh_margin:
+                self._token, self._expires_on = self._fetch(now)
+            return self._token
+
+    def _fetch(self, now):
+        # If a client id is provided then assume that endpoint was created with user assigned identity,
+        # otherwise system assigned identity deployment.
+        params = {"resource": self.resource}
+        if self.client_id is not None:
+            params["clientid"] = self.client_id
+
+        logging.info("Trying to get identity token...")
+        headers = {"secret": self.msi_secret, "Metadata": "true"}
+        resp = session.get(self.msi_endpoint, params=params, headers=headers)
+        self.requests += 1
+        resp.raise_for_status()
+        payload = resp.json()
+        logging.info("Retrieved token successfully.")
+        return payload["access_token"], _token_expiry(payload, now)
+
+
+class CachedBlobContents:
+    """
+    Keeps a blob's text in memory. fetch(etag) returns (text, etag), or None when the blob still matches
+    etag; after revalidate_seconds the cached text is revalidated that way, and None never revalidates.
+    """
+
+    def __init__(self, fetch, revalidate_seconds=None, clock=time.monotonic):
+        self.fetch = fetch
+        self.revalidate_seconds = revalidate_seconds
+        self.clock = clock
+        self._text = None
+        self._etag = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"downloads": 0, "not_modified": 0, "hits": 0}
+
+    def get(self):
+        with self._lock:
+            now = self.clock()
+            stale = self.revalidate_seconds is not None and now - self._checked_at >= self.revalidate_seconds
+            if self._text is not None and not stale:
+                self.counters["hits"] += 1
+                return self._text
+            fetched = self.fetch(self._etag if self._text is not None else None)
+            self._checked_at = now
+            if fetched is None:
+                self.counters["not_modified"] += 1
+            else:
+                self._text, self._etag = fetched
+                self.counters["downloads"] += 1
+            return self._text
+
+
+def _blob_settings():
+    storage_account = os.environ.get("STORAGE_ACCOUNT_NAME")
+    account_url = os.environ.get("STORAGE_ACCOUNT_URL") or f"https://{storage_account}.blob.core.windows.net"
+    return account_url.rstrip("/"), os.environ.get("STORAGE_CONTAINER_NAME"), os.environ.get("FILE_NAME")
 
-def access_blob_storage_sdk():
-    credential = ManagedIdentityCredential(client_id=os.getenv("UAI_CLIENT_ID"))
-    storage_account = os.getenv("STORAGE_ACCOUNT_NAME")
-    storage_container = os.getenv("STORAGE_CONTAINER_NAME")
-    file_name = os.getenv("FILE_NAME")
 
-    blob_client = BlobClient(
-        account_url=f"https://{storage_account}.blob.core.windows.net/",
+def _revalidate_seconds():
+    value = os.environ.get(BLOB_REVALIDATE_VARIABLE)
+    return float(value) if value else None
+
+
+def build_blob_client():
+    """Create the long-lived SDK blob client; its credential caches and refreshes tokens itself."""
+    credential = ManagedIdentityCredential(client_id=os.getenv("UAI_CLIENT_ID"))
+    account_url, storage_container, file_name = _blob_settings()
+    return BlobClient(
+        account_url=f"{account_url}/",
         container_name=storage_container,
         blob_name=file_name,
         credential=credential,
     )
-    blob_contents = blob_client.download_blob().content_as_text()
+
+
+def _fetch_blob_sdk(etag):
+    try:
+        if etag is None:
+            downloader = blob_client.download_blob()
+        else:
+            downloader = blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfModified)
+    except ResourceNotModifiedError:
+        return None
+    return downloader.content_as_text(), downloader.properties.etag
+
+
+def access_blob_storage_sdk():
+    global blob_client, sdk_blob
+    if blob_client is None:
+        blob_client = build_blob_client()
+    if sdk_blob is None:
+        sdk_blob = CachedBlobContents(_fetch_blob_sdk, _revalidate_seconds())
+    blob_contents = sdk_blob.get()
     logging.info(f"Blob contains: {blob_contents}")
+    return blob_contents
 
 
 def get_token_rest():
     """
-    Retrieve an access token via REST.
+    Retrieve an access token via REST, reusing the cached token while it is valid.
     """
-
-    access_token = None
-    msi_endpoint = os.environ.get("MSI_ENDPOINT", None)
-    msi_secret = os.environ.get("MSI_SECRET", None)
-
-    # If UAI_CLIENT_ID is provided then assume that endpoint was created with user assigned identity,
-    # # otherwise system assigned identity deployment.
-    client_id = os.environ.get("UAI_CLIENT_ID", None)
-    if client_id is not None:
-        token_url = (
-            msi_endpoint + f"?clientid={client_id}&resource=https://storage.azure.com/"
+    global token_provider
+    if token_provider is None:
+        token_provider = MsiTokenProvider(
+            os.environ.get("MSI_ENDPOINT", None),
+            os.environ.get("MSI_SECRET", None),
+            client_id=os.environ.get("UAI_CLIENT_ID", None),
         )
-    else:
-        token_url = msi_endpoint + f"?resource=https://storage.azure.com/"
+    return token_provider.get_token()
+
 
-    logging.info("Trying to get identity token...")
-    headers = {"secret": msi_secret, "Metadata": "true"}
-    resp = requests.get(token_url, headers=headers)
+def _fetch_blob_rest(etag):
+    account_url, storage_container, file_name = _blob_settings()
+    blob_url = f"{account_url}/{storage_container}/{file_name}?api-version=2019-04-01"
+    auth_headers = {
+        "Authorization": f"Bearer {get_token_rest()}",
+        "x-ms-blob-type": "BlockBlob",
+        "x-ms-version": "2019-02-02",
+    }
+    if etag is not None:
+        auth_headers["If-None-Match"] = etag
+    resp = session.get(blob_url, headers=auth_headers)
+    if resp.status_code == 304:
+        return None
     resp.raise_for_status()
-    access_token = resp.json()["access_token"]
-    logging.info("Retrieved token successfully.")
-    return access_token
+    return resp.text, resp.headers.get("ETag")
 
 
 def access_blob_storage_rest():
     """
     Access a blob via REST.
     """
-
+    global rest_blob
     logging.info("Trying to access blob storage...")
-    storage_account = os.environ.get("STORAGE_ACCOUNT_NAME")
-    storage_container = os.environ.get("STORAGE_CONTAINER_NAME")
-    file_name = os.environ.get("FILE_NAME")
+    account_url, storage_container, file_name = _blob_settings()
     logging.info(
-        f"storage_account: {storage_account}, container: {storage_container}, filename: {file_name}"
+        f"storage account: {account_url}, container: {storage_container}, filename: {file_name}"
     )
-    token = get_token_rest()
+    if rest_blob is None:
+        rest_blob = CachedBlobContents(_fetch_blob_rest, _revalidate_seconds())
+    blob_contents = rest_blob.get()
+    logging.info(f"Blob contains: {blob_contents}")
+    return blob_contents
 
-    blob_url = f"https://{storage_account}.blob.core.windows.net/{storage_container}/{file_name}?api-version=2019-04-01"
-    auth_headers = {
-        "Authorization": f"Bearer {token}",
-        "x-ms-blob-type": "BlockBlob",
-        "x-ms-version": "2019-02-02",
-    }
-    resp = requests.get(blob_url, headers=auth_headers)
-    resp.raise_for_status()
-    logging.info(f"Blob contains: {resp.text}")
+
+# Built on first use, or in init(), and reused for every later access.
+token_provider = None
+blob_client = None
+rest_blob = None
+sdk_blob = None
 
 
 def init():
-    global model
+    global model, blob_client
     # AZUREML_MODEL_DIR is an environment variable created during deployment.
     # It is the path to the model folder (./azureml-models/$MODEL_NAME/$VERSION)
     # For multiple models, it points to the folder containing all deployed models (./azureml-models)
@@ -90,6 +228,9 @@ def init():
     model = joblib.load(model_path)
     logging.info("Model loaded")
 
+    # One blob client for the lifetime of the container
+    blob_client = build_blob_client()
+
     # Access Azure resource (Blob storage) using system assigned identity token
     access_blob_storage_rest()
     access_blob_storage_sdk()
@@ -1,63 +1,70 @@
 import argparse
 import json
-import os
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 import time
 
-from azure.ai.ml import MLClient
 from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
-from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
-from azureml.core.run import Run
 
+if TYPE_CHECKING:
+    from azure.ai.ml import MLClient
 
-def _build_credential():
-    client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-    if client_id:
-        credential = ManagedIdentityCredential(client_id=client_id)
-        try:
-            credential.get_token("https://management.azure.com/.default")
-            print("Using managed identity credential for Azure ML cleanup")
-            return credential
-        except Exception as exc:  # pragma: no cover - fallback logging only
-            print(f"Managed identity auth failed, falling back to DefaultAzureCredential: {exc}")
-    credential = DefaultAzureCredential(exclude_interactive_browser_credential=True)
-    credential.get_token("https://management.azure.com/.default")
-    print("Using DefaultAzureCredential for Azure ML cleanup")
-    return credential
-
-
-def _get_workspace_client(credential, args) -> Optional[MLClient]:
+from common.ml_clients import get_credential, get_registry_client, get_workspace_client
+
+
+def _get_workspace_client(args) -> Optional["MLClient"]:
     try:
-        run = Run.get_context(allow_offline=False)
-        ws = run.experiment.workspace
-        return MLClient(
-            credential=credential,
-            subscription_id=ws._subscription_id,
-            resource_group_name=ws._resource_group,
-            workspace_name=ws._workspace_name,
-        )
+        return get_workspace_client(args.subscription_id, args.resource_group, args.workspace_name)
     except Exception:
-        if args.subscription_id and args.resource_group and args.workspace_name:
-            return MLClient(
-                credential=credential,
-                subscription_id=args.subscription_id,
-                resource_group_name=args.resource_group,
-                workspace_name=args.workspace_name,
-            )
-    return None
+        return None
 
 
-def _get_registry_client(credential, registry_name: Optional[str]) -> Optional[MLClient]:
+def _get_registry_client(registry_name: Optional[str]) -> Optional["MLClient"]:
     if not registry_name:
         return None
     try:
-        return MLClient(credential=credential, registry_name=registry_name)
+        return get_registry_client(registry_name)
     except Exception as exc:
         print(f"Unable to create registry client for {registry_name}: {exc}")
         return None
 
 
+def _str_to_bool(value: str) -> bool:
+    if value is None:
+        return False
+    return str(value).lower() in {"true", "1", "yes", "y"}
+
+
+def parse_workspaces(spec: Optional[str]) -> List[Tuple[str, str, str]]:
+    """Parse ``"sub/rg/ws,sub/rg/ws2"`` into ``(subscription_id, resource_group, workspace_name)`` triples."""
+    workspaces = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = [part.strip() for part in item.split("/")]
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"Workspace {item!r} must look like <subscription_id>/<resource_group>/<workspace_name>")
+        workspaces.append((parts[0], parts[1], parts[2]))
+    return workspaces
+
+
+def _get_other_workspace_client(subscription_id: str, resource_group: str, workspace_name: str) -> "MLClient":
+    from azure.ai.ml import MLClient
+
+    return MLClient(
+        credential=get_credential(),
+        subscription_id=subscription_id,
+        resource_group_name=resource_group,
+        workspace_name=workspace_name,
+    )
+
+
 def _load_deploy_metadata(deploy_state: Optional[str]) -> Dict[str, str]:
     if not deploy_state:
         return {}
@@ -82,37 +89,220 @@ def _version_key(model) -> Tuple[int, str]:
         return (1, raw_version)
 
 
-def _expand_keep_set(
-    models: Sequence,
-    keep_versions: Set[str],
-    retain_count: int,
-) -> Set[str]:
-    target = max(retain_count, len(keep_versions))
-    ordered = sorted(models, key=_version_key, reverse=True)
-    for model in ordered:
-        if len(keep_versions) >= target:
-            break
-        version = str(getattr(model, "version", ""))
-        if version:
-            keep_versions.add(version)
-    return keep_versions
+# (registry name or None for the workspace, model name, version) of a model a deployment serves.
+ModelRef = Tuple[Optional[str], str, str]
+
+_REGISTRY_MODEL_ID = re.compile(r"registries/([^/]+)/models/([^/]+)/versions/([^/]+)$")
+_WORKSPACE_MODEL_ID = re.compile(r"models/([^/]+)/versions/([^/]+)$")
+_SHORT_MODEL_ID = re.compile(r"^azureml:([^:/]+):([^:/]+)$")
+
+
+def _parse_model_ref(model) -> Optional[ModelRef]:
+    """Resolve a deployment's ``model`` (asset id string or ``Model``) to a ``ModelRef``."""
+    reference = model if isinstance(model, str) else getattr(model, "id", None)
+    if reference:
+        match = _REGISTRY_MODEL_ID.search(reference)
+        if match:
+            return match.group(1), match.group(2), match.group(3)
+        match = _WORKSPACE_MODEL_ID.search(reference) or _SHORT_MODEL_ID.match(reference)
+        if match:
+            return None, match.group(1), match.group(2)
+    name, version = getattr(model, "name", None), getattr(model, "version", None)
+    if name and version is not None:
+        return None, str(name), str(version)
+    return None
+
+
+def _deployed_model_refs(client: "MLClient", max_workers: int = 8) -> Dict[ModelRef, List[str]]:
+    """Map every model served by an online deployment to ``endpoint/slot (traffic%)`` labels.
+
+    Lists the endpoints once and the deployments of each endpoint once, concurrently. Slots at 0%
+    traffic count too: they are either being validated or kept for rollback.
+    """
+    endpoints = list(client.online_endpoints.list())
+    if not endpoints:
+        return {}
+
+    def list_deployments(endpoint):
+        return endpoint, list(client.online_deployments.list(endpoint_name=endpoint.name))
+
+    refs: Dict[ModelRef, List[str]] = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(endpoints))) as executor:
+        for endpoint, deployments in executor.map(list_deployments, endpoints):
+            traffic = getattr(endpoint, "traffic", None) or {}
+            for deployment in deployments:
+                ref = _parse_model_ref(getattr(deployment, "model", None))
+                if ref is not None:
+                    label = f"{endpoint.name}/{deployment.name} ({traffic.get(deployment.name, 0)}%)"
+                    refs.setdefault(ref, []).append(label)
+    return refs
+
+
+def _scan_deployments(
+    workspace_client: Optional["MLClient"], other_clients: Dict[str, "MLClient"]
+) -> Tuple[Dict[ModelRef, List[str]], List[str]]:
+    """Collect the models served by the current workspace's deployments and those of ``other_clients``.
+
+    Other workspaces only contribute registry references: their workspace models are not the ones
+    cleaned up here. Returns the references and the names of the workspaces that were scanned.
+    """
+    refs: Dict[ModelRef, List[str]] = {}
+    scanned: List[str] = []
+    if workspace_client is not None:
+        refs = _deployed_model_refs(workspace_client)
+        scanned.append(str(getattr(workspace_client, "workspace_name", None) or "current workspace"))
+    for workspace_name, client in other_clients.items():
+        for ref, labels in _deployed_model_refs(client).items():
+            if ref[0] is not None:
+                refs.setdefault(ref, []).extend(f"{workspace_name}:{label}" for label in labels)
+        scanned.append(workspace_name)
+    return refs, scanned
+
+
+def _created_at(model) -> Optional[datetime]:
+    created = getattr(getattr(model, "creation_context", None), "created_at", None)
+    if isinstance(created, str):
+        try:
+            created = datetime.fromisoformat(created.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(created, datetime) and created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created if isinstance(created, datetime) else None
+
+
+def parse_tag_rules(spec: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse ``"stage=production,pinned"`` into ``{"stage": "production", "pinned": None}``."""
+    rules: Dict[str, Optional[str]] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, separator, value = item.partition("=")
+        rules[key.strip()] = value.strip() if separator else None
+    return rules
+
+
+class RetentionPolicy:
+    """Decides which versions of a model survive cleanup; a version is kept if any rule matches.
+
+    Rules: the ``keep_last`` newest versions, versions younger than ``keep_days`` days, explicitly
+    ``pinned`` versions, versions matching a ``keep_tags`` rule (key present, or key equal to a
+    value) and versions served by an online deployment in ``deployed``. :meth:`evaluate` works on
+    one listing of the model and makes no further service calls.
+    """
+
+    def __init__(
+        self,
+        keep_last: int = 1,
+        keep_days: float = 0,
+        pinned: Iterable[str] = (),
+        keep_tags: Optional[Dict[str, Optional[str]]] = None,
+        deployed: Optional[Dict[ModelRef, List[str]]] = None,
+    ) -> None:
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self.pinned = {str(version) for version in pinned}
+        self.keep_tags = keep_tags or {}
+        self.deployed = deployed or {}
+
+    def evaluate(
+        self,
+        models: Sequence,
+        model_name: str,
+        registry_name: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, List[str]]:
+        """Return ``{version: [reasons]}`` for every version of ``models`` that must be kept.
+
+        ``registry_name`` selects which deployment references apply: those to this registry, or
+        with ``None`` those to the workspace.
+        """
+        cutoff = None
+        if self.keep_days > 0:
+            cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=self.keep_days)
+        deployed = {
+            version: labels for (registry, name, version), labels in self.deployed.items()
+            if registry == registry_name and name == model_name
+        }
+
+        reasons: Dict[str, List[str]] = {}
+        for rank, model in enumerate(sorted(models, key=_version_key, reverse=True)):
+            version = str(getattr(model, "version", ""))
+            if not version:
+                continue
+            matched = []
+            if rank < self.keep_last:
+                matched.append(f"latest {self.keep_last}")
+            if version in self.pinned:
+                matched.append("pinned")
+            if cutoff is not None:
+                created = _created_at(model)
+                if created is not None and created >= cutoff:
+                    matched.append(f"newer than {self.keep_days:g} days")
+            tags = getattr(model, "tags", None) or {}
+            for key, value in self.keep_tags.items():
+                if key in tags and (value is None or str(tags[key]) == value):
+                    matched.append(f"tag {key}" if value is None else f"tag {key}={value}")
+            for label in deployed.get(version, []):
+                matched.append(f"deployed at {label}")
+            if matched:
+                reasons[version] = matched
+        return reasons
 
 
 def _collect_versions(models: Iterable) -> List[str]:
     return [str(getattr(model, "version", "")) for model in models if getattr(model, "version", None) is not None]
 
 
-def _wait_for_deletion(client: MLClient, model_name: str, version: str, retries: int = 10, delay: float = 3.0) -> None:
-    for attempt in range(retries):
+class RateLimiter:
+    """Spaces calls at least ``1 / rate_per_second`` apart across threads; a rate of 0 disables it."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _confirm_deletions(
+    client: "MLClient",
+    model_name: str,
+    versions: Iterable[str],
+    retries: int = 8,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> None:
+    """Re-list the model until none of ``versions`` remain, backing off exponentially with jitter.
+
+    One list call per round confirms every pending deletion at once instead of polling each version.
+    """
+    pending = set(versions)
+    delay = initial_delay
+    for attempt in range(retries + 1):
         try:
-            client.models.get(name=model_name, version=version)
+            pending &= set(_collect_versions(client.models.list(name=model_name)))
         except ResourceNotFoundError:
+            pending.clear()
+        if not pending:
             return
-        time.sleep(delay)
-    raise HttpResponseError(message=f"Model version {model_name}:{version} still exists after deletion attempts")
+        if attempt < retries:
+            # Equal jitter keeps scopes and retries from re-listing in lockstep.
+            time.sleep(delay * (0.5 + random.random() / 2))
+            delay = min(delay * 2, max_delay)
+    raise HttpResponseError(message=f"Model versions {model_name}:{sorted(pending)} still exist after deletion attempts")
 
 
-def _delete_model_version(client: MLClient, model_name: str, version: str) -> None:
+def _delete_model_version(client: "MLClient", model_name: str, version: str) -> None:
     operation = client.models._model_versions_operation
     scope = client.models._operation_scope
     registry_name = getattr(scope, "_registry_name", None)
@@ -125,20 +315,64 @@ def _delete_model_version(client: MLClient, model_name: str, version: str) -> No
                 print(f"Deletion accepted asynchronously for registry version {version}; waiting for completion")
             else:
                 raise
-        _wait_for_deletion(client, model_name, version)
     else:
         workspace_name = getattr(scope, "_workspace_name", None)
         operation.delete(resource_group, workspace_name, model_name, version)
-        _wait_for_deletion(client, model_name, version)
+
+
+def _delete_versions(
+    scope_name: str,
+    client: "MLClient",
+    model_name: str,
+    versions: Sequence[str],
+    max_workers: int,
+    rate_limiter: Optional[RateLimiter],
+    confirm_initial_delay: float,
+) -> List[str]:
+    """Issue the deletions on ``max_workers`` threads, then confirm them all with batched re-lists."""
+    limiter = rate_limiter or RateLimiter(0)
+
+    def delete(version: str) -> Optional[str]:
+        limiter.acquire()
+        try:
+            _delete_model_version(client, model_name, version)
+        except ResourceNotFoundError:
+            print(f"[{scope_name}] Model version {version} already removed")
+            return None
+        return version
+
+    issued: List[str] = []
+    failure: Optional[HttpResponseError] = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(version, executor.submit(delete, version)) for version in versions]
+        for version, future in futures:
+            try:
+                if future.result() is not None:
+                    issued.append(version)
+            except HttpResponseError as exc:
+                print(f"[{scope_name}] Failed to delete version {version}: {exc}")
+                failure = failure or exc
+
+    # Confirm whatever was issued before surfacing a failure, so nothing is left half-deleted unnoticed.
+    if issued:
+        _confirm_deletions(client, model_name, issued, initial_delay=confirm_initial_delay)
+        for version in issued:
+            print(f"[{scope_name}] Deleted model version {version}")
+    if failure is not None:
+        raise failure
+    return issued
 
 
 def _cleanup_for_client(
     scope_name: str,
-    client: MLClient,
+    client: "MLClient",
     model_name: str,
-    keep_versions: Set[str],
-    retain_count: int,
+    policy: RetentionPolicy,
     dry_run: bool,
+    registry_name: Optional[str] = None,
+    max_workers: int = 4,
+    rate_limiter: Optional[RateLimiter] = None,
+    confirm_initial_delay: float = 1.0,
 ) -> Dict[str, object]:
     try:
         models = list(client.models.list(name=model_name))
@@ -147,7 +381,7 @@ def _cleanup_for_client(
         return {
             "scope": scope_name,
             "total_versions": 0,
-            "kept_versions": sorted(list(keep_versions)),
+            "kept_versions": sorted(policy.pinned),
             "deleted_versions": [],
             "dry_run": dry_run,
         }
@@ -163,31 +397,26 @@ def _cleanup_for_client(
         }
 
     ordered_models = sorted(models, key=_version_key, reverse=True)
-    resolved_keep = _expand_keep_set(ordered_models, set(keep_versions), retain_count)
-    delete_candidates = [m for m in ordered_models if str(getattr(m, "version", "")) not in resolved_keep]
-    deleted_versions: List[str] = []
-    for candidate in delete_candidates:
-        version = str(getattr(candidate, "version", ""))
-        if not version:
-            continue
+    keep_reasons = policy.evaluate(ordered_models, model_name, registry_name)
+    for version, reasons in keep_reasons.items():
+        print(f"[{scope_name}] Keeping model version {model_name}:{version}: {', '.join(reasons)}")
+    delete_candidates = [m for m in ordered_models if str(getattr(m, "version", "")) not in keep_reasons]
+    versions = [str(getattr(candidate, "version", "")) for candidate in delete_candidates]
+    versions = [version for version in versions if version]
+    for version in versions:
         print(f"[{scope_name}] Preparing to delete model version {model_name}:{version}")
-        if dry_run:
-            deleted_versions.append(version)
-            continue
-        try:
-            _delete_model_version(client, model_name, version)
-            deleted_versions.append(version)
-            print(f"[{scope_name}] Deleted model version {version}")
-        except ResourceNotFoundError:
-            print(f"[{scope_name}] Model version {version} already removed")
-        except HttpResponseError as exc:
-            print(f"[{scope_name}] Failed to delete version {version}: {exc}")
-            raise
-    kept_versions = [str(getattr(model, "version", "")) for model in ordered_models if str(getattr(model, "version", "")) in resolved_keep]
+    if dry_run:
+        deleted_versions = versions
+    else:
+        deleted_versions = _delete_versions(
+            scope_name, client, model_name, versions, max_workers, rate_limiter, confirm_initial_delay
+        )
+    kept_versions = [str(getattr(model, "version", "")) for model in ordered_models if str(getattr(model, "version", "")) in keep_reasons]
     return {
         "scope": scope_name,
         "total_versions": len(ordered_models),
         "kept_versions": kept_versions,
+        "keep_reasons": keep_reasons,
         "deleted_versions": deleted_versions,
         "dry_run": dry_run,
     }
@@ -207,6 +436,9 @@ def _write_summary(output_folder: Optional[str], report: Dict[str, object]) -> N
         handle.write(f"Cleanup executed for model {report.get('model_name')}.\n")
         handle.write(f"Dry run: {report.get('dry_run')}\n")
         handle.write(f"Retained versions: {', '.join(sorted(set(kept))) or 'none'}\n")
+        scanned = report.get("deployments_scanned")
+        if scanned is not None:
+            handle.write(f"Deployments checked in workspaces: {', '.join(scanned) or 'none'}\n")
 
 
 def main():
@@ -221,12 +453,28 @@ def main():
     parser.add_argument("--subscription_id", required=False)
     parser.add_argument("--resource_group", required=False)
     parser.add_argument("--workspace_name", required=False)
+    parser.add_argument("--keep_newer_than_days", type=float, default=0, help="Also keep versions created within this many days; 0 disables the rule")
+    parser.add_argument("--keep_tags", required=False, help='Also keep versions with these tags, e.g. "stage=production,pinned"')
+    parser.add_argument("--ignore_deployments", type=str, nargs="?", const="true", default="false", help="Set to true to not keep versions served by online deployments")
+    parser.add_argument("--deployment_workspaces", required=False, help='Other workspaces whose deployments protect registry versions, e.g. "sub/rg/prod-ws,sub/rg/test-ws"')
+    parser.add_argument("--delete_workers", type=int, default=4, help="Deletions in flight per scope")
+    parser.add_argument("--deletes_per_second", type=float, default=5.0, help="Deletion rate limit per scope; 0 disables it")
     args = parser.parse_args()
 
     if args.retain_versions < 1:
         raise SystemExit("retain_versions must be at least 1")
+    if args.keep_newer_than_days < 0:
+        raise SystemExit("keep_newer_than_days must not be negative")
+    if args.delete_workers < 1 or args.deletes_per_second < 0:
+        raise SystemExit("delete_workers must be at least 1 and deletes_per_second must not be negative")
+    ignore_deployments = _str_to_bool(args.ignore_deployments)
+    try:
+        other_workspaces = parse_workspaces(args.deployment_workspaces)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
 
-    credential = _build_credential()
+    # Cleanup can also run outside a job, so allow the shared credential to fall back to DefaultAzureCredential.
+    get_credential(allow_default_fallback=True)
 
     deploy_metadata = _load_deploy_metadata(args.deploy_state)
     keep_versions: Set[str] = set()
@@ -242,40 +490,81 @@ def main():
             "Deployment metadata model name does not match target; proceeding with target name only",
         )
 
-    scopes: List[Tuple[str, MLClient]] = []
+    scopes: List[Tuple[str, "MLClient", Optional[str]]] = []
+    workspace_client = None
+    if args.scope in ("workspace", "both") or not ignore_deployments:
+        workspace_client = _get_workspace_client(args)
     if args.scope in ("workspace", "both"):
-        workspace_client = _get_workspace_client(credential, args)
         if workspace_client:
-            scopes.append(("workspace", workspace_client))
+            scopes.append(("workspace", workspace_client, None))
         else:
             print("Workspace client unavailable; skipping workspace cleanup")
     if args.scope in ("registry", "both"):
-        registry_client = _get_registry_client(credential, args.registry)
+        registry_client = _get_registry_client(args.registry)
         if registry_client:
-            scopes.append(("registry", registry_client))
+            scopes.append(("registry", registry_client, args.registry))
         else:
             print("Registry client unavailable; skipping registry cleanup")
 
     if not scopes:
         raise SystemExit("No valid Azure ML clients available for cleanup")
 
-    scope_reports = []
-    for scope_name, client in scopes:
-        report = _cleanup_for_client(
-            scope_name=scope_name,
-            client=client,
-            model_name=args.model_name,
-            keep_versions=keep_versions,
-            retain_count=args.retain_versions,
-            dry_run=args.dry_run,
-        )
-        scope_reports.append(report)
+    deployed: Dict[ModelRef, List[str]] = {}
+    deployments_scanned: Optional[List[str]] = None
+    if not ignore_deployments:
+        if workspace_client is None:
+            print("Workspace client unavailable; versions served by the current workspace's online deployments are not protected")
+        # Deleting a version an endpoint still serves would break it, so fail rather than guess.
+        try:
+            other_clients = {
+                workspace_name: _get_other_workspace_client(subscription_id, resource_group, workspace_name)
+                for subscription_id, resource_group, workspace_name in other_workspaces
+            }
+            deployed, deployments_scanned = _scan_deployments(workspace_client, other_clients)
+        except Exception as exc:
+            raise SystemExit(f"Failed to enumerate online deployments: {exc}") from exc
+        print(f"Found {sum(len(labels) for labels in deployed.values())} online deployments referencing models")
+        if any(registry_name for _, _, registry_name in scopes):
+            # A registry is shared, so endpoints in workspaces that were not scanned can still serve its versions.
+            print(
+                f"Registry versions are only protected by the deployments of {deployments_scanned or 'no workspace'}; "
+                "list other workspaces serving them with --deployment_workspaces"
+            )
+
+    policy = RetentionPolicy(
+        keep_last=args.retain_versions,
+        keep_days=args.keep_newer_than_days,
+        pinned=keep_versions,
+        keep_tags=parse_tag_rules(args.keep_tags),
+        deployed=deployed,
+    )
+
+    # Scopes are independent stores, so they are cleaned up in parallel.
+    with ThreadPoolExecutor(max_workers=len(scopes)) as executor:
+        futures = [
+            executor.submit(
+                _cleanup_for_client,
+                scope_name=scope_name,
+                client=client,
+                model_name=args.model_name,
+                policy=policy,
+                dry_run=args.dry_run,
+                registry_name=registry_name,
+                max_workers=args.delete_workers,
+                rate_limiter=RateLimiter(args.deletes_per_second),
+            )
+            for scope_name, client, registry_name in scopes
+        ]
+        scope_reports = [future.result() for future in futures]
 
     final_report: Dict[str, object] = {
         "model_name": args.model_name,
         "deploy_metadata": deploy_metadata,
         "retain_versions": args.retain_versions,
+        "keep_newer_than_days": args.keep_newer_than_days,
+        "keep_tags": policy.keep_tags,
         "dry_run": args.dry_run,
+        "deployments_scanned": deployments_scanned,
         "scopes": scope_reports,
     }
 
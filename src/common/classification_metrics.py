@@ -0,0 +1,36 @@
+"""Classification metrics computed from confusion matrices.
+
+Score accumulates one confusion matrix over every prediction shard and compare evaluates a
+stack of bootstrap resamples at once, so the metrics are computed with numpy over the last two
+axes of ``(..., labels, labels)`` arrays whose rows are actual labels and columns predicted ones.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+
+def confusion_metrics(confusion: np.ndarray) -> Dict[str, np.ndarray]:
+    """Return accuracy, macro-F1 and per-class precision, recall, F1 and support of ``confusion``."""
+    confusion = np.asarray(confusion)
+    true_positives = np.diagonal(confusion, axis1=-2, axis2=-1).astype("float64")
+    support = confusion.sum(axis=-1)
+    predicted_count = confusion.sum(axis=-2)
+    total = confusion.sum(axis=(-2, -1))
+    # Like sklearn, macro averages cover labels that occur in either the actuals or the predictions.
+    present = (support + predicted_count) > 0
+    labels_present = present.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted_count > 0, true_positives / predicted_count, 0.0)
+        recall = np.where(support > 0, true_positives / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        accuracy = np.where(total > 0, true_positives.sum(axis=-1) / total, 0.0)
+        macro_f1 = np.where(labels_present > 0, (f1 * present).sum(axis=-1) / labels_present, 0.0)
+    return {
+        "accuracy": accuracy,
+        "macro_f1": macro_f1,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "support": support,
+    }
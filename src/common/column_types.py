@@ -0,0 +1,31 @@
+"""Column conversions shared by the merge and transform steps.
+
+Both steps read the raw TLC exports (or frames derived from them) and must agree on how
+categorical codes and timestamps are typed, so the conversions live here once.
+"""
+
+import pandas as pd
+
+# The raw TLC exports carry timestamps such as "1/3/2016 21:02".
+RAW_DATETIME_FORMAT = "%m/%d/%Y %H:%M"
+
+
+def to_category(series: pd.Series) -> pd.Series:
+    """Return ``series`` as a categorical of strings.
+
+    Parquet only round-trips string dictionaries as pandas categoricals, so codes such as
+    vendor 1/2 are stored as "1"/"2" rather than floats that picked up a NaN.
+    """
+    if pd.api.types.is_float_dtype(series):
+        series = series.astype("Int64")
+    return series.astype("string").astype("category")
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Parse a timestamp column once, using the raw export format when it matches."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.to_datetime(values, format=RAW_DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return pd.to_datetime(values)
@@ -0,0 +1,61 @@
+"""Readers for the CSV/Parquet files behind a step's uri_folder or MLTable input.
+
+Steps write their tabular outputs as one or more ``.csv`` or ``.parquet`` files next to an
+MLTable definition; these helpers list those files in name order and read them whole or in
+bounded-size chunks, so every step handles both formats the same way.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import pandas as pd
+
+DATA_SUFFIXES = (".csv", ".parquet")
+
+PathLike = Union[str, Path]
+
+
+def list_data_files(folder: PathLike) -> List[Path]:
+    """Return the CSV/Parquet files directly under ``folder`` in name order."""
+    files = []
+    for filename in sorted(os.listdir(folder)):
+        path = Path(folder) / filename
+        if path.suffix in DATA_SUFFIXES:
+            files.append(path)
+        else:
+            print(f"skipping non-data file: {filename}")
+    return files
+
+
+def read_data_file(path: PathLike, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=None if columns is None else list(columns))
+    return pd.read_csv(path, usecols=None if columns is None else list(columns))
+
+
+def read_data_folder(folder: PathLike) -> pd.DataFrame:
+    """Read every CSV/Parquet file under ``folder`` into one frame."""
+    files = list_data_files(folder)
+    if not files:
+        raise FileNotFoundError(f"No CSV or Parquet files found in {folder}")
+    return pd.concat([read_data_file(path) for path in files], ignore_index=True)
+
+
+def iter_data_chunks(
+    folder: PathLike, chunk_rows: int, columns: Optional[Sequence[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield frames of at most ``chunk_rows`` rows from every CSV/Parquet file under ``folder``."""
+    for path in list_data_files(folder):
+        print(f"reading file: {path.name} ...")
+        if path.suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            batches = pq.ParquetFile(path).iter_batches(
+                batch_size=chunk_rows, columns=None if columns is None else list(columns)
+            )
+            for batch in batches:
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(path, usecols=None if columns is None else list(columns), chunksize=chunk_rows)
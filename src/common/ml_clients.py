@@ -0,0 +1,158 @@
+"""Azure ML clients shared by the pipeline step scripts.
+
+The first caller builds one managed identity credential; its tokens are reused until shortly
+before they expire, so every client in the process shares a single token round-trip. Workspace
+and registry ``MLClient`` instances are memoized per process.
+
+Tests and local runs inject their own objects with ``set_credential``, ``set_workspace_client``
+and ``set_registry_client``; ``reset`` forgets everything that was built or injected.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+ARM_SCOPE = "https://management.azure.com/.default"
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+_lock = threading.RLock()
+_credential = None
+_workspace_client = None
+_registry_clients: Dict[str, object] = {}
+
+
+class CachingCredential:
+    """Wrap an azure-identity credential and reuse each token until it is about to expire."""
+
+    def __init__(self, credential, refresh_margin: float = TOKEN_REFRESH_MARGIN_SECONDS) -> None:
+        self._credential = credential
+        self._refresh_margin = refresh_margin
+        self._tokens: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None, **kwargs):
+        if tenant_id is not None:
+            kwargs["tenant_id"] = tenant_id
+        if claims:
+            # Claims challenges ask for a fresh token, so they always reach the wrapped credential.
+            return self._credential.get_token(*scopes, claims=claims, **kwargs)
+
+        key = (scopes, tuple(sorted(kwargs.items())))
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.expires_on - self._refresh_margin <= time.time():
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+        return token
+
+    def close(self) -> None:
+        close = getattr(self._credential, "close", None)
+        if close is not None:
+            close()
+
+
+def _build_credential(allow_default_fallback: bool) -> CachingCredential:
+    from azure.identity import ManagedIdentityCredential
+
+    client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
+    if not allow_default_fallback:
+        credential = CachingCredential(ManagedIdentityCredential(client_id=client_id))
+        credential.get_token(ARM_SCOPE)
+        return credential
+
+    if client_id:
+        credential = CachingCredential(ManagedIdentityCredential(client_id=client_id))
+        try:
+            credential.get_token(ARM_SCOPE)
+            print("Using managed identity credential")
+            return credential
+        except Exception as exc:  # pragma: no cover - fallback logging only
+            print(f"Managed identity auth failed, falling back to DefaultAzureCredential: {exc}")
+
+    from azure.identity import DefaultAzureCredential
+
+    credential = CachingCredential(DefaultAzureCredential(exclude_interactive_browser_credential=True))
+    credential.get_token(ARM_SCOPE)
+    print("Using DefaultAzureCredential")
+    return credential
+
+
+def get_credential(allow_default_fallback: bool = False):
+    """Return the process-wide credential, building it and fetching its first token on first use.
+
+    With ``allow_default_fallback`` a failing managed identity falls back to ``DefaultAzureCredential``.
+    """
+    global _credential
+    with _lock:
+        if _credential is None:
+            _credential = _build_credential(allow_default_fallback)
+        return _credential
+
+
+def get_workspace_client(
+    subscription_id: Optional[str] = None,
+    resource_group_name: Optional[str] = None,
+    workspace_name: Optional[str] = None,
+):
+    """Return the ``MLClient`` of the workspace the current run belongs to.
+
+    The explicit workspace coordinates are only used when there is no run context, e.g. when a
+    step script is started outside an Azure ML job.
+    """
+    global _workspace_client
+    with _lock:
+        if _workspace_client is None:
+            from azure.ai.ml import MLClient
+
+            try:
+                from azureml.core.run import Run
+
+                ws = Run.get_context(allow_offline=False).experiment.workspace
+                coordinates = (ws._subscription_id, ws._resource_group, ws._workspace_name)
+            except Exception:
+                if not (subscription_id and resource_group_name and workspace_name):
+                    raise
+                coordinates = (subscription_id, resource_group_name, workspace_name)
+            _workspace_client = MLClient(
+                credential=get_credential(),
+                subscription_id=coordinates[0],
+                resource_group_name=coordinates[1],
+                workspace_name=coordinates[2],
+            )
+        return _workspace_client
+
+
+def get_registry_client(registry_name: str):
+    """Return the ``MLClient`` of ``registry_name``."""
+    with _lock:
+        if registry_name not in _registry_clients:
+            from azure.ai.ml import MLClient
+
+            _registry_clients[registry_name] = MLClient(credential=get_credential(), registry_name=registry_name)
+        return _registry_clients[registry_name]
+
+
+def set_credential(credential) -> None:
+    global _credential
+    with _lock:
+        _credential = credential
+
+
+def set_workspace_client(client) -> None:
+    global _workspace_client
+    with _lock:
+        _workspace_client = client
+
+
+def set_registry_client(registry_name: str, client) -> None:
+    with _lock:
+        _registry_clients[registry_name] = client
+
+
+def reset() -> None:
+    global _credential, _workspace_client
+    with _lock:
+        _credential = None
+        _workspace_client = None
+        _registry_clients.clear()
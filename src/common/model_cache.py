@@ -0,0 +1,157 @@
+"""Local cache of registered model artifacts.
+
+Entries are keyed by the workspace or registry the model comes from plus its name and version,
+and share the ``StepCache`` layout: ``<cache_dir>/<key>/model/`` next to an ``entry.json`` that
+records the size, last use and a SHA-256 manifest of every downloaded file. A hit is only served
+after the files match the manifest, so a truncated or edited entry is downloaded again.
+
+The cache is shared by concurrent jobs, so every fetched entry gets a lease file under
+``<key>/leases/`` until ``release()``. Eviction runs before a download and skips leased entries,
+so it never removes a model that this or another job has fetched and may still be loading;
+leases older than ``lease_seconds`` are treated as left behind by a crashed job. An entry that
+fails verification while another job holds a lease on it is left alone: the model is downloaded
+into a private folder instead, which ``release()`` removes.
+"""
+
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Union
+
+from .step_cache import StepCache, _directory_size, file_digest
+
+MODEL_DIR = "model"
+LEASE_DIR = "leases"
+DEFAULT_LEASE_SECONDS = 6 * 3600
+
+
+def client_scope(ml_client) -> str:
+    """Identify the workspace or registry an ``MLClient`` talks to."""
+    operation_scope = getattr(ml_client, "_operation_scope", None)
+    registry_name = getattr(operation_scope, "registry_name", None)
+    if registry_name:
+        return f"registry:{registry_name}"
+    return f"workspace:{ml_client.subscription_id}/{ml_client.resource_group_name}/{ml_client.workspace_name}"
+
+
+def model_key(scope: str, name: str, version: str) -> str:
+    return hashlib.sha256(f"{scope}\n{name}\n{version}".encode("utf-8")).hexdigest()
+
+
+def _manifest(root: Path) -> Dict[str, str]:
+    return {
+        path.relative_to(root).as_posix(): file_digest(path)
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+class ModelCache(StepCache):
+    def __init__(
+        self, cache_dir: Union[str, Path], max_bytes: int, lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ) -> None:
+        super().__init__(cache_dir, max_bytes)
+        self.lease_seconds = lease_seconds
+        self._leases: List[Path] = []
+        self._private_dirs: List[Path] = []
+
+    def _lease(self, entry_dir: Path) -> Path:
+        lease = entry_dir / LEASE_DIR / uuid.uuid4().hex
+        lease.parent.mkdir(parents=True, exist_ok=True)
+        lease.touch()
+        self._leases.append(lease)
+        return lease
+
+    def _drop_lease(self, lease: Path) -> None:
+        self._leases.remove(lease)
+        try:
+            lease.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _in_use(self, entry_dir: Path) -> bool:
+        now = time.time()
+        try:
+            return any(now - lease.stat().st_mtime < self.lease_seconds for lease in (entry_dir / LEASE_DIR).iterdir())
+        except OSError:
+            return False
+
+    def release(self) -> None:
+        """Drop the leases of every entry fetched so far, once their models have been loaded."""
+        for lease in list(self._leases):
+            self._drop_lease(lease)
+        for private_dir in self._private_dirs:
+            shutil.rmtree(private_dir, ignore_errors=True)
+        self._private_dirs = []
+
+    def _verified(self, entry_dir: Path) -> bool:
+        try:
+            entry = self._read_entry(entry_dir)
+        except (OSError, ValueError):
+            return False
+        model_dir = entry_dir / MODEL_DIR
+        return model_dir.is_dir() and _manifest(model_dir) == entry.get("files")
+
+    def _download(self, ml_client, key: str, name: str, version: str, target_dir: Path) -> None:
+        ml_client.models.download(name=name, version=version, download_path=str(target_dir / MODEL_DIR))
+        now = time.time()
+        self._write_entry(
+            target_dir,
+            {
+                "key": key,
+                "name": name,
+                "version": str(version),
+                "created": now,
+                "last_used": now,
+                "size_bytes": _directory_size(target_dir / MODEL_DIR),
+                "files": _manifest(target_dir / MODEL_DIR),
+            },
+        )
+
+    def fetch(self, ml_client, name: str, version: str) -> Path:
+        """Return the local folder of ``name``:``version``, downloading it on a miss.
+
+        The folder has the layout of ``ml_client.models.download``, i.e. ``<folder>/<name>/...``.
+        """
+        key = model_key(client_scope(ml_client), name, str(version))
+        entry_dir = self._entry_dir(key)
+        # Lease before verifying, so a concurrent eviction either sees the lease or fails the check.
+        lease = self._lease(entry_dir) if entry_dir.is_dir() else None
+        if self._verified(entry_dir):
+            entry = self._read_entry(entry_dir)
+            entry["last_used"] = time.time()
+            self._write_entry(entry_dir, entry)
+            print(f"Model cache hit for {name}:{version}")
+            return entry_dir / MODEL_DIR
+
+        print(f"Model cache miss for {name}:{version}; downloading")
+        if lease is not None:
+            self._drop_lease(lease)
+        if self._in_use(entry_dir):
+            # Another job leased this entry and may be loading it, so never replace it under that job.
+            private_dir = self.cache_dir / f".private-{uuid.uuid4().hex}"
+            self._private_dirs.append(private_dir)
+            self._download(ml_client, key, name, version, private_dir)
+            return private_dir / MODEL_DIR
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        # Make room before downloading; the entry being fetched is never evicted afterwards.
+        self.evict()
+        # Stage under a unique name and rename, so concurrent jobs never observe a partial entry.
+        staging_dir = self.cache_dir / f".staging-{uuid.uuid4().hex}"
+        try:
+            self._download(ml_client, key, name, version, staging_dir)
+            # The lease moves with the rename, so the entry is protected from the moment it appears.
+            staged_lease = self._lease(staging_dir)
+            self._leases[-1] = entry_dir / LEASE_DIR / staged_lease.name
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            if not self._verified(entry_dir):
+                raise
+            # Another job stored the same version first; lease its entry instead.
+            self._lease(entry_dir)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        return entry_dir / MODEL_DIR
@@ -0,0 +1,152 @@
+"""Content-addressed cache for pipeline step outputs.
+
+A cache key is the SHA-256 of the step script and the shared modules it uses, every input
+file's content digest and the arguments that influence the outputs. Each entry is stored as
+``<cache_dir>/<key>/<output>/`` next to an ``entry.json`` that records its size and last use;
+once the cache grows beyond ``max_bytes`` the least recently used entries are evicted.
+
+The cache directory must outlive a single job to be useful, e.g. a mounted datastore folder.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Collection, Dict, List, Mapping, Sequence, Union
+
+ENTRY_FILE = "entry.json"
+_READ_BLOCK_BYTES = 1 << 20
+
+PathLike = Union[str, Path]
+
+
+def file_digest(path: PathLike) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_READ_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_key(
+    script: PathLike,
+    inputs: Mapping[str, PathLike],
+    params: Mapping[str, object],
+    modules: Sequence[PathLike] = (),
+) -> str:
+    """Return the cache key for running ``script`` on ``inputs`` with ``params``.
+
+    ``modules`` lists the shared source files ``script`` imports, so editing them also invalidates entries.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"script:{file_digest(script)}\n".encode("utf-8"))
+    for module in modules:
+        digest.update(f"module:{Path(module).name}:{file_digest(module)}\n".encode("utf-8"))
+    for name in sorted(inputs):
+        digest.update(f"input:{name}:{file_digest(inputs[name])}\n".encode("utf-8"))
+    digest.update(f"params:{json.dumps(dict(params), sort_keys=True, default=str)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _directory_size(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+class StepCache:
+    def __init__(self, cache_dir: PathLike, max_bytes: int) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be a positive number of bytes")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _read_entry(self, entry_dir: Path) -> Dict[str, object]:
+        with open(entry_dir / ENTRY_FILE, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _write_entry(self, entry_dir: Path, entry: Dict[str, object]) -> None:
+        # Write a temporary file and replace, so concurrent readers never see a half-written entry.
+        temporary = entry_dir / f".{ENTRY_FILE}.{uuid.uuid4().hex}"
+        try:
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle)
+            os.replace(temporary, entry_dir / ENTRY_FILE)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+
+    def restore(self, key: str, outputs: Mapping[str, PathLike]) -> bool:
+        """Copy a cached entry into ``outputs``; returns False on a cache miss."""
+        entry_dir = self._entry_dir(key)
+        try:
+            entry = self._read_entry(entry_dir)
+        except (OSError, ValueError):
+            return False
+        if any(not (entry_dir / name).is_dir() for name in outputs):
+            return False
+
+        for name, destination in outputs.items():
+            shutil.copytree(entry_dir / name, destination, dirs_exist_ok=True)
+        entry["last_used"] = time.time()
+        self._write_entry(entry_dir, entry)
+        return True
+
+    def store(self, key: str, outputs: Mapping[str, PathLike]) -> None:
+        """Copy ``outputs`` into the cache under ``key`` and evict down to ``max_bytes``."""
+        entry_dir = self._entry_dir(key)
+        if entry_dir.exists():
+            return
+
+        # Stage under a unique name and rename, so concurrent jobs never observe a partial entry.
+        staging_dir = self.cache_dir / f".staging-{uuid.uuid4().hex}"
+        try:
+            for name, source in outputs.items():
+                shutil.copytree(source, staging_dir / name)
+            now = time.time()
+            self._write_entry(
+                staging_dir,
+                {"key": key, "created": now, "last_used": now, "size_bytes": _directory_size(staging_dir)},
+            )
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            if not entry_dir.exists():
+                raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self.evict(keep=[key])
+
+    def _in_use(self, entry_dir: Path) -> bool:
+        return False
+
+    def evict(self, keep: Collection[str] = ()) -> List[str]:
+        """Remove least recently used entries until the cache fits in ``max_bytes``.
+
+        Entries whose key is in ``keep`` or that ``_in_use`` reports as being read are never removed.
+        """
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.name.startswith(".") or not entry_dir.is_dir():
+                continue
+            try:
+                entry = self._read_entry(entry_dir)
+            except (OSError, ValueError):
+                continue
+            entries.append((float(entry.get("last_used", 0)), int(entry.get("size_bytes", 0)), entry_dir))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, entry_dir in sorted(entries, key=lambda item: item[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            if entry_dir.name in keep or self._in_use(entry_dir):
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+            evicted.append(entry_dir.name)
+        return evicted
@@ -1,100 +1,91 @@
 import argparse
+import json
 import pandas as pd
+import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
-import mlflow
-import mltable
-
-mlflow.sklearn.autolog()
-
-#### Client Getting ML Client
-print("Initializing MLclient")
-from azure.identity import DefaultAzureCredential,ManagedIdentityCredential,AzureCliCredential
-from azure.ai.ml import automl, Input, MLClient, command
-from azureml.core.run import Run
-
-msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-credential = ManagedIdentityCredential(client_id=msi_client_id)
-credential.get_token("https://management.azure.com/.default")
-run = Run.get_context(allow_offline=False)
-ws = run.experiment.workspace
-ml_client = MLClient(credential=credential,subscription_id=ws._subscription_id,resource_group_name=ws._resource_group,workspace_name=ws._workspace_name,)
-####
-
-
-parser = argparse.ArgumentParser("predict")
-parser.add_argument("--model_input", type=str, help="Path of input model")
-parser.add_argument("--test_data", type=str, help="Path to test data")
-parser.add_argument("--model_name", type=str, help="Registered Model Name")
-parser.add_argument("--predictions", type=str, help="Path of predictions")
-parser.add_argument("--compare_output", type=str, help="Path of predictions")
-
-args = parser.parse_args()
-
-print("hello scoring world...")
-
-lines = [
-    f"Model path: {args.model_input}",
-    f"Model Name: {args.model_name}",
-    f"Test data path: {args.test_data}",
-    f"Predictions path: {args.predictions}",
-    f"Predictions path: {args.compare_output}",
-]
+from typing import Dict, Mapping, Optional, Tuple
 
-for line in lines:
-    print(line)
-
-# Load and split the test data
-
-print("mounted_path files: ")
-arr = os.listdir(args.test_data)
-
-print(arr)
-test_data = mltable.load(str(Path(args.test_data))).to_pandas_dataframe() ## pd.read_csv(Path(args.test_data) / "test_data.csv")
-testy = test_data["cost"]
-# testX = test_data.drop(['cost'], axis=1)
-testX = test_data[
-    [
-        "distance",
-        "dropoff_latitude",
-        "dropoff_longitude",
-        "passengers",
-        "pickup_latitude",
-        "pickup_longitude",
-        "store_forward",
-        "vendor",
-        "pickup_weekday",
-        "pickup_month",
-        "pickup_monthday",
-        "pickup_hour",
-        "pickup_minute",
-        "pickup_second",
-        "dropoff_weekday",
-        "dropoff_month",
-        "dropoff_monthday",
-        "dropoff_hour",
-        "dropoff_minute",
-        "dropoff_second",
-    ]
+
+feature_columns = [
+    "distance",
+    "dropoff_latitude",
+    "dropoff_longitude",
+    "passengers",
+    "pickup_latitude",
+    "pickup_longitude",
+    "store_forward",
+    "vendor",
+    "pickup_weekday",
+    "pickup_month",
+    "pickup_monthday",
+    "pickup_hour",
+    "pickup_minute",
+    "pickup_second",
+    "dropoff_weekday",
+    "dropoff_month",
+    "dropoff_monthday",
+    "dropoff_hour",
+    "dropoff_minute",
+    "dropoff_second",
 ]
-print(testX.shape)
-print(testX.columns)
 
-##--------------------------------------------------------------------------------------------------------
+CANDIDATE = "candidate"
+BASELINE = "baseline"
+METRICS_FILE = "metrics.json"
+GATE_METRICS = ("accuracy", "macro_f1")
+
+
+def prediction_column(label: str) -> str:
+    if label == CANDIDATE:
+        return "predicted_cost"
+    return f"{label}_predicted_cost"
+
+
+def _load_and_predict(model_uri: str, features: pd.DataFrame) -> np.ndarray:
+    import mlflow
+
+    model = mlflow.pyfunc.load_model(model_uri)
+    return np.asarray(model.predict(features))
+
+
+def evaluate_models(
+    model_uris: Mapping[str, str],
+    features: pd.DataFrame,
+    actual: pd.Series,
+    max_workers: Optional[int] = None,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+    """Load every model concurrently and score them all against one shared feature frame.
+
+    Returns the predictions and the accuracy of each model, keyed by its label. A baseline that
+    fails to load or predict is left out of both; a failing candidate raises.
+    """
+    from sklearn.metrics import accuracy_score
 
-from sklearn.metrics import mean_squared_error, r2_score,accuracy_score
+    # Threads share the feature frame read-only, so N models cost N predict calls but one copy of the features.
+    with ThreadPoolExecutor(max_workers=max_workers or len(model_uris) or 1) as pool:
+        futures = {label: pool.submit(_load_and_predict, uri, features) for label, uri in model_uris.items()}
+        predictions = {}
+        for label, future in futures.items():
+            try:
+                predictions[label] = future.result()
+            except Exception as e:
+                if label == CANDIDATE:
+                    raise
+                print(f"Skipping {label} model, it could not be loaded or scored: {e}")
+    metrics = {label: float(accuracy_score(actual, predicted)) for label, predicted in predictions.items()}
+    return predictions, metrics
 
-# Load the new model from input port
-new_model = mlflow.pyfunc.load_model(str(Path(args.model_input) / "outputs")+"/"+"mlflow-model")
 
-# Make predictions with the new model
-new_model_predictions = new_model.predict(testX)
-new_model_accuracy = accuracy_score(testy, new_model_predictions)
+def build_output(features: pd.DataFrame, actual: pd.Series, predictions: Mapping[str, np.ndarray]) -> pd.DataFrame:
+    columns = {column: features[column].to_numpy() for column in features.columns}
+    columns["actual_cost"] = actual.to_numpy()
+    for label, predicted in predictions.items():
+        columns[prediction_column(label)] = predicted
+    return pd.DataFrame(columns, index=features.index)
 
-print(f"New model accuracy: {new_model_accuracy}")
 
-##--------------------------------------------------------------------------------------------------------
 def compare_metrics(baseline_model_accuracy, new_model_accuracy):
     if new_model_accuracy >= baseline_model_accuracy:
         print("Candidate model improved upon the baseline model (Accuracy):")
@@ -107,47 +98,199 @@ def compare_metrics(baseline_model_accuracy, new_model_accuracy):
         print(f"New model accuracy: {new_model_accuracy}")
         raise Exception("candidate model does not perform better than baseline model")
 
-# Check if a baseline model exists for comparison
-target_for_current_downloaded_model = "downloaded_model"
-baseline_exists = False
-
-try:
-    models = ml_client.models.list(name=args.model_name)
-    model_list = [model for model in models]
-    if model_list:
-        baseline_exists = True
-        latest_model_version = model_list[0].version
-        print(f"Found existing model version: {latest_model_version}")
-        
-        # Download the baseline model
-        ml_client.models.download(name=args.model_name, version=latest_model_version, download_path=target_for_current_downloaded_model)
-        
-        full_path_to_cwd = os.path.realpath('.')
-        full_path_to_model = os.path.join(full_path_to_cwd, target_for_current_downloaded_model, args.model_name, "mlflow-model")
-        
-        # Load and evaluate baseline model
-        baseline_model = mlflow.pyfunc.load_model(full_path_to_model)
-        baseline_predictions = baseline_model.predict(testX)
-        baseline_model_accuracy = accuracy_score(testy, baseline_predictions)
-        
-        print(f"Baseline model accuracy: {baseline_model_accuracy}")
-        
-        # Compare models
-        compare_metrics(baseline_model_accuracy, new_model_accuracy)
-        
-except Exception as e:
-    print(f"No baseline model found for comparison: {e}")
-    print("This appears to be the first model - skipping baseline comparison.")
-
-# Create output data with predictions
-output_data = pd.DataFrame(testX)
-output_data["actual_cost"] = testy
-output_data["predicted_cost"] = new_model_predictions
-
-if baseline_exists:
-    output_data["baseline_predicted_cost"] = baseline_predictions
-
-print(f"Output data shape: {output_data.shape}")
-
-# Save the output data
-output_data.to_csv((Path(args.compare_output) / "predictions.csv"), index=False)
+
+def paired_bootstrap(
+    actual: np.ndarray,
+    candidate: np.ndarray,
+    baseline: np.ndarray,
+    resamples: int = 2000,
+    seed: int = 42,
+    confidence: float = 0.95,
+) -> Dict[str, Dict[str, float]]:
+    """Paired bootstrap confidence intervals of candidate minus baseline accuracy and macro-F1.
+
+    Resampling rows with replacement only changes how often each distinct (actual, candidate,
+    baseline) label triple occurs, so every resample is drawn at once as a multinomial count
+    vector over those triples. The cost scales with resamples x distinct triples, not rows.
+    """
+    from common.classification_metrics import confusion_metrics
+
+    n = len(actual)
+    labels, codes = np.unique(
+        np.concatenate([np.asarray(actual), np.asarray(candidate), np.asarray(baseline)]).astype(str),
+        return_inverse=True,
+    )
+    k = len(labels)
+    actual_codes, candidate_codes, baseline_codes = codes[:n], codes[n:2 * n], codes[2 * n:]
+    triples, counts = np.unique((actual_codes * k + candidate_codes) * k + baseline_codes, return_counts=True)
+
+    rng = np.random.default_rng(seed)
+    # Row 0 holds the observed counts, the rest are bootstrap resamples.
+    weights = np.vstack([counts, rng.multinomial(n, counts / n, size=resamples)]).astype("float64")
+    cells = np.arange(len(triples))
+    triple_actual = triples // (k * k)
+    differences = {}
+    for model_codes in (triples // k % k, triples % k):
+        # One-hot map from each triple to its (actual, predicted) cell of this model's confusion matrix.
+        to_cell = np.zeros((len(triples), k * k))
+        to_cell[cells, triple_actual * k + model_codes] = 1.0
+        model_metrics = confusion_metrics((weights @ to_cell).reshape(-1, k, k))
+        for metric in GATE_METRICS:
+            values = model_metrics[metric]
+            differences[metric] = values if metric not in differences else differences[metric] - values
+
+    tail = (1 - confidence) / 2 * 100
+    return {
+        metric: {
+            "difference": float(values[0]),
+            "lower": float(np.percentile(values[1:], tail)),
+            "upper": float(np.percentile(values[1:], 100 - tail)),
+        }
+        for metric, values in differences.items()
+    }
+
+
+def compare_bootstrap(interval: Dict[str, float], metric: str, confidence: float) -> bool:
+    print(f"Candidate minus baseline {metric}: {interval['difference']:.4f} "
+          f"({confidence:.0%} CI {interval['lower']:.4f} to {interval['upper']:.4f})")
+    if interval["upper"] < 0:
+        print("Candidate model is significantly worse than the baseline model")
+        raise Exception(f"candidate model {metric} is significantly below the baseline model")
+    print("Candidate model is not significantly worse than the baseline model")
+    return True
+
+
+def _version_key(version: str) -> Tuple[int, str]:
+    # Numeric versions sort numerically ("10" after "9"); any other string sorts below them.
+    return (int(version), "") if str(version).isdigit() else (-1, str(version))
+
+
+def baseline_model_uris(ml_client, model_name: str, versions: int, download_root: str, model_cache=None) -> Dict[str, str]:
+    """Resolve the ``versions`` highest registered versions of ``model_name`` to local folders.
+
+    Models come from ``model_cache`` when given and are downloaded under ``download_root`` otherwise.
+    The latest version is labelled ``baseline`` and older ones ``baseline_v<version>``.
+    """
+    model_list = sorted(ml_client.models.list(name=model_name), key=lambda model: _version_key(model.version), reverse=True)
+    model_uris = {}
+    for index, model in enumerate(model_list[:versions]):
+        print(f"Found existing model version: {model.version}")
+        if model_cache is not None:
+            download_path = str(model_cache.fetch(ml_client, model_name, model.version))
+        else:
+            download_path = os.path.join(os.path.realpath(download_root), str(model.version))
+            ml_client.models.download(name=model_name, version=model.version, download_path=download_path)
+        label = BASELINE if index == 0 else f"{BASELINE}_v{model.version}"
+        model_uris[label] = os.path.join(download_path, model_name, "mlflow-model")
+    return model_uris
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("predict")
+    parser.add_argument("--model_input", type=str, help="Path of input model")
+    parser.add_argument("--test_data", type=str, help="Path to test data")
+    parser.add_argument("--model_name", type=str, help="Registered Model Name")
+    parser.add_argument("--predictions", type=str, help="Path of predictions")
+    parser.add_argument("--compare_output", type=str, help="Path of predictions")
+    parser.add_argument("--baseline_versions", type=int, default=1, help="Most recent registered versions to evaluate; the latest one gates the candidate")
+    parser.add_argument("--model_cache_dir", type=str, required=False, help="Persistent folder for downloaded baseline models; downloads are not cached when omitted")
+    parser.add_argument("--model_cache_max_gb", type=float, default=10.0, help="Size bound of the model cache before LRU eviction")
+    parser.add_argument("--gate_mode", type=str, choices=["point", "bootstrap"], default="point", help="Gate on point accuracy or on a paired bootstrap confidence interval")
+    parser.add_argument("--gate_metric", type=str, choices=list(GATE_METRICS), default="accuracy", help="Metric the bootstrap gate tests")
+    parser.add_argument("--bootstrap_resamples", type=int, default=2000, help="Bootstrap resamples for the confidence intervals")
+    parser.add_argument("--bootstrap_seed", type=int, default=42, help="Random seed of the bootstrap resampling")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the bootstrap intervals")
+
+    args = parser.parse_args()
+    if args.baseline_versions < 0:
+        raise SystemExit("baseline_versions must be zero or a positive integer")
+    if args.bootstrap_resamples < 1 or not 0 < args.confidence < 1:
+        raise SystemExit("bootstrap_resamples must be positive and confidence between 0 and 1")
+
+    #### Client Getting ML Client
+    print("Initializing MLclient")
+    from common.ml_clients import get_workspace_client
+    import mltable
+
+    ml_client = get_workspace_client()
+    ####
+
+    print("hello scoring world...")
+
+    lines = [
+        f"Model path: {args.model_input}",
+        f"Model Name: {args.model_name}",
+        f"Test data path: {args.test_data}",
+        f"Predictions path: {args.predictions}",
+        f"Predictions path: {args.compare_output}",
+    ]
+
+    for line in lines:
+        print(line)
+
+    # Load and split the test data
+
+    print("mounted_path files: ")
+    arr = os.listdir(args.test_data)
+
+    print(arr)
+    test_data = mltable.load(str(Path(args.test_data))).to_pandas_dataframe() ## pd.read_csv(Path(args.test_data) / "test_data.csv")
+    testy = test_data["cost"]
+    testX = test_data[feature_columns]
+    print(testX.shape)
+    print(testX.columns)
+
+    # The candidate from the input port plus the registered baselines, all scored in one pass
+    model_uris = {CANDIDATE: str(Path(args.model_input) / "outputs")+"/"+"mlflow-model"}
+    model_cache = None
+    if args.model_cache_dir:
+        from common.model_cache import ModelCache
+
+        model_cache = ModelCache(args.model_cache_dir, int(args.model_cache_max_gb * 1024 ** 3))
+    try:
+        model_uris.update(
+            baseline_model_uris(ml_client, args.model_name, args.baseline_versions, "downloaded_model", model_cache)
+        )
+    except Exception as e:
+        print(f"No baseline model found for comparison: {e}")
+        print("This appears to be the first model - skipping baseline comparison.")
+
+    try:
+        predictions, metrics = evaluate_models(model_uris, testX, testy)
+    finally:
+        if model_cache is not None:
+            model_cache.release()
+    for label, accuracy in metrics.items():
+        print(f"{label} model accuracy: {accuracy}")
+    if BASELINE in model_uris and BASELINE not in metrics:
+        print("The latest registered model could not be evaluated - skipping baseline comparison.")
+
+    output_data = build_output(testX, testy, predictions)
+    print(f"Output data shape: {output_data.shape}")
+
+    report = {label: {"accuracy": accuracy} for label, accuracy in metrics.items()}
+    intervals = None
+    if BASELINE in metrics and args.gate_mode == "bootstrap":
+        intervals = paired_bootstrap(
+            testy.to_numpy(),
+            predictions[CANDIDATE],
+            predictions[BASELINE],
+            args.bootstrap_resamples,
+            args.bootstrap_seed,
+            args.confidence,
+        )
+        report["bootstrap"] = {"confidence": args.confidence, "resamples": args.bootstrap_resamples, **intervals}
+
+    # Save the output data and the per-model metrics
+    output_data.to_csv((Path(args.compare_output) / "predictions.csv"), index=False)
+    with open(Path(args.compare_output) / METRICS_FILE, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    if intervals is not None:
+        compare_bootstrap(intervals[args.gate_metric], args.gate_metric, args.confidence)
+    elif BASELINE in metrics:
+        compare_metrics(metrics[BASELINE], metrics[CANDIDATE])
+
+
+if __name__ == "__main__":
+    main()
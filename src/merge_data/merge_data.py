@@ -1,16 +1,11 @@
 import argparse
 from pathlib import Path
+from typing import Dict, Iterator
+
 import pandas as pd
 # this script is good
-parser = argparse.ArgumentParser(description="Merge the green and yellow taxi data")
-parser.add_argument("--raw_data_green", type=str, help="Path to green data")
-parser.add_argument("--raw_data_yellow", type=str, help="Path to yellow data")
-parser.add_argument("--merged_data", type=str, help="Path to merged data output")
-
-args = parser.parse_args()
-df_green_taxi = pd.read_csv(args.raw_data_green)
-df_yellow_taxi = pd.read_csv(args.raw_data_yellow)
 
+from common import column_types
 
 columns_taxi_data_combined = [
     "cost",
@@ -40,9 +35,6 @@ green_columns_remap =    {
         "tripDistance": "distance",
     }
 
-df_green_taxi = df_green_taxi.rename(columns=green_columns_remap) 
-df_green_taxi = df_green_taxi[columns_taxi_data_combined]
-
 yellow_columns_remap = {
         "vendorID": "vendor",
         "tpepPickupDateTime": "pickup_datetime",
@@ -56,12 +48,176 @@ yellow_columns_remap = {
         "fareAmount": "cost",
         "tripDistance": "distance",
     }
-df_yellow_taxi = df_yellow_taxi.rename(columns=yellow_columns_remap)
-df_yellow_taxi = df_yellow_taxi[columns_taxi_data_combined]
 
-df_combined_taxi = pd.concat([df_yellow_taxi, df_green_taxi]) \
-                    .dropna(how="all") \
-                    .reset_index(drop=True)
+MERGED_FILE_STEM = "merged_taxi_data"
+
+# Explicit column types for the Parquet output so downstream steps never re-infer dtypes. Integer
+# codes such as vendor stay integers and only string flags become categoricals, so the Parquet
+# output reads back with the same logical types as the CSV output.
+merged_schema = {
+    "cost": "float64",
+    "distance": "float32",
+    "dropoff_datetime": "datetime64[ns]",
+    "dropoff_latitude": "float32",
+    "dropoff_longitude": "float32",
+    "passengers": "Int8",
+    "pickup_datetime": "datetime64[ns]",
+    "pickup_latitude": "float32",
+    "pickup_longitude": "float32",
+    "store_forward": "category",
+    "vendor": "Int8",
+}
+
+
+def _remap_columns(df: pd.DataFrame, columns_remap: Dict[str, str]) -> pd.DataFrame:
+    return df.rename(columns=columns_remap)[columns_taxi_data_combined]
+
+
+def apply_merged_schema(df: pd.DataFrame) -> pd.DataFrame:
+    typed = {}
+    for column, dtype in merged_schema.items():
+        if dtype == "category":
+            typed[column] = column_types.to_category(df[column])
+        elif dtype.startswith("datetime64"):
+            typed[column] = column_types.parse_timestamps(df[column])
+        else:
+            typed[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+    return pd.DataFrame(typed, index=df.index)[columns_taxi_data_combined]
+
+
+def merged_output_file(merged_data: str, output_format: str) -> Path:
+    return Path(merged_data) / f"{MERGED_FILE_STEM}.{output_format}"
+
+
+def merge_in_memory(raw_data_green: str, raw_data_yellow: str) -> pd.DataFrame:
+    df_green_taxi = _remap_columns(pd.read_csv(raw_data_green), green_columns_remap)
+    df_yellow_taxi = _remap_columns(pd.read_csv(raw_data_yellow), yellow_columns_remap)
+
+    return pd.concat([df_yellow_taxi, df_green_taxi]) \
+             .dropna(how="all") \
+             .reset_index(drop=True)
+
+
+def _iter_source_chunks(path: str, columns_remap: Dict[str, str], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # Only the remapped source columns are parsed, so chunk memory is bounded by
+    # chunk_rows x 11 columns regardless of how wide the raw TLC export is.
+    reader = pd.read_csv(path, usecols=list(columns_remap), chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = _remap_columns(chunk, columns_remap).dropna(how="all")
+        if not chunk.empty:
+            yield chunk
+
+
+def _iter_merged_chunks(raw_data_green: str, raw_data_yellow: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for path, columns_remap in ((raw_data_yellow, yellow_columns_remap), (raw_data_green, green_columns_remap)):
+        yield from _iter_source_chunks(path, columns_remap, chunk_rows)
+
+
+def _stream_csv(chunks: Iterator[pd.DataFrame], output_file: Path) -> int:
+    rows_written = 0
+    write_header = True
+    with open(output_file, "w", encoding="utf-8", newline="") as handle:
+        for chunk in chunks:
+            chunk.to_csv(handle, index=False, header=write_header)
+            write_header = False
+            rows_written += len(chunk)
+        if write_header:
+            pd.DataFrame(columns=columns_taxi_data_combined).to_csv(handle, index=False)
+    return rows_written
+
+
+def _stream_parquet(chunks: Iterator[pd.DataFrame], output_file: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Every chunk is cast to the schema of an empty typed frame, so row groups stay
+    # compatible even when a chunk happens to be all-null in some column.
+    empty_frame = pd.DataFrame({column: pd.Series(dtype="object") for column in columns_taxi_data_combined})
+    schema = pa.Schema.from_pandas(apply_merged_schema(empty_frame), preserve_index=False)
+    rows_written = 0
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(apply_merged_schema(chunk), schema=schema, preserve_index=False))
+            rows_written += len(chunk)
+    return rows_written
+
+
+def merge_streaming(
+    raw_data_green: str,
+    raw_data_yellow: str,
+    output_file: Path,
+    chunk_rows: int,
+    output_format: str = "csv",
+) -> int:
+    """Append yellow then green chunks to ``output_file``; returns the number of rows written."""
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1 for streaming merge")
+
+    chunks = _iter_merged_chunks(raw_data_green, raw_data_yellow, chunk_rows)
+    if output_format == "parquet":
+        return _stream_parquet(chunks, output_file)
+    return _stream_csv(chunks, output_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge the green and yellow taxi data")
+    parser.add_argument("--raw_data_green", type=str, help="Path to green data")
+    parser.add_argument("--raw_data_yellow", type=str, help="Path to yellow data")
+    parser.add_argument("--merged_data", type=str, help="Path to merged data output")
+    parser.add_argument(
+        "--chunk_rows",
+        type=int,
+        default=0,
+        help="Rows per chunk when streaming the merge; 0 loads each source fully in memory",
+    )
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        choices=["csv", "parquet"],
+        default="csv",
+        help="File format of the merged output; parquet applies the typed merged schema",
+    )
+    parser.add_argument("--cache_dir", type=str, required=False, help="Persistent folder for the step output cache; caching is off when omitted")
+    parser.add_argument("--cache_max_gb", type=float, default=20.0, help="Size bound of the step cache before LRU eviction")
+
+    args = parser.parse_args()
+    if args.chunk_rows < 0:
+        raise SystemExit("chunk_rows must be zero or a positive integer")
+
+    cache = None
+    if args.cache_dir:
+        from common.step_cache import StepCache, compute_key
+
+        cache = StepCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
+        cache_key = compute_key(
+            __file__,
+            {"raw_data_green": args.raw_data_green, "raw_data_yellow": args.raw_data_yellow},
+            {"chunk_rows": args.chunk_rows, "output_format": args.output_format},
+            modules=[column_types.__file__],
+        )
+        if cache.restore(cache_key, {"merged_data": args.merged_data}):
+            print(f"Restored merged data from step cache entry {cache_key}")
+            return
+        print(f"Step cache miss for {cache_key}; merging")
+
+    output_file = merged_output_file(args.merged_data, args.output_format)
+    print(f'writing merged data to {args.merged_data}')
+    if args.chunk_rows:
+        print(f"Streaming merge with chunks of {args.chunk_rows} rows")
+        rows_written = merge_streaming(
+            args.raw_data_green, args.raw_data_yellow, output_file, args.chunk_rows, args.output_format
+        )
+        print(f"Merged {rows_written} rows")
+    else:
+        df_combined_taxi = merge_in_memory(args.raw_data_green, args.raw_data_yellow)
+        if args.output_format == "parquet":
+            apply_merged_schema(df_combined_taxi).to_parquet(output_file, index=False)
+        else:
+            df_combined_taxi.to_csv(output_file, index=False)
+
+    if cache is not None:
+        cache.store(cache_key, {"merged_data": args.merged_data})
+
 
-print(f'writing merged data to {args.merged_data}')
-df_combined_taxi.to_csv(Path(args.merged_data) / "merged_taxi_data.csv", index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
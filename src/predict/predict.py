@@ -1,80 +1,157 @@
 import argparse
 import pandas as pd
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
-import mlflow
-import mltable
+from typing import List, Optional, Tuple
 
-mlflow.sklearn.autolog()
+from common.data_files import iter_data_chunks
 
+feature_columns = [
+    "distance",
+    "dropoff_latitude",
+    "dropoff_longitude",
+    "passengers",
+    "pickup_latitude",
+    "pickup_longitude",
+    "store_forward",
+    "vendor",
+    "pickup_weekday",
+    "pickup_month",
+    "pickup_monthday",
+    "pickup_hour",
+    "pickup_minute",
+    "pickup_second",
+    "dropoff_weekday",
+    "dropoff_month",
+    "dropoff_monthday",
+    "dropoff_hour",
+    "dropoff_minute",
+    "dropoff_second",
+]
 
-parser = argparse.ArgumentParser("predict")
-parser.add_argument("--model_input", type=str, help="Path of input model")
-parser.add_argument("--test_data", type=str, help="Path to test data")
-parser.add_argument("--predictions", type=str, help="Path of predictions")
+# Model loaded once per worker process by _init_worker.
+_worker_model = None
 
-args = parser.parse_args()
 
-print("hello scoring world...")
+def _model_path(model_input: str) -> str:
+    return str(Path(model_input) / "outputs")+"/"+"mlflow-model"
+
+
+def _init_worker(model_path: str) -> None:
+    import mlflow
+
+    global _worker_model
+    _worker_model = mlflow.pyfunc.load_model(model_path)
+
+
+def shard_path(predictions: str, batch_index: int) -> Path:
+    return Path(predictions) / f"predictions-{batch_index:05d}.csv"
+
+
+def predict_batch(model, batch: pd.DataFrame) -> pd.DataFrame:
+    """Score one batch and return its features with predicted_cost and actual_cost columns."""
+    output_data = batch[feature_columns].copy()
+    output_data["predicted_cost"] = model.predict(output_data)
+    output_data["actual_cost"] = batch["cost"].to_numpy()
+    return output_data
+
+
+def _score_shard(task: Tuple[int, pd.DataFrame, str]) -> int:
+    batch_index, batch, predictions = task
+    predict_batch(_worker_model, batch).to_csv(shard_path(predictions, batch_index), index=False)
+    return len(batch)
+
+
+def predict_in_batches(
+    model_path: str,
+    test_data: str,
+    predictions: str,
+    batch_rows: int,
+    workers: Optional[int] = None,
+) -> Tuple[int, float]:
+    """Score the test data in row batches on a process pool, one output shard per batch.
+
+    Returns the number of rows scored and the elapsed seconds.
+    """
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    rows_scored = 0
+    pending: List = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        for batch_index, batch in enumerate(iter_data_chunks(test_data, batch_rows)):
+            pending.append(pool.submit(_score_shard, (batch_index, batch, predictions)))
+            # Bound the batches held in memory to two per worker.
+            if len(pending) >= 2 * workers:
+                rows_scored += pending.pop(0).result()
+                elapsed = time.perf_counter() - started
+                print(f"scored {rows_scored} rows ({rows_scored / max(elapsed, 1e-9):,.0f} rows/s)")
+        for future in pending:
+            rows_scored += future.result()
+    return rows_scored, time.perf_counter() - started
 
-lines = [
-    f"Model path: {args.model_input}",
-    f"Test data path: {args.test_data}",
-    f"Predictions path: {args.predictions}",
-]
 
-for line in lines:
-    print(line)
-
-# Load and split the test data
-
-print("mounted_path files: ")
-arr = os.listdir(args.test_data)
-
-print(arr)
-test_data = mltable.load(str(Path(args.test_data))).to_pandas_dataframe() ## pd.read_csv(Path(args.test_data) / "test_data.csv")
-testy = test_data["cost"]
-# testX = test_data.drop(['cost'], axis=1)
-testX = test_data[
-    [
-        "distance",
-        "dropoff_latitude",
-        "dropoff_longitude",
-        "passengers",
-        "pickup_latitude",
-        "pickup_longitude",
-        "store_forward",
-        "vendor",
-        "pickup_weekday",
-        "pickup_month",
-        "pickup_monthday",
-        "pickup_hour",
-        "pickup_minute",
-        "pickup_second",
-        "dropoff_weekday",
-        "dropoff_month",
-        "dropoff_monthday",
-        "dropoff_hour",
-        "dropoff_minute",
-        "dropoff_second",
+def predict_in_memory(model_path: str, test_data_path: str, predictions: str) -> None:
+    import mlflow
+    import mltable
+
+    test_data = mltable.load(str(Path(test_data_path))).to_pandas_dataframe() ## pd.read_csv(Path(args.test_data) / "test_data.csv")
+    testX = test_data[feature_columns]
+    print(testX.shape)
+    print(testX.columns)
+
+    # Load the model from input port
+    model = mlflow.pyfunc.load_model(model_path)
+
+    # Make predictions on testX data and record them in a column named predicted_cost
+    # Compare predictions to actuals
+    output_data = predict_batch(model, test_data)
+    print(output_data.shape)
+
+    # Save the output data with feature columns, predicted cost, and actual cost in csv file
+    output_data.to_csv((Path(predictions) / "predictions.csv"),index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("predict")
+    parser.add_argument("--model_input", type=str, help="Path of input model")
+    parser.add_argument("--test_data", type=str, help="Path to test data")
+    parser.add_argument("--predictions", type=str, help="Path of predictions")
+    parser.add_argument("--batch_rows", type=int, default=0, help="Rows per inference batch; 0 scores the whole test set at once")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for batch inference; 0 uses the CPU count")
+
+    args = parser.parse_args()
+    if args.batch_rows < 0 or args.workers < 0:
+        raise SystemExit("batch_rows and workers must be zero or positive integers")
+
+    print("hello scoring world...")
+
+    lines = [
+        f"Model path: {args.model_input}",
+        f"Test data path: {args.test_data}",
+        f"Predictions path: {args.predictions}",
     ]
-]
-print(testX.shape)
-print(testX.columns)
 
-# Load the model from input port
-#folder = str(Path(args.model_input) / "outputs")+"/"+"mlflow-model"
-model = mlflow.pyfunc.load_model(str(Path(args.model_input) / "outputs")+"/"+"mlflow-model")
+    for line in lines:
+        print(line)
+
+    # Load and split the test data
+
+    print("mounted_path files: ")
+    arr = os.listdir(args.test_data)
+
+    print(arr)
 
-# Make predictions on testX data and record them in a column named predicted_cost
-predictions = model.predict(testX)
-testX["predicted_cost"] = predictions
-print(testX.shape)
+    model_path = _model_path(args.model_input)
+    if args.batch_rows:
+        rows_scored, elapsed = predict_in_batches(
+            model_path, args.test_data, args.predictions, args.batch_rows, args.workers
+        )
+        print(f"Batch inference scored {rows_scored} rows in {elapsed:.2f}s ({rows_scored / max(elapsed, 1e-9):,.0f} rows/s)")
+    else:
+        predict_in_memory(model_path, args.test_data, args.predictions)
 
-# Compare predictions to actuals (testy)
-output_data = pd.DataFrame(testX)
-output_data["actual_cost"] = testy
 
-# Save the output data with feature columns, predicted cost, and actual cost in csv file
-output_data = output_data.to_csv((Path(args.predictions) / "predictions.csv"),index=False)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
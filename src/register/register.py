@@ -19,212 +19,256 @@ COMMON USAGE:
 """
 
 import argparse
+import hashlib
 import json
-import pandas as pd
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
-import mlflow
-import mltable
-from azure.ai.ml.constants import AssetTypes
-
-# import required libraries
-from azure.ai.ml.entities import (
-    ManagedOnlineEndpoint,
-    ManagedOnlineDeployment,
-    Model,
-    Environment,
-    CodeConfiguration,
-    ProbeSettings,
-)
-from azure.ai.ml.constants import ModelType
-
-
-mlflow.sklearn.autolog()
-
-
-parser = argparse.ArgumentParser("register")
-parser.add_argument("--model_input", type=str, help="Path of input model")
-parser.add_argument("--model_name", type=str, help="Model_name_to_register")
-parser.add_argument("--compare_output", type=str, help="Placeholder to define order")
-parser.add_argument("--register_output", type=str, help="Placeholder to define order")
-parser.add_argument("--registry", type=str, required=False, help="Placeholder to define order")
-
-args = parser.parse_args()
-
-#### Registering model
-print("Registering model")
-
-lines = [
-    f"Model name: {args.model_name}",
-    f"Model path: {args.model_input}",
-    f"Model path: {args.registry}",
-    f"Model path: {args.compare_output}",
-    f"Model path: {args.register_output}",
-]
-
-for line in lines:
-    print(line)
-
-#### Client Getting ML Client
-print("Initializing MLclient")
-from azure.identity import DefaultAzureCredential,ManagedIdentityCredential,AzureCliCredential
-from azure.ai.ml import automl, Input, MLClient, command
-from azureml.core.run import Run
-
-msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-credential = ManagedIdentityCredential(client_id=msi_client_id)
-credential.get_token("https://management.azure.com/.default")
-run = Run.get_context(allow_offline=False)
-ws = run.experiment.workspace
-
-ml_client_workspace = MLClient(credential=credential,subscription_id=ws._subscription_id,resource_group_name=ws._resource_group,workspace_name=ws._workspace_name,)
-
-####
-
-#### Client Getting ML Client
-print("Initializing MLclient")
-
-model_name = args.model_name
-
-base_path = Path(args.model_input)
-candidate_paths = [
-    base_path / "outputs" / "mlflow-model",
-    base_path / "mlflow-model",
-    base_path,
-]
-
-mlflow_model_path = None
-for candidate in candidate_paths:
-    if (candidate / "MLmodel").exists():
-        mlflow_model_path = str(candidate)
-        break
-
-if not mlflow_model_path:
-    raise SystemExit(
-        "Could not locate MLflow model artifacts under the provided model_input. "
-        "Ensure the path contains an MLmodel file."
+from typing import Dict, Optional, Tuple
+
+
+MODEL_DESCRIPTION = "my sample classification model"
+# Model tag recording the digest of the registered MLflow model folder.
+DIGEST_TAG = "mlflow_model_sha256"
+
+
+def locate_mlflow_model(model_input: str) -> Optional[str]:
+    base_path = Path(model_input)
+    candidate_paths = [
+        base_path / "outputs" / "mlflow-model",
+        base_path / "mlflow-model",
+        base_path,
+    ]
+
+    for candidate in candidate_paths:
+        if (candidate / "MLmodel").exists():
+            return str(candidate)
+    return None
+
+
+def model_digest(mlflow_model_path: str) -> str:
+    """SHA-256 over the relative path and content digest of every file in the MLflow model folder."""
+    from common.step_cache import file_digest
+
+    root = Path(mlflow_model_path)
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            digest.update(f"{path.relative_to(root).as_posix()}:{file_digest(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_model(mlflow_model_path: str, model_name: str, digest: Optional[str] = None):
+    from azure.ai.ml.constants import AssetTypes
+    from azure.ai.ml.entities import Model
+
+    return Model(
+        path=mlflow_model_path,
+        name=model_name,
+        description=MODEL_DESCRIPTION,
+        type=AssetTypes.MLFLOW_MODEL,
+        tags={DIGEST_TAG: digest} if digest else None,
     )
 
-print(mlflow_model_path)
-model = Model(
-    path=mlflow_model_path,
-    name=model_name,
-    description="my sample classification model",
-    type=AssetTypes.MLFLOW_MODEL,
-)
-    
-output_dir = Path(args.register_output)
-output_dir.mkdir(parents=True, exist_ok=True)
-
-workspace_registered_model = None
-registry_registered_model = None
-
-# for downloaded file
-# model = Model(path="artifact_downloads/outputs/model.pkl", name=model_name)
-
-if args.registry:
-    print("Using external registry - will register to both workspace and registry")
-    
-    """
-    DUAL REGISTRATION LOGIC:
-    When registry parameter is provided, this script implements strict dual registration:
-    1. Register model to workspace first (MUST succeed)
-    2. Register model to external registry (MUST succeed)
-    
-    FAILURE BEHAVIOR:
-    - ANY failure in either registration step will cause the pipeline to fail immediately
-    - No graceful degradation or fallback behavior
-    - Ensures pipeline fails fast on registration issues for immediate attention
-    
-    COMMON FAILURE SCENARIOS:
-    - Workspace registration fails: Usually indicates connectivity or permission issues with workspace
-    - Registry client creation fails: Registry doesn't exist or no access permissions
-    - Registry access test fails: Identity lacks proper RBAC on registry (needs AzureML Registry User role)
-    - Registry registration fails: Model registration logic error or registry storage issues
+
+def find_identical_version(ml_client, model_name: str, digest: str):
+    """Return the latest version of ``model_name`` if it was registered from the same artifacts.
+
+    The single ``get`` also checks access: it fails on missing permissions, while a missing model
+    only means there is nothing to reuse.
     """
-    
-    # Always register to workspace first
-    print("Registering model to workspace")
+    from azure.core.exceptions import ResourceNotFoundError
+
     try:
-        model = Model(
-            path=mlflow_model_path,
-            name=model_name,
-            description="my sample classification model",
-            type=AssetTypes.MLFLOW_MODEL)
+        latest = ml_client.models.get(name=model_name, label="latest")
+    except ResourceNotFoundError:
+        return None
+    if (getattr(latest, "tags", None) or {}).get(DIGEST_TAG) == digest:
+        return latest
+    return None
+
+
+def register_model(ml_client, mlflow_model_path: str, model_name: str, digest: str) -> Tuple[object, Dict[str, object]]:
+    """Register the model unless the latest version has the same digest; returns the model and its timing."""
+    started = time.perf_counter()
+    registered_model = find_identical_version(ml_client, model_name, digest)
+    reused = registered_model is not None
+    if reused:
+        print(f"Version {registered_model.version} of {model_name} already holds these artifacts; skipping upload")
+    else:
+        # CRITICAL: Must create a NEW Model object for every registration target
+        # Cannot reuse the model object from workspace registration because:
+        # 1. Model objects become "bound" to their target context after first use
+        # 2. The workspace model contains workspace-specific URL paths (azureml://subscriptions/.../workspaces/<workspace>)
+        # 3. Registry expects registry-specific paths, not workspace paths
+        # 4. Reusing causes "workspaces/None" invalid URL errors in registry operations
+        # Solution: Always create fresh Model objects for each registration target
+        registered_model = ml_client.models.create_or_update(build_model(mlflow_model_path, model_name, digest))
+    return registered_model, {"seconds": round(time.perf_counter() - started, 3), "reused": reused}
+
 
-        workspace_registered_model = ml_client_workspace.models.create_or_update(model)
+def register_to_workspace(ml_client_workspace, mlflow_model_path: str, model_name: str, digest: str):
+    print("Registering model to workspace")
+    try:
+        workspace_registered_model, timing = register_model(ml_client_workspace, mlflow_model_path, model_name, digest)
         print("Model successfully registered to workspace")
     except Exception as workspace_error:
         print(f"FAILED: Could not register model to workspace: {workspace_error}")
         raise workspace_error
-    
-    # Then register to external registry (both must succeed)
-    print(f"Attempting to register model to external registry: {args.registry}")
+    return workspace_registered_model, timing
+
+
+def register_to_registry(registry_name: str, mlflow_model_path: str, model_name: str, digest: str):
+    from common.ml_clients import get_registry_client
+
+    print(f"Attempting to register model to external registry: {registry_name}")
     try:
-        ml_client_registry = MLClient(credential=credential, registry_name=args.registry)
-        
-        # Test registry access by trying to list models (this will fail if no permissions)
-        try:
-            # Use simple list() without parameters to test access
-            list(ml_client_registry.models.list())
-            print(f"Registry {args.registry} accessible, registering model to registry")
-        except Exception as registry_access_error:
-            print(f"FAILED: Cannot access registry {args.registry}: {registry_access_error}")
-            raise registry_access_error
-            
-        # If access test passed, register the model
-        try:
-            # CRITICAL: Must create a NEW Model object for registry registration
-            # Cannot reuse the model object from workspace registration because:
-            # 1. Model objects become "bound" to their target context after first use
-            # 2. The workspace model contains workspace-specific URL paths (azureml://subscriptions/.../workspaces/<workspace>)
-            # 3. Registry expects registry-specific paths, not workspace paths
-            # 4. Reusing causes "workspaces/None" invalid URL errors in registry operations
-            # Solution: Always create fresh Model objects for each registration target
-            model_for_registry = Model(
-                path=mlflow_model_path,
-                name=model_name,
-                description="my sample classification model",
-                type=AssetTypes.MLFLOW_MODEL)
-                    
-            registry_registered_model = ml_client_registry.models.create_or_update(model_for_registry)
-            print("Model successfully registered to both workspace and registry")
-        except Exception as registry_registration_error:
-            print(f"FAILED: Could not register model to registry: {registry_registration_error}")
-            raise registry_registration_error
-            
+        ml_client_registry = get_registry_client(registry_name)
     except Exception as client_error:
-        print(f"FAILED: Could not create registry client for {args.registry}: {client_error}")
+        print(f"FAILED: Could not create registry client for {registry_name}: {client_error}")
         raise client_error
-        
-else:
-    print("No external registry provided - registering to workspace only")
-    
-    """
-    SINGLE REGISTRATION LOGIC:
-    When no registry parameter is provided, register only to workspace.
-    
-    FAILURE BEHAVIOR:
-    - Workspace registration failure will cause pipeline to fail immediately
-    - Ensures all model registration attempts are explicit and traceable
-    """
-    
+
     try:
-        workspace_registered_model = ml_client_workspace.models.create_or_update(model)
-        print("Model successfully registered to workspace")
-    except Exception as workspace_error:
-        print(f"FAILED: Could not register model to workspace: {workspace_error}")
-        raise workspace_error
+        registry_registered_model, timing = register_model(ml_client_registry, mlflow_model_path, model_name, digest)
+        print(f"Model successfully registered to registry {registry_name}")
+    except Exception as registry_registration_error:
+        # Missing permissions surface here, from the targeted lookup of the latest version.
+        print(f"FAILED: Could not register model to registry {registry_name}: {registry_registration_error}")
+        raise registry_registration_error
+    return registry_registered_model, timing
+
+
+def register_everywhere(ml_client_workspace, registry_name: Optional[str], mlflow_model_path: str, model_name: str):
+    """Register to the workspace and, when given, the registry at the same time.
+
+    Returns ``(workspace_model, registry_model, timings, digest)``; both registrations must succeed, and the
+    first failure is raised once the other registration has finished.
+    """
+    digest = model_digest(mlflow_model_path)
+    print(f"MLflow model digest: {digest}")
+    if not registry_name:
+        workspace_registered_model, timing = register_to_workspace(ml_client_workspace, mlflow_model_path, model_name, digest)
+        return workspace_registered_model, None, {"workspace": timing}, digest
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        workspace_future = executor.submit(register_to_workspace, ml_client_workspace, mlflow_model_path, model_name, digest)
+        registry_future = executor.submit(register_to_registry, registry_name, mlflow_model_path, model_name, digest)
+    workspace_registered_model, workspace_timing = workspace_future.result()
+    registry_registered_model, registry_timing = registry_future.result()
+    print("Model successfully registered to both workspace and registry")
+    return workspace_registered_model, registry_registered_model, {"workspace": workspace_timing, "registry": registry_timing}, digest
+
+
+def write_metadata(
+    output_dir: Path,
+    model_name: str,
+    workspace_registered_model,
+    registry_registered_model,
+    timings: Optional[Dict[str, Dict[str, object]]] = None,
+    digest: Optional[str] = None,
+) -> Dict[str, object]:
+    metadata = {
+        "model_name": model_name,
+        "workspace_version": getattr(workspace_registered_model, "version", None),
+        "registry_version": getattr(registry_registered_model, "version", None),
+        "model_digest": digest,
+        "timings": timings or {},
+    }
+
+    with open(output_dir / "model_versions.json", "w", encoding="utf-8") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+    with open(output_dir / "register.txt", "a", encoding="utf-8") as f:
+        f.write("Model Registered:")
+    return metadata
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("register")
+    parser.add_argument("--model_input", type=str, help="Path of input model")
+    parser.add_argument("--model_name", type=str, help="Model_name_to_register")
+    parser.add_argument("--compare_output", type=str, help="Placeholder to define order")
+    parser.add_argument("--register_output", type=str, help="Placeholder to define order")
+    parser.add_argument("--registry", type=str, required=False, help="Placeholder to define order")
+
+    args = parser.parse_args()
+
+    #### Registering model
+    print("Registering model")
+
+    lines = [
+        f"Model name: {args.model_name}",
+        f"Model path: {args.model_input}",
+        f"Model path: {args.registry}",
+        f"Model path: {args.compare_output}",
+        f"Model path: {args.register_output}",
+    ]
+
+    for line in lines:
+        print(line)
+
+    model_name = args.model_name
+    mlflow_model_path = locate_mlflow_model(args.model_input)
+    if not mlflow_model_path:
+        raise SystemExit(
+            "Could not locate MLflow model artifacts under the provided model_input. "
+            "Ensure the path contains an MLmodel file."
+        )
+    print(mlflow_model_path)
+
+    #### Client Getting ML Client
+    print("Initializing MLclient")
+    from common.ml_clients import get_workspace_client
+
+    ml_client_workspace = get_workspace_client()
+    ####
+
+    output_dir = Path(args.register_output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.registry:
+        print("Using external registry - will register to both workspace and registry")
+
+        """
+        DUAL REGISTRATION LOGIC:
+        When registry parameter is provided, this script implements strict dual registration:
+        1. Register model to workspace (MUST succeed)
+        2. Register model to external registry (MUST succeed)
+        Both registrations run concurrently; each first looks up the latest version of the model,
+        which checks access and lets an identical model (same digest tag) be reused instead of
+        uploaded again.
+
+        FAILURE BEHAVIOR:
+        - ANY failure in either registration step will cause the pipeline to fail
+        - No graceful degradation or fallback behavior
+        - The other registration still completes, so a failed run can leave one target registered
+
+        COMMON FAILURE SCENARIOS:
+        - Workspace registration fails: Usually indicates connectivity or permission issues with workspace
+        - Registry client creation fails: Registry doesn't exist or no access permissions
+        - Registry lookup fails: Identity lacks proper RBAC on registry (needs AzureML Registry User role)
+        - Registry registration fails: Model registration logic error or registry storage issues
+        """
+    else:
+        print("No external registry provided - registering to workspace only")
+
+        """
+        SINGLE REGISTRATION LOGIC:
+        When no registry parameter is provided, register only to workspace.
+
+        FAILURE BEHAVIOR:
+        - Workspace registration failure will cause pipeline to fail immediately
+        - Ensures all model registration attempts are explicit and traceable
+        """
+
+    workspace_registered_model, registry_registered_model, timings, digest = register_everywhere(
+        ml_client_workspace, args.registry, mlflow_model_path, model_name
+    )
+    for target, timing in timings.items():
+        print(f"{target} registration: {timing['seconds']:.1f}s{' (reused existing version)' if timing['reused'] else ''}")
 
-metadata = {
-    "model_name": model_name,
-    "workspace_version": getattr(workspace_registered_model, "version", None),
-    "registry_version": getattr(registry_registered_model, "version", None),
-}
+    write_metadata(output_dir, model_name, workspace_registered_model, registry_registered_model, timings, digest)
 
-with open(output_dir / "model_versions.json", "w", encoding="utf-8") as metadata_file:
-    json.dump(metadata, metadata_file)
 
-with open(output_dir / "register.txt", "a", encoding="utf-8") as f:
-    f.write("Model Registered:")
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,125 @@
 import argparse
+import json
 import pandas as pd
+import numpy as np
 import os
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score,accuracy_score,f1_score
-import mlflow
-
-mlflow.sklearn.autolog()
-
-parser = argparse.ArgumentParser("score")
-parser.add_argument(
-    "--predictions", type=str, help="Path of predictions and actual data"
-)
-parser.add_argument("--model", type=str, help="Path to model")
-parser.add_argument("--score_report", type=str, help="Path to score report")
-
-
-args = parser.parse_args()
-
-print("hello scoring world...")
-
-lines = [
-    f"Model path: {args.model}",
-    f"Predictions path: {args.predictions}",
-    f"Scoring output path: {args.score_report}",
-]
-
-for line in lines:
-    print(line)
-
-# Load the test data with predicted values
-
-print("mounted_path files: ")
-arr = os.listdir(args.predictions)
-
-print(arr)
-df_list = []
-for filename in arr:
-    print("reading file: %s ..." % filename)
-    with open(os.path.join(args.predictions, filename), "r") as handle:
-        # print (handle.read())
-        input_df = pd.read_csv((Path(args.predictions) / filename))
-        df_list.append(input_df)
-
-test_data = df_list[0]
-
-# Load the model from input port
-model = model = mlflow.pyfunc.load_model(str(Path(args.model) / "outputs")+"/"+"mlflow-model")
-
-# Print the results of scoring the predictions against actual values in the test data
-# The coefficients
-print("Model details: \n", model)
-
-actuals = test_data["actual_cost"]
-predictions = test_data["predicted_cost"]
-
-# The mean squared error
-print("Accuracy: %.2f" % accuracy_score(actuals, predictions))
-# The coefficient of determination: 1 is perfect prediction
-print("F1-Score: %.2f" % f1_score(actuals, predictions,average='macro'))
-print("Model: ", model)
-
-# Print score report to a text file
-(Path(args.score_report) / "score.txt").write_text(
-    "Scored with the following model:\n{}".format(model)
-)
-with open((Path(args.score_report) / "score.txt"), "a") as f:
-    f.write("F1-Score: %.2f \n" % accuracy_score(actuals, predictions))
-    f.write("F1-Score: %.2f \n" % f1_score(actuals, predictions,average='macro'))
\ No newline at end of file
+from typing import Dict, Iterable
+
+from common.classification_metrics import confusion_metrics
+from common.data_files import iter_data_chunks
+
+COST_LABELS = list("ABCDEFGHIJ")
+SCORE_COLUMNS = ["actual_cost", "predicted_cost"]
+REPORT_FILE = "score.json"
+
+
+class ConfusionMatrix:
+    """Confusion matrix accumulated chunk by chunk; rows are actual labels, columns predicted ones."""
+
+    def __init__(self, labels: Iterable[str] = COST_LABELS) -> None:
+        self.labels = pd.Index(list(labels))
+        self.counts = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+
+    def _codes(self, values: np.ndarray) -> np.ndarray:
+        codes = self.labels.get_indexer(values)
+        unseen = pd.unique(values[codes < 0])
+        if len(unseen):
+            # Labels outside A-J still count, so accuracy matches scoring the raw columns.
+            self.labels = self.labels.append(pd.Index(unseen))
+            self.counts = np.pad(self.counts, (0, len(unseen)))
+            codes = self.labels.get_indexer(values)
+        return codes
+
+    def update(self, actual: np.ndarray, predicted: np.ndarray) -> None:
+        actual_codes = self._codes(np.asarray(actual))
+        predicted_codes = self._codes(np.asarray(predicted))
+        size = len(self.labels)
+        self.counts += np.bincount(actual_codes * size + predicted_codes, minlength=size * size).reshape(size, size)
+
+    def report(self) -> Dict[str, object]:
+        metrics = confusion_metrics(self.counts)
+        return {
+            "rows": int(self.counts.sum()),
+            "accuracy": float(metrics["accuracy"]),
+            "macro_f1": float(metrics["macro_f1"]),
+            "per_class": {
+                str(label): {
+                    "precision": float(metrics["precision"][index]),
+                    "recall": float(metrics["recall"][index]),
+                    "f1": float(metrics["f1"][index]),
+                    "support": int(metrics["support"][index]),
+                }
+                for index, label in enumerate(self.labels)
+            },
+            "labels": [str(label) for label in self.labels],
+            "confusion_matrix": self.counts.tolist(),
+        }
+
+
+def score_predictions(predictions: str, chunk_rows: int) -> ConfusionMatrix:
+    matrix = ConfusionMatrix()
+    for chunk in iter_data_chunks(predictions, chunk_rows, columns=SCORE_COLUMNS):
+        # Labels are compared as strings whichever format the shard was written in.
+        chunk = chunk.astype(str)
+        matrix.update(chunk["actual_cost"].to_numpy(), chunk["predicted_cost"].to_numpy())
+    return matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("score")
+    parser.add_argument(
+        "--predictions", type=str, help="Path of predictions and actual data"
+    )
+    parser.add_argument("--model", type=str, help="Path to model")
+    parser.add_argument("--score_report", type=str, help="Path to score report")
+    parser.add_argument("--chunk_rows", type=int, default=100_000, help="Rows read per chunk while accumulating metrics")
+
+    args = parser.parse_args()
+    if args.chunk_rows < 1:
+        raise SystemExit("chunk_rows must be a positive integer")
+
+    print("hello scoring world...")
+
+    lines = [
+        f"Model path: {args.model}",
+        f"Predictions path: {args.predictions}",
+        f"Scoring output path: {args.score_report}",
+    ]
+
+    for line in lines:
+        print(line)
+
+    # Accumulate the confusion matrix over every prediction shard
+
+    print("mounted_path files: ")
+    arr = os.listdir(args.predictions)
+
+    print(arr)
+    report = score_predictions(args.predictions, args.chunk_rows).report()
+
+    # Load the model from input port
+    import mlflow
+
+    model = mlflow.pyfunc.load_model(str(Path(args.model) / "outputs")+"/"+"mlflow-model")
+
+    # Print the results of scoring the predictions against actual values in the test data
+    print("Model details: \n", model)
+    print("Rows scored: %d" % report["rows"])
+    print("Accuracy: %.2f" % report["accuracy"])
+    print("F1-Score: %.2f" % report["macro_f1"])
+    print("Model: ", model)
+
+    # Print score report to a text file, with the full metrics as JSON next to it
+    (Path(args.score_report) / "score.txt").write_text(
+        "Scored with the following model:\n{}".format(model)
+    )
+    with open((Path(args.score_report) / "score.txt"), "a") as f:
+        f.write("Accuracy: %.2f \n" % report["accuracy"])
+        f.write("F1-Score: %.2f \n" % report["macro_f1"])
+    with open(Path(args.score_report) / REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
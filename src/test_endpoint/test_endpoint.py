@@ -35,11 +35,15 @@ def _resolve_deployment_name(args: argparse.Namespace) -> str:
 def load_test_data(path: str) -> pd.DataFrame:
     if path.endswith(".csv"):
         return pd.read_csv(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
     if os.path.isdir(path):
         for file in os.listdir(path):
             if file.endswith(".csv"):
                 return pd.read_csv(os.path.join(path, file))
-        raise FileNotFoundError("No CSV found in MLTable folder")
+            if file.endswith(".parquet"):
+                return pd.read_parquet(os.path.join(path, file))
+        raise FileNotFoundError("No CSV or Parquet file found in MLTable folder")
     raise ValueError("Unsupported test data format")
 
 
@@ -53,9 +57,7 @@ def _determine_report_filename(endpoint_name: str) -> str:
 
 
 def run_endpoint_test(args: argparse.Namespace) -> None:
-    from azure.identity import ManagedIdentityCredential  # type: ignore[import-not-found]
-    from azure.ai.ml import MLClient  # type: ignore[import-not-found]
-    from azureml.core.run import Run  # type: ignore[import-not-found]
+    from common.ml_clients import get_workspace_client
 
     if args.deploy_status:
         print(f"[Dependency Check] deploy_status folder received: {args.deploy_status}")
@@ -65,17 +67,7 @@ def run_endpoint_test(args: argparse.Namespace) -> None:
             print(f"[Dependency Check] deploy_status folder path does not exist!")
 
     print("Initializing MLClient for endpoint testing...")
-    msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-    credential = ManagedIdentityCredential(client_id=msi_client_id)
-
-    run = Run.get_context(allow_offline=False)
-    ws = run.experiment.workspace
-    ml_client = MLClient(
-        credential=credential,
-        subscription_id=ws._subscription_id,
-        resource_group_name=ws._resource_group,
-        workspace_name=ws._workspace_name,
-    )
+    ml_client = get_workspace_client()
 
     print(f"Getting endpoint: {args.endpoint_name}")
     ml_client.online_endpoints.get(name=args.endpoint_name)
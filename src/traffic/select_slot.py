@@ -1,5 +1,4 @@
 import argparse
-import os
 from typing import Dict
 from pathlib import Path
 
@@ -45,22 +44,10 @@ def main() -> None:
         default_slot = _normalize_slot_name(args.default_slot or "blue")
         alternate_slot = _normalize_slot_name(args.alternate_slot or "green")
 
-        from azure.identity import ManagedIdentityCredential
-        from azure.ai.ml import MLClient
         from azure.core.exceptions import ResourceNotFoundError
-        from azureml.core.run import Run
-
-        msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-        credential = ManagedIdentityCredential(client_id=msi_client_id)
-        credential.get_token("https://management.azure.com/.default")
-        run = Run.get_context(allow_offline=False)
-        ws = run.experiment.workspace
-        ml_client = MLClient(
-            credential=credential,
-            subscription_id=ws._subscription_id,
-            resource_group_name=ws._resource_group,
-            workspace_name=ws._workspace_name,
-        )
+        from common.ml_clients import get_workspace_client
+
+        ml_client = get_workspace_client()
 
         try:
             endpoint = ml_client.online_endpoints.get(name=args.endpoint_name)
@@ -4,10 +4,7 @@ import json
 import os
 from typing import Dict
 
-from azure.identity import ManagedIdentityCredential
-from azure.ai.ml import MLClient
-from azure.core.exceptions import ResourceNotFoundError
-from azureml.core.run import Run
+from common.ml_clients import get_workspace_client
 
 
 def _normalize_distribution(distribution: Dict[str, int]) -> Dict[str, int]:
@@ -69,17 +66,9 @@ def main():
     delete_on_rollback = _str_to_bool(args.delete_on_rollback)
 
     # Authenticate inside the AML run context (managed identity on compute)
-    msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-    credential = ManagedIdentityCredential(client_id=msi_client_id)
-    credential.get_token("https://management.azure.com/.default")
-    run = Run.get_context(allow_offline=False)
-    ws = run.experiment.workspace
-    ml_client = MLClient(
-        credential=credential,
-        subscription_id=ws._subscription_id,
-        resource_group_name=ws._resource_group,
-        workspace_name=ws._workspace_name,
-    )
+    from azure.core.exceptions import ResourceNotFoundError
+
+    ml_client = get_workspace_client()
 
     try:
         endpoint = ml_client.online_endpoints.get(name=args.endpoint_name)
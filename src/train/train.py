@@ -1,78 +1,61 @@
 import argparse
+import asyncio
+import itertools
+import json
 from pathlib import Path
-from uuid import uuid4
-from datetime import datetime
 import os
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-import mlflow
-import mltable
-import mlflow
-from mlflow.tracking.client import MlflowClient
-from mlflow.artifacts import download_artifacts
-
-# Import required libraries
-import os
-
-from azure.ai.ml.constants import AssetTypes
-from azure.ai.ml.entities import Data
-from azure.ai.ml.automl import (
-    classification,
-    ClassificationPrimaryMetrics,
-    ClassificationModels,
-)
-
-
-#### Client Getting ML Client
-from azure.identity import DefaultAzureCredential,ManagedIdentityCredential,AzureCliCredential
-from azure.ai.ml import automl, Input, MLClient, command
-from azureml.core.run import Run
-
-msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-credential = ManagedIdentityCredential(client_id=msi_client_id)
-credential.get_token("https://management.azure.com/.default")
-run = Run.get_context(allow_offline=False)
-ws = run.experiment.workspace
-ml_client = MLClient(credential=credential,subscription_id=ws._subscription_id,resource_group_name=ws._resource_group,workspace_name=ws._workspace_name,)
-####
-
-
-#### Retreiving AutoML Config
-
-from azure.ai.ml.entities import AmlCompute
-from azure.core.exceptions import ResourceNotFoundError
-parser = argparse.ArgumentParser("train")
-parser.add_argument("--training_data", type=str, help="Path to training data")
-parser.add_argument("--test_data", type=str, help="Path to test data")
-parser.add_argument("--model_output", type=str, help="Path of output model")
-parser.add_argument("--model_name", type=str, help="Model name")
-parser.add_argument("--automl_compute", type=str, default="aml-cluster-dev-cc01", help="Compute cluster for AutoML job")
-parser.add_argument("--max_automl_trials", type=int, default=1, help="Maximum number of AutoML trials")
-parser.add_argument("--enable_vote_ensemble", type=str, default="false", help="Set to true to enable vote ensemble")
-parser.add_argument("--enable_stack_ensemble", type=str, default="false", help="Set to true to enable stack ensemble")
-args = parser.parse_args()
-compute_name = args.automl_compute
-_ = ml_client.compute.get(compute_name)
-print(f"Found existing compute target: {compute_name}")
-####
-
-
-mlflow.sklearn.autolog()
-
-print("hello training world...")
-
-lines = [
-    f"Training data path: {args.training_data}",
-    f"Test data path: {args.test_data}",
-    f"Model output path: {args.model_output}",
-    f"Test split ratio:{args.model_name}",
+import shutil
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+EXPERIMENT_NAME = "Taxi-Regression-AutoML-Job-subrun"
+BEST_CHILD_TAG = "automl_best_child_run_id"
+QUEUED_STATUSES = {"NotStarted", "Queued", "Preparing", "Provisioning", "Starting"}
+# Same set as the SDK's RunHistoryConstants.TERMINAL_STATUSES, which lives in a private module.
+TERMINAL_STATUSES = {"Completed", "Failed", "Canceled", "NotResponding", "Paused"}
+# Job settings a sweep grid may vary; each maps onto the command-line argument of the same name.
+SWEEP_PARAMETERS = ("primary_metric", "max_automl_trials", "enable_vote_ensemble", "enable_stack_ensemble")
+SWEEP_RESULTS_FILE = "sweep_results.json"
+# Best-child metrics a sweep can select on, and whether a higher value is better for each.
+SWEEP_METRIC_HIGHER_IS_BETTER = {
+    "accuracy": True,
+    "AUC_weighted": True,
+    "AUC_macro": True,
+    "average_precision_score_weighted": True,
+    "balanced_accuracy": True,
+    "f1_score_weighted": True,
+    "f1_score_macro": True,
+    "matthews_correlation": True,
+    "norm_macro_recall": True,
+    "precision_score_weighted": True,
+    "recall_score_weighted": True,
+    "log_loss": False,
+}
+TARGET_COLUMN = "cost"
+feature_columns = [
+    "distance",
+    "dropoff_latitude",
+    "dropoff_longitude",
+    "passengers",
+    "pickup_latitude",
+    "pickup_longitude",
+    "store_forward",
+    "vendor",
+    "pickup_weekday",
+    "pickup_month",
+    "pickup_monthday",
+    "pickup_hour",
+    "pickup_minute",
+    "pickup_second",
+    "dropoff_weekday",
+    "dropoff_month",
+    "dropoff_monthday",
+    "dropoff_hour",
+    "dropoff_minute",
+    "dropoff_second",
 ]
 
-# Training MLTable defined locally, with local data to be uploaded
-my_training_data_input = Input(
-    type=AssetTypes.MLTABLE, path=str(Path(args.training_data))
-)
 
 ####
 # General job parameters
@@ -81,100 +64,524 @@ def _str_to_bool(value: str) -> bool:
         return False
     return str(value).lower() in {"true", "1", "yes", "y", "on"}
 
-max_trials = max(1, args.max_automl_trials)
-exp_name = "Taxi-Regression-AutoML-Job-subrun"
-
-#https://github.com/Azure/azureml-examples/blob/main/sdk/python/jobs/automl-standalone-jobs/automl-classification-task-bankmarketing/automl-classification-task-bankmarketing.ipynb
-#https://github.com/Azure/azureml-examples/blob/main/sdk/python/jobs/automl-standalone-jobs/automl-regression-task-hardware-performance/automl-regression-task-hardware-performance.ipynb
-# Create the AutoML Regression job with the related factory-function.
-
-classification_job = automl.classification(
-    compute=compute_name,
-    experiment_name=exp_name,
-    training_data=my_training_data_input,
-    target_column_name="cost",
-    primary_metric="accuracy",
-    n_cross_validations=2,
-    enable_model_explainability=True,
-    tags={"test": "My custom value"},
-)
-
-# Limits are all optional
-classification_job.set_limits(
-    timeout_minutes=600,
-    trial_timeout_minutes=20,
-    max_trials=max_trials,
-    enable_early_termination=True,
-)
-
-# Training properties are optional
-classification_job.set_training(
-    enable_onnx_compatible_models=True,
-    enable_stack_ensemble=_str_to_bool(args.enable_stack_ensemble),
-    enable_vote_ensemble=_str_to_bool(args.enable_vote_ensemble),
-)
-
-### Run Command
-
-# Submit the AutoML job
-returned_job = ml_client.jobs.create_or_update(classification_job)  # submit the job to the backend
-
-print(f"Created job: {returned_job}")
-
-# Wait until the AutoML job is finished
-ml_client.jobs.stream(returned_job.name)
-
-# Get a URL for the status of the job
-returned_job.services["Studio"].endpoint
-print(returned_job.name)
-
-###Obtain the tracking URI for MLFlow
-
-# Obtain the tracking URL from MLClient
-MLFLOW_TRACKING_URI = ml_client.workspaces.get(
-    name=ml_client.workspace_name
-).mlflow_tracking_uri
-
-print(MLFLOW_TRACKING_URI)
-
-# Set the MLFLOW TRACKING URI
-
-mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-
-print("\nCurrent tracking uri: {}".format(mlflow.get_tracking_uri()))
-
-# Initialize MLFlow client
-mlflow_client = MlflowClient()
 
-job_name = returned_job.name
+def build_classification_job(args: argparse.Namespace, compute_name: str):
+    from azure.ai.ml import automl, Input
+    from azure.ai.ml.constants import AssetTypes
 
-# Example if providing an specific Job name/ID
-# job_name = "b4e95546-0aa1-448e-9ad6-002e3207b4fc"
+    # Training MLTable defined locally, with local data to be uploaded
+    my_training_data_input = Input(
+        type=AssetTypes.MLTABLE, path=str(Path(args.training_data))
+    )
+    max_trials = max(1, args.max_automl_trials)
 
-# Get the parent run
-mlflow_parent_run = mlflow_client.get_run(job_name)
+    #https://github.com/Azure/azureml-examples/blob/main/sdk/python/jobs/automl-standalone-jobs/automl-classification-task-bankmarketing/automl-classification-task-bankmarketing.ipynb
+    #https://github.com/Azure/azureml-examples/blob/main/sdk/python/jobs/automl-standalone-jobs/automl-regression-task-hardware-performance/automl-regression-task-hardware-performance.ipynb
+    # Create the AutoML Regression job with the related factory-function.
 
-print("Parent Run: ")
-print(mlflow_parent_run)
+    classification_job = automl.classification(
+        compute=compute_name,
+        experiment_name=EXPERIMENT_NAME,
+        training_data=my_training_data_input,
+        target_column_name="cost",
+        primary_metric=args.primary_metric,
+        n_cross_validations=2,
+        enable_model_explainability=True,
+        tags={"test": "My custom value"},
+    )
 
-# Print parent run tags. 'automl_best_child_run_id' tag should be there.
-print(mlflow_parent_run.data.tags)
+    # Limits are all optional
+    classification_job.set_limits(
+        timeout_minutes=600,
+        trial_timeout_minutes=20,
+        max_trials=max_trials,
+        enable_early_termination=True,
+    )
 
-# Get the best model's child run
+    # Training properties are optional
+    classification_job.set_training(
+        enable_onnx_compatible_models=True,
+        enable_stack_ensemble=_str_to_bool(args.enable_stack_ensemble),
+        enable_vote_ensemble=_str_to_bool(args.enable_vote_ensemble),
+    )
+    return classification_job
 
-best_child_run_id = mlflow_parent_run.data.tags["automl_best_child_run_id"]
-print("Found best child run id: ", best_child_run_id)
 
-best_run = mlflow_client.get_run(best_child_run_id)
+def configure_mlflow_tracking(ml_client):
+    """Point MLflow at the workspace tracking server and return an ``MlflowClient``."""
+    import mlflow
+    from mlflow.tracking.client import MlflowClient
 
-print("Best child run: ")
-print(best_run)
+    ###Obtain the tracking URI for MLFlow
 
-best_run.data.metrics
+    # Obtain the tracking URL from MLClient
+    MLFLOW_TRACKING_URI = ml_client.workspaces.get(
+        name=ml_client.workspace_name
+    ).mlflow_tracking_uri
+
+    print(MLFLOW_TRACKING_URI)
+
+    # Set the MLFLOW TRACKING URI
+
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
 
-#Download best model locally
-local_path = download_artifacts(
-    run_id=best_run.info.run_id, artifact_path="outputs", dst_path=args.model_output
-)
-print("Artifacts downloaded in: {}".format(local_path))
-print("Artifacts: {}".format(os.listdir(local_path)))
\ No newline at end of file
+    print("\nCurrent tracking uri: {}".format(mlflow.get_tracking_uri()))
+
+    # Initialize MLFlow client
+    return MlflowClient()
+
+
+def download_best_model(ml_client, job_name: str, model_output: str) -> str:
+    """Download the outputs of the best child run of AutoML job ``job_name`` into ``model_output``."""
+    from mlflow.artifacts import download_artifacts
+
+    mlflow_client = configure_mlflow_tracking(ml_client)
+
+    # Get the parent run
+    mlflow_parent_run = mlflow_client.get_run(job_name)
+
+    print("Parent Run: ")
+    print(mlflow_parent_run)
+
+    # Print parent run tags. 'automl_best_child_run_id' tag should be there.
+    print(mlflow_parent_run.data.tags)
+
+    # Get the best model's child run
+
+    best_child_run_id = mlflow_parent_run.data.tags[BEST_CHILD_TAG]
+    print("Found best child run id: ", best_child_run_id)
+
+    best_run = mlflow_client.get_run(best_child_run_id)
+
+    print("Best child run: ")
+    print(best_run)
+
+    #Download best model locally
+    local_path = download_artifacts(
+        run_id=best_run.info.run_id, artifact_path="outputs", dst_path=model_output
+    )
+    print("Artifacts downloaded in: {}".format(local_path))
+    print("Artifacts: {}".format(os.listdir(local_path)))
+    return local_path
+
+
+def _download_outputs(run_id: str, dst_path: str) -> str:
+    from mlflow.artifacts import download_artifacts
+
+    return download_artifacts(run_id=run_id, artifact_path="outputs", dst_path=dst_path)
+
+
+class AutoMLJobWatcher:
+    """Poll an AutoML job with exponential backoff and prefetch its best model while it finishes.
+
+    ``jobs`` is ``MLClient.jobs`` and ``mlflow_client`` an ``MlflowClient`` on the workspace tracking
+    server; ``download``, ``clock`` and ``sleep`` are injectable so the watcher runs against fakes.
+    Every blocking service call runs on a worker thread, so the prefetch overlaps the polling.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        mlflow_client,
+        download: Callable[[str, str], str] = _download_outputs,
+        initial_delay: float = 5.0,
+        max_delay: float = 60.0,
+        backoff: float = 2.0,
+        deadline_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep=asyncio.sleep,
+    ) -> None:
+        self.jobs = jobs
+        self.mlflow_client = mlflow_client
+        self.download = download
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.deadline_seconds = deadline_seconds
+        self.clock = clock
+        self.sleep = sleep
+
+    async def _status(self, job_name: str) -> str:
+        return (await asyncio.to_thread(self.jobs.get, job_name)).status
+
+    async def _best_child(self, job_name: str) -> Optional[str]:
+        run = await asyncio.to_thread(self.mlflow_client.get_run, job_name)
+        return run.data.tags.get(BEST_CHILD_TAG)
+
+    def _start_prefetch(self, run_id: str, model_output: str):
+        staging_dir = Path(model_output) / f".prefetch-{run_id}"
+        print(f"Best child run {run_id} known; prefetching its artifacts")
+        task = asyncio.create_task(asyncio.to_thread(self.download, run_id, str(staging_dir)))
+        return run_id, staging_dir, task
+
+    async def _discard_prefetch(self, prefetch) -> None:
+        if prefetch is None:
+            return
+        _, staging_dir, task = prefetch
+        # A download running on a worker thread cannot be interrupted, so let it finish before cleaning up.
+        await asyncio.gather(task, return_exceptions=True)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    async def wait(self, job_name: str, prefetch_to: Optional[str] = None):
+        """Poll ``job_name`` until it completes and return ``(best_child, timings, prefetch)``.
+
+        With ``prefetch_to`` the best child's outputs start downloading into a staging folder there
+        as soon as the parent run names one; pass the returned ``prefetch`` on to :meth:`fetch`.
+        """
+        timings: Dict[str, float] = {}
+        started = self.clock()
+        running_at = None
+        prefetch = None
+        status = None
+        delay = self.initial_delay
+        while True:
+            previous_status, status = status, await self._status(job_name)
+            now = self.clock()
+            if status != previous_status:
+                print(f"Job {job_name} status: {status}")
+                delay = self.initial_delay
+            if running_at is None and status not in QUEUED_STATUSES:
+                running_at = now
+                timings["queue"] = now - started
+            if status in TERMINAL_STATUSES:
+                break
+            if prefetch_to is not None and running_at is not None and prefetch is None:
+                best_child = await self._best_child(job_name)
+                if best_child:
+                    prefetch = self._start_prefetch(best_child, prefetch_to)
+
+            if self.deadline_seconds is not None and now - started >= self.deadline_seconds:
+                print(f"Job {job_name} exceeded its {self.deadline_seconds:.0f}s deadline; cancelling it")
+                try:
+                    await asyncio.to_thread(self.jobs.begin_cancel, job_name)
+                except Exception as exc:  # pragma: no cover - cancellation is best effort
+                    print(f"Could not cancel job {job_name}: {exc}")
+                await self._discard_prefetch(prefetch)
+                raise TimeoutError(f"AutoML job {job_name} did not finish within {self.deadline_seconds:.0f}s")
+            if self.deadline_seconds is not None:
+                delay = min(delay, max(self.deadline_seconds - (now - started), 0.0))
+            await self.sleep(delay)
+            delay = min(delay * self.backoff, self.max_delay)
+
+        finished = self.clock()
+        timings["run"] = finished - (running_at if running_at is not None else finished)
+        if status != "Completed":
+            await self._discard_prefetch(prefetch)
+            raise RuntimeError(f"AutoML job {job_name} finished with status {status}")
+
+        best_child = await self._best_child(job_name)
+        if not best_child:
+            await self._discard_prefetch(prefetch)
+            raise RuntimeError(f"AutoML job {job_name} completed without a {BEST_CHILD_TAG} tag")
+        print(f"Job {job_name} best child run id: {best_child}")
+        return best_child, timings, prefetch
+
+    async def fetch(self, best_child: str, model_output: str, prefetch=None) -> Path:
+        """Place ``best_child``'s outputs in ``model_output/outputs``, reusing a matching prefetch.
+
+        A prefetch that failed is discarded and the outputs are downloaded again.
+        """
+        outputs_dir = Path(model_output) / "outputs"
+        if prefetch is not None and prefetch[0] == best_child:
+            _, staging_dir, task = prefetch
+            try:
+                await task
+            except Exception as exc:
+                print(f"Prefetch of {best_child} failed, downloading it again: {exc}")
+            else:
+                shutil.move(str(staging_dir / "outputs"), str(outputs_dir))
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return outputs_dir
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            prefetch = None
+        # The best child changed after the prefetch started (or none started): fetch the final one.
+        download = asyncio.to_thread(self.download, best_child, model_output)
+        _, local_path = await asyncio.gather(self._discard_prefetch(prefetch), download)
+        return Path(local_path)
+
+    async def watch(self, job_name: str, model_output: str) -> Dict[str, float]:
+        """Wait for ``job_name`` and download its best child's outputs; returns seconds per phase."""
+        best_child, timings, prefetch = await self.wait(job_name, prefetch_to=model_output)
+        finished = self.clock()
+        outputs_dir = await self.fetch(best_child, model_output, prefetch)
+        timings["artifact_download"] = self.clock() - finished
+
+        print("Artifacts downloaded in: {}".format(outputs_dir))
+        print("Artifacts: {}".format(os.listdir(outputs_dir)))
+        for phase, seconds in timings.items():
+            print(f"Phase {phase}: {seconds:.1f}s")
+        return timings
+
+
+def expand_sweep_grid(grid: Dict[str, object]) -> List[Dict[str, object]]:
+    """Return every combination of a ``{parameter: [values]}`` grid; scalar values are fixed."""
+    unknown = sorted(set(grid) - set(SWEEP_PARAMETERS))
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters {unknown}; choose from {list(SWEEP_PARAMETERS)}")
+    names = list(grid)
+    values = [grid[name] if isinstance(grid[name], list) else [grid[name]] for name in names]
+    if any(not options for options in values):
+        raise ValueError("Every sweep parameter needs at least one value")
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def select_best_result(results: List[Dict[str, object]], metric: str) -> Dict[str, object]:
+    """Return the sweep result with the best ``metric``: the highest one, or the lowest for a loss such as log_loss."""
+    if metric not in SWEEP_METRIC_HIGHER_IS_BETTER:
+        raise ValueError(f"Unsupported sweep metric {metric}; choose from {list(SWEEP_METRIC_HIGHER_IS_BETTER)}")
+    scored = [result for result in results if result.get("metric") is not None]
+    if not scored:
+        raise RuntimeError("No sweep job produced a best child with the selection metric")
+    choose = max if SWEEP_METRIC_HIGHER_IS_BETTER[metric] else min
+    return choose(scored, key=lambda result: result["metric"])
+
+
+async def run_sweep(
+    watcher: AutoMLJobWatcher,
+    submissions: List[Tuple[Dict[str, object], object]],
+    metric: str,
+    concurrency: int,
+) -> List[Dict[str, object]]:
+    """Submit ``(config, job)`` pairs at most ``concurrency`` at a time and wait for all of them.
+
+    Every result records the job's best child and that child's ``metric``; a job that fails or
+    times out is reported with an ``error`` instead of failing the whole sweep.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(config, job):
+        async with semaphore:
+            submitted = await asyncio.to_thread(watcher.jobs.create_or_update, job)
+            print(f"Submitted sweep job {submitted.name}: {config}")
+            best_child, timings, _ = await watcher.wait(submitted.name)
+            run = await asyncio.to_thread(watcher.mlflow_client.get_run, best_child)
+            return {
+                "config": config,
+                "job_name": submitted.name,
+                "best_child": best_child,
+                "metric": run.data.metrics.get(metric),
+                "timings": timings,
+            }
+
+    outcomes = await asyncio.gather(*(run_one(config, job) for config, job in submissions), return_exceptions=True)
+    results = []
+    for (config, _), outcome in zip(submissions, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"Sweep configuration {config} failed: {outcome}")
+            results.append({"config": config, "error": str(outcome)})
+        else:
+            results.append(outcome)
+    return results
+
+
+async def sweep_and_download(
+    watcher: AutoMLJobWatcher,
+    submissions: List[Tuple[Dict[str, object], object]],
+    metric: str,
+    concurrency: int,
+    model_output: str,
+) -> Dict[str, object]:
+    """Run the sweep, download the global best child across its jobs and record every result."""
+    results = await run_sweep(watcher, submissions, metric, concurrency)
+    best = select_best_result(results, metric)
+    print(f"Best sweep configuration {best['config']} (job {best['job_name']}): {metric}={best['metric']}")
+    started = watcher.clock()
+    outputs_dir = await watcher.fetch(best["best_child"], model_output)
+    print(f"Artifacts downloaded in {outputs_dir} after {watcher.clock() - started:.1f}s")
+
+    summary = {"metric": metric, "best": best, "results": results}
+    with open(Path(model_output) / SWEEP_RESULTS_FILE, "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2)
+    return best
+
+
+def build_local_pipeline(max_iter: int, learning_rate: float, seed: int):
+    import pandas as pd
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    # CSV splits carry integer codes as ints and Parquet splits as nullable ints; both cast to float, and
+    # missing values become NaN, which the gradient boosting handles natively. Only library callables
+    # go into the pipeline so the pickled model loads without this script.
+    return Pipeline(
+        [
+            ("to_float", FunctionTransformer(pd.DataFrame.astype, kw_args={"dtype": "float64"})),
+            (
+                "classifier",
+                HistGradientBoostingClassifier(max_iter=max_iter, learning_rate=learning_rate, random_state=seed),
+            ),
+        ]
+    )
+
+
+def train_local(
+    training_data: str,
+    model_output: str,
+    tracking_dir: str,
+    max_iter: int = 200,
+    learning_rate: float = 0.1,
+    seed: int = 42,
+) -> Dict[str, float]:
+    """Train in-process and write ``model_output/outputs/mlflow-model`` like an AutoML best child.
+
+    The run is logged to a local MLflow file store at ``tracking_dir``; the gradient boosting fits
+    on all cores through OpenMP.
+    """
+    import mlflow
+    import mlflow.sklearn
+    from common.data_files import read_data_folder
+
+    started = time.perf_counter()
+    data = read_data_folder(training_data)
+    features = data[feature_columns]
+    target = data[TARGET_COLUMN].astype(str)
+    print(f"Read {len(data)} training rows in {time.perf_counter() - started:.2f}s")
+
+    pipeline = build_local_pipeline(max_iter, learning_rate, seed)
+    fit_started = time.perf_counter()
+    pipeline.fit(features, target)
+    metrics = {
+        "fit_seconds": time.perf_counter() - fit_started,
+        "training_accuracy": float(pipeline.score(features, target)),
+        "n_iter": float(pipeline.named_steps["classifier"].n_iter_),
+    }
+
+    model_path = Path(model_output) / "outputs" / "mlflow-model"
+    mlflow.sklearn.save_model(
+        pipeline,
+        str(model_path),
+        serialization_format="cloudpickle",
+        pip_requirements=mlflow.sklearn.get_default_pip_requirements(include_cloudpickle=True),
+    )
+
+    # MLflow 3 only writes to a file store after an explicit opt-in; 2.x ignores the variable.
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(Path(tracking_dir).resolve().as_uri())
+    mlflow.set_experiment(EXPERIMENT_NAME)
+    with mlflow.start_run(run_name="local-hist-gradient-boosting"):
+        mlflow.log_params({"backend": "local", "max_iter": max_iter, "learning_rate": learning_rate, "seed": seed, "rows": len(data)})
+        mlflow.log_metrics(metrics)
+        # Same artifact layout as an AutoML child run, so downstream steps can fetch either.
+        mlflow.log_artifacts(str(model_path), artifact_path="outputs/mlflow-model")
+
+    for name, value in metrics.items():
+        print(f"{name}: {value:.4f}")
+    print(f"Model saved in {model_path}")
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("train")
+    parser.add_argument("--training_data", type=str, help="Path to training data")
+    parser.add_argument("--test_data", type=str, help="Path to test data")
+    parser.add_argument("--model_output", type=str, help="Path of output model")
+    parser.add_argument("--model_name", type=str, help="Model name")
+    parser.add_argument("--automl_compute", type=str, default="aml-cluster-dev-cc01", help="Compute cluster for AutoML job")
+    parser.add_argument("--max_automl_trials", type=int, default=1, help="Maximum number of AutoML trials")
+    parser.add_argument("--enable_vote_ensemble", type=str, default="false", help="Set to true to enable vote ensemble")
+    parser.add_argument("--enable_stack_ensemble", type=str, default="false", help="Set to true to enable stack ensemble")
+    parser.add_argument("--backend", type=str, choices=["automl", "local"], default="automl", help="Submit a remote AutoML job, or train in-process without cloud compute")
+    parser.add_argument("--local_max_iter", type=int, default=200, help="Boosting iterations for the local backend")
+    parser.add_argument("--local_learning_rate", type=float, default=0.1, help="Learning rate for the local backend")
+    parser.add_argument("--mlflow_tracking_dir", type=str, default="mlruns", help="Local MLflow file store used by the local backend")
+    parser.add_argument("--monitor", type=str, choices=["poll", "stream"], default="poll", help="Poll the AutoML job and prefetch the best model, or block on the job log stream")
+    parser.add_argument("--poll_initial_seconds", type=float, default=5.0, help="First status polling interval; doubles while the status is unchanged")
+    parser.add_argument("--poll_max_seconds", type=float, default=60.0, help="Upper bound of the status polling interval")
+    parser.add_argument("--job_deadline_minutes", type=float, default=660.0, help="Cancel the AutoML job when it runs longer than this")
+    parser.add_argument("--primary_metric", type=str, default="accuracy", help="Metric AutoML optimizes")
+    parser.add_argument("--sweep_grid", type=str, required=False, help='JSON grid such as {"enable_vote_ensemble": [true, false], "primary_metric": ["accuracy", "AUC_weighted"]}; submits one AutoML job per combination')
+    parser.add_argument("--sweep_metric", type=str, choices=list(SWEEP_METRIC_HIGHER_IS_BETTER), default="accuracy", help="Best-child metric that picks the winner across sweep jobs")
+    parser.add_argument("--sweep_concurrency", type=int, default=4, help="Sweep jobs running at the same time")
+    args = parser.parse_args()
+    if args.poll_initial_seconds <= 0 or args.poll_max_seconds < args.poll_initial_seconds or args.job_deadline_minutes <= 0:
+        raise SystemExit("poll intervals and job_deadline_minutes must be positive, with poll_max_seconds >= poll_initial_seconds")
+    if args.sweep_concurrency < 1:
+        raise SystemExit("sweep_concurrency must be a positive integer")
+    sweep_configs = None
+    if args.sweep_grid:
+        try:
+            sweep_configs = expand_sweep_grid(json.loads(args.sweep_grid))
+        except ValueError as exc:
+            raise SystemExit(f"Invalid sweep_grid: {exc}") from exc
+
+    if args.backend == "local":
+        if args.local_max_iter < 1 or args.local_learning_rate <= 0:
+            raise SystemExit("local_max_iter and local_learning_rate must be positive")
+        train_local(
+            args.training_data,
+            args.model_output,
+            args.mlflow_tracking_dir,
+            max_iter=args.local_max_iter,
+            learning_rate=args.local_learning_rate,
+        )
+        return
+
+    #### Client Getting ML Client
+    from common.ml_clients import get_workspace_client
+
+    ml_client = get_workspace_client()
+    ####
+
+    #### Retreiving AutoML Config
+    compute_name = args.automl_compute
+    _ = ml_client.compute.get(compute_name)
+    print(f"Found existing compute target: {compute_name}")
+    ####
+
+    print("hello training world...")
+
+    lines = [
+        f"Training data path: {args.training_data}",
+        f"Test data path: {args.test_data}",
+        f"Model output path: {args.model_output}",
+        f"Test split ratio:{args.model_name}",
+    ]
+
+    if sweep_configs is not None:
+        submissions = []
+        for config in sweep_configs:
+            job = build_classification_job(argparse.Namespace(**{**vars(args), **config}), compute_name)
+            job.tags = {**(job.tags or {}), "sweep_config": json.dumps(config, sort_keys=True)}
+            submissions.append((config, job))
+        print(f"Sweeping {len(submissions)} AutoML configurations, {args.sweep_concurrency} at a time")
+        watcher = AutoMLJobWatcher(
+            ml_client.jobs,
+            configure_mlflow_tracking(ml_client),
+            initial_delay=args.poll_initial_seconds,
+            max_delay=args.poll_max_seconds,
+            deadline_seconds=args.job_deadline_minutes * 60,
+        )
+        asyncio.run(sweep_and_download(watcher, submissions, args.sweep_metric, args.sweep_concurrency, args.model_output))
+        return
+
+    classification_job = build_classification_job(args, compute_name)
+
+    ### Run Command
+
+    # Submit the AutoML job
+    returned_job = ml_client.jobs.create_or_update(classification_job)  # submit the job to the backend
+
+    print(f"Created job: {returned_job}")
+
+    # Get a URL for the status of the job
+    returned_job.services["Studio"].endpoint
+    print(returned_job.name)
+
+    if args.monitor == "stream":
+        # Wait until the AutoML job is finished
+        ml_client.jobs.stream(returned_job.name)
+        download_best_model(ml_client, returned_job.name, args.model_output)
+    else:
+        watcher = AutoMLJobWatcher(
+            ml_client.jobs,
+            configure_mlflow_tracking(ml_client),
+            initial_delay=args.poll_initial_seconds,
+            max_delay=args.poll_max_seconds,
+            deadline_seconds=args.job_deadline_minutes * 60,
+        )
+        asyncio.run(watcher.watch(returned_job.name, args.model_output))
+
+
+if __name__ == "__main__":
+    main()
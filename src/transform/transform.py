@@ -1,244 +1,541 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 from pathlib import Path
-from uuid import uuid4
-from datetime import datetime
 import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import pandas as pd
 import numpy as np
-import mlflow
-from sklearn.model_selection import train_test_split
-import mltable
-
-#### Client Getting ML Client
-from azure.identity import DefaultAzureCredential,ManagedIdentityCredential,AzureCliCredential
-from azure.ai.ml import automl, Input, MLClient, command
-from azureml.core.run import Run
-
-msi_client_id = os.environ.get("DEFAULT_IDENTITY_CLIENT_ID")
-credential = ManagedIdentityCredential(client_id=msi_client_id)
-credential.get_token("https://management.azure.com/.default")
-run = Run.get_context(allow_offline=False)
-ws = run.experiment.workspace
-ml_client = MLClient(credential=credential,subscription_id=ws._subscription_id,resource_group_name=ws._resource_group,workspace_name=ws._workspace_name,)
-####
-
-parser = argparse.ArgumentParser("transform")
-parser.add_argument("--clean_data", type=str, help="Path to prepped data")
-parser.add_argument("--train_data", type=str, help="Path of train output data")
-parser.add_argument("--test_data", type=str, help="Path of test output data")
-parser.add_argument("--test_split_ratio", type=float, help="ratio of train test split")
-
-args = parser.parse_args()
-
-
-lines = [
-    f"Clean data path: {args.clean_data}",
-    f"Transformed data output path for train data: {args.train_data}",
-    f"Transformed data output path for test data: {args.test_data}",
-]
-
-for line in lines:
-    print(line)
-
-print("mounted_path files: ")
-arr = os.listdir(args.clean_data)
-print(arr)
-
-df_list = []
-for filename in arr:
-    print("reading file: %s ..." % filename)
-    with open(os.path.join(args.clean_data, filename), "r") as handle:
-        # print (handle.read())
-        # ('input_df_%s' % filename) = pd.read_csv((Path(args.training_data) / filename))
-        input_df = pd.read_csv((Path(args.clean_data) / filename))
-        df_list.append(input_df)
-
-
-# Transform the data
-combined_df = df_list[0]
-# These functions filter out coordinates for locations that are outside the city border.
-
-# Filter out coordinates for locations that are outside the city border.
-# Chain the column filter commands within the filter() function
-# and define the minimum and maximum bounds for each field
-
-combined_df = combined_df.astype(
-    {
-        "pickup_longitude": "float64",
-        "pickup_latitude": "float64",
-        "dropoff_longitude": "float64",
-        "dropoff_latitude": "float64",
-    }
-)
-
-latlong_filtered_df = combined_df[
-    (combined_df.pickup_longitude <= -73.72)
-    & (combined_df.pickup_longitude >= -74.09)
-    & (combined_df.pickup_latitude <= 40.88)
-    & (combined_df.pickup_latitude >= 40.53)
-    & (combined_df.dropoff_longitude <= -73.72)
-    & (combined_df.dropoff_longitude >= -74.72)
-    & (combined_df.dropoff_latitude <= 40.88)
-    & (combined_df.dropoff_latitude >= 40.53)
-]
-
-latlong_filtered_df.reset_index(inplace=True, drop=True)
-
-# These functions replace undefined values and rename to use meaningful names.
-replaced_stfor_vals_df = latlong_filtered_df.replace(
-    {"store_forward": "0"}, {"store_forward": "N"}
-).fillna({"store_forward": "N"})
-
-replaced_distance_vals_df = replaced_stfor_vals_df.replace(
-    {"distance": ".00"}, {"distance": 0}
-).fillna({"distance": 0})
-
-normalized_df = replaced_distance_vals_df.astype({"distance": "float64"})
 
-# These functions transform the renamed data to be used finally for training.
+from common import column_types, data_files
+from common.data_files import DATA_SUFFIXES, iter_data_chunks, list_data_files, read_data_file
 
-# Split the pickup and dropoff date further into the day of the week, day of the month, and month values.
-# To get the day of the week value, use the derive_column_by_example() function.
-# The function takes an array parameter of example objects that define the input data,
-# and the preferred output. The function automatically determines your preferred transformation.
-# For the pickup and dropoff time columns, split the time into the hour, minute, and second by using
-# the split_column_by_example() function with no example parameter. After you generate the new features,
-# use the drop_columns() function to delete the original fields as the newly generated features are preferred.
-# Rename the rest of the fields to use meaningful descriptions.
+feature_columns = ["distance", "dropoff_latitude", "dropoff_longitude", "passengers", "pickup_latitude","pickup_longitude","store_forward","vendor","pickup_weekday","pickup_month","pickup_monthday","pickup_hour","pickup_minute","pickup_second","dropoff_weekday","dropoff_month","dropoff_monthday","dropoff_hour","dropoff_minute","dropoff_second",]
 
-temp = pd.DatetimeIndex(normalized_df["pickup_datetime"], dtype="datetime64[ns]")
-normalized_df["pickup_date"] = temp.date
-normalized_df["pickup_weekday"] = temp.dayofweek
-normalized_df["pickup_month"] = temp.month
-normalized_df["pickup_monthday"] = temp.day
-normalized_df["pickup_time"] = temp.time
-normalized_df["pickup_hour"] = temp.hour
-normalized_df["pickup_minute"] = temp.minute
-normalized_df["pickup_second"] = temp.second
-
-temp = pd.DatetimeIndex(normalized_df["dropoff_datetime"], dtype="datetime64[ns]")
-normalized_df["dropoff_date"] = temp.date
-normalized_df["dropoff_weekday"] = temp.dayofweek
-normalized_df["dropoff_month"] = temp.month
-normalized_df["dropoff_monthday"] = temp.day
-normalized_df["dropoff_time"] = temp.time
-normalized_df["dropoff_hour"] = temp.hour
-normalized_df["dropoff_minute"] = temp.minute
-normalized_df["dropoff_second"] = temp.second
-
-del normalized_df["pickup_datetime"]
-del normalized_df["dropoff_datetime"]
-
-normalized_df.reset_index(inplace=True, drop=True)
-
-
-print(normalized_df.head)
-print(normalized_df.dtypes)
+# Calendar parts derived from each timestamp column, as (feature suffix, datetime accessor).
+calendar_parts = [
+    ("weekday", "dayofweek"),
+    ("month", "month"),
+    ("monthday", "day"),
+    ("hour", "hour"),
+    ("minute", "minute"),
+    ("second", "second"),
+]
 
+# Cost deciles used for the label; costs at or below the first edge are labelled "A".
+COST_QUANTILES = [.1, .2, .3, .4, .5, .6 , .7, .8, .9, 1]
+COST_LABELS = ['B','C','D','E','F','G','H','I','J']
+
+# Explicit column types for Parquet outputs so predict/compare/score read typed columns directly.
+# Like the merged schema, integer codes stay integers so CSV and Parquet splits agree on types.
+output_schema = {
+    "distance": "float32",
+    "dropoff_latitude": "float32",
+    "dropoff_longitude": "float32",
+    "passengers": "Int8",
+    "pickup_latitude": "float32",
+    "pickup_longitude": "float32",
+    "store_forward": "int8",
+    "vendor": "Int8",
+    "pickup_weekday": "int8",
+    "pickup_month": "int8",
+    "pickup_monthday": "int8",
+    "pickup_hour": "int8",
+    "pickup_minute": "int8",
+    "pickup_second": "int8",
+    "dropoff_weekday": "int8",
+    "dropoff_month": "int8",
+    "dropoff_monthday": "int8",
+    "dropoff_hour": "int8",
+    "dropoff_minute": "int8",
+    "dropoff_second": "int8",
+    "cost": "category",
+}
+
+
+def _read_shard(path: Path) -> Tuple[pd.DataFrame, float]:
+    started = time.perf_counter()
+    shard = read_data_file(path)
+    return shard, time.perf_counter() - started
+
+
+def read_partitioned_input(clean_data: str, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Read every CSV/Parquet shard under ``clean_data`` concurrently and concatenate them in name order."""
+    files = list_data_files(clean_data)
+    if not files:
+        raise FileNotFoundError(f"No CSV or Parquet files found in {clean_data}")
+
+    started = time.perf_counter()
+    # pandas' C parser and pyarrow release the GIL while parsing, so threads overlap the shard reads.
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(files), (os.cpu_count() or 1) + 4)) as pool:
+        results = list(pool.map(_read_shard, files))
+
+    for path, (shard, seconds) in zip(files, results):
+        megabytes = path.stat().st_size / 1e6
+        seconds = max(seconds, 1e-9)
+        print(
+            f"read shard {path.name}: {len(shard)} rows, {megabytes:.1f} MB in {seconds:.2f}s "
+            f"({len(shard) / seconds:,.0f} rows/s, {megabytes / seconds:.1f} MB/s)"
+        )
+    combined_df = pd.concat([shard for shard, _ in results], ignore_index=True)
+    print(f"read {len(files)} shards, {len(combined_df)} rows in {time.perf_counter() - started:.2f}s")
+    return combined_df
+
+
+def apply_output_schema(df: pd.DataFrame) -> pd.DataFrame:
+    typed = {}
+    for column, dtype in output_schema.items():
+        if dtype == "category":
+            typed[column] = column_types.to_category(df[column])
+        else:
+            typed[column] = df[column].astype(dtype)
+    return pd.DataFrame(typed, index=df.index)
+
+
+def calendar_features(timestamps: pd.Series, prefix: str) -> Dict[str, np.ndarray]:
+    """Return the int8 calendar parts of ``timestamps`` keyed as ``<prefix>_<part>``."""
+    accessor = timestamps.dt
+    return {
+        f"{prefix}_{suffix}": getattr(accessor, attribute).to_numpy(dtype=np.int8)
+        for suffix, attribute in calendar_parts
+    }
 
-# Drop the pickup_date, dropoff_date, pickup_time, dropoff_time columns because they're
-# no longer needed (granular time features like hour,
-# minute and second are more useful for model training).
-del normalized_df["pickup_date"]
-del normalized_df["dropoff_date"]
-del normalized_df["pickup_time"]
-del normalized_df["dropoff_time"]
 
-# Change the store_forward column to binary values
-normalized_df["store_forward"] = np.where((normalized_df.store_forward == "N"), 0, 1)
+def engineer_features(combined_df: pd.DataFrame) -> pd.DataFrame:
+    """Filter raw merged trips and derive the model features in a single pass.
+
+    The returned frame still carries the numeric ``cost``; see ``bin_cost`` for the label.
+    """
+    # Filter out coordinates for locations that are outside the city border.
+    pickup_longitude = combined_df["pickup_longitude"].astype("float64")
+    pickup_latitude = combined_df["pickup_latitude"].astype("float64")
+    dropoff_longitude = combined_df["dropoff_longitude"].astype("float64")
+    dropoff_latitude = combined_df["dropoff_latitude"].astype("float64")
+    in_city = (
+        (pickup_longitude <= -73.72)
+        & (pickup_longitude >= -74.09)
+        & (pickup_latitude <= 40.88)
+        & (pickup_latitude >= 40.53)
+        & (dropoff_longitude <= -73.72)
+        & (dropoff_longitude >= -74.72)
+        & (dropoff_latitude <= 40.88)
+        & (dropoff_latitude >= 40.53)
+    )
+
+    # Undefined distances (".00" or missing) count as zero and are dropped by the final filter.
+    distance = pd.to_numeric(combined_df["distance"]).fillna(0).astype("float64")
+    cost = combined_df["cost"]
+
+    # Parse each timestamp column once; rows whose timestamps cannot be parsed carry no calendar features.
+    pickup = column_types.parse_timestamps(combined_df["pickup_datetime"])
+    dropoff = column_types.parse_timestamps(combined_df["dropoff_datetime"])
+
+    # Eliminate incorrectly captured data points: a zero cost or distance is a major outlier.
+    keep = (in_city & (distance > 0) & (cost > 0) & pickup.notna() & dropoff.notna()).to_numpy()
+
+    # Missing and "0" store_forward flags mean "N"; the flag is encoded as 0 for "N" and 1 otherwise.
+    store_forward = combined_df["store_forward"].to_numpy(dtype=object)[keep]
+    store_forward_flag = np.where(
+        pd.isna(store_forward) | (store_forward == "N") | (store_forward == "0"), 0, 1
+    )
+
+    # Masking the backing arrays keeps extension dtypes (Int8, categorical) and avoids index alignment.
+    features = {
+        "cost": cost.array[keep],
+        "distance": distance.array[keep],
+        "dropoff_latitude": dropoff_latitude.array[keep],
+        "dropoff_longitude": dropoff_longitude.array[keep],
+        "passengers": combined_df["passengers"].array[keep],
+        "pickup_latitude": pickup_latitude.array[keep],
+        "pickup_longitude": pickup_longitude.array[keep],
+        "store_forward": store_forward_flag,
+        "vendor": combined_df["vendor"].array[keep],
+    }
+    features.update(calendar_features(pickup[keep], "pickup"))
+    features.update(calendar_features(dropoff[keep], "dropoff"))
+    return pd.DataFrame(features)
 
-# Before you package the dataset, run two final filters on the dataset.
-# To eliminate incorrectly captured data points,
-# filter the dataset on records where both the cost and distance variable values are greater than zero.
-# This step will significantly improve machine learning model accuracy,
-# because data points with a zero cost or distance represent major outliers that throw off prediction accuracy.
 
-final_df = normalized_df[(normalized_df.distance > 0) & (normalized_df.cost > 0)]
-final_df.reset_index(inplace=True, drop=True)
+def label_cost(cost: pd.Series, edges: Sequence[float]) -> pd.Series:
+    """Label costs with decile ``edges``; costs outside the edges fall into "A"."""
+    return pd.cut(cost, list(edges), labels=COST_LABELS).astype(object).fillna("A")
 
-categorical_target = categorical_target = list(pd.cut(final_df['cost'], list(final_df['cost'].quantile([.1, .2, .3, .4, .5, .6 , .7, .8, .9, 1])), labels = ['B','C','D','E','F','G','H','I','J'], retbins=False))
-final_df['cost'] = categorical_target
-final_df['cost'] = final_df['cost'].fillna("A")
-print(len(final_df))
 
-print(final_df.head())
+def bin_cost(final_df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the numeric cost with its decile label; the lowest decile is "A"."""
+    final_df["cost"] = label_cost(final_df["cost"], final_df["cost"].quantile(COST_QUANTILES))
+    return final_df
 
 
-# Splitting data on train/test
+def _save_mltable(data_location: str, output_folder: str, output_format: str) -> None:
+    import mltable
 
-print(final_df.columns)
+    if output_format == "parquet":
+        tbl = mltable.from_parquet_files(paths=[{"file": data_location}])
+    else:
+        tbl = mltable.from_delimited_files(paths=[{"file": data_location}])
+    print(data_location)
+    tbl.save(str(Path(output_folder)))
 
-# Split the data into input(X) and output(y)
-y = final_df["cost"]
-# X = train_data.drop(['cost'], axis=1)
-X = final_df[
-    ["distance", "dropoff_latitude", "dropoff_longitude", "passengers", "pickup_latitude","pickup_longitude","store_forward","vendor","pickup_weekday","pickup_month","pickup_monthday","pickup_hour","pickup_minute","pickup_second","dropoff_weekday","dropoff_month","dropoff_monthday","dropoff_hour","dropoff_minute","dropoff_second",]
-]
 
-# Split the data into train and test sets
-trainX, testX, trainy, testy = train_test_split(
-    X, y, test_size=args.test_split_ratio, random_state=42, stratify = y
-)
-print(trainX.shape)
-print(trainX.columns)
+def save_split(df: pd.DataFrame, output_folder: str, stem: str, output_format: str) -> str:
+    """Write one split to ``output_folder`` and save an MLTable definition pointing at it."""
+    data_location = str(Path(output_folder) / f"{stem}.{output_format}")
+    if output_format == "parquet":
+        apply_output_schema(df).to_parquet(data_location, index=False)
+    else:
+        df.to_csv(data_location, index=False)
+    _save_mltable(data_location, output_folder, output_format)
+    return data_location
 
-##-----------------------------------------------------------------
-from azure.ai.ml.constants import AssetTypes
-from azure.ai.ml.entities import Data
 
-# test_data = pd.DataFrame(testX, columns = )
-testX["cost"] = testy
-print(testX.shape)
+def transform_in_memory(
+    clean_data: str,
+    train_data: str,
+    test_data: str,
+    test_split_ratio: float,
+    output_format: str,
+    read_workers: Optional[int] = None,
+) -> Tuple[str, str]:
+    print("mounted_path files: ")
+    print(os.listdir(clean_data))
 
-#Saving CSV File to test_data location
-test_data_location = str(Path(args.test_data) / "test_data.csv")
-print(test_data_location)
-test_data = testX.to_csv(test_data_location,index=False)
+    # Transform the data
+    combined_df = read_partitioned_input(clean_data, read_workers)
 
-## Save mlflow table to output folder
-paths = [{"file": test_data_location}]
-tbl = mltable.from_delimited_files(paths = paths)
-tbl.save(str(Path(args.test_data)))
+    final_df = engineer_features(combined_df)
+    del combined_df
 
-## Create and update dataset
-tbl.save(str(Path(args.test_data)))
+    print(final_df.head)
+    print(final_df.dtypes)
 
-## Save register dataset
+    final_df = bin_cost(final_df)
+    print(len(final_df))
 
-my_data = Data(
-    path=str(Path(args.test_data)),
-    type=AssetTypes.MLTABLE,
-    description="The titanic dataset.",
-    name="cat-sample-test-data",)
+    print(final_df.head())
 
-ml_client.data.create_or_update(my_data)
 
+    # Splitting data on train/test
 
-##-----------------------------------------------------------------
+    print(final_df.columns)
 
-# train_data = pd.DataFrame(trainX, columns = )
-trainX["cost"] = trainy
-print(testX.shape)
+    from sklearn.model_selection import train_test_split
 
-#Saving CSV File to train_data location
-train_data_location = str(Path(args.train_data) / "train_data.csv")
-print(train_data_location)
-train_data = trainX.to_csv(train_data_location,index=False)
+    # Split the data into input(X) and output(y)
+    y = final_df["cost"]
+    X = final_df[feature_columns]
 
-## Save mlflow table to output folder
-paths = [{"file": train_data_location}]
-tbl = mltable.from_delimited_files(paths = paths)
-tbl.save(str(Path(args.train_data)))
+    # Split the data into train and test sets
+    trainX, testX, trainy, testy = train_test_split(
+        X, y, test_size=test_split_ratio, random_state=42, stratify = y
+    )
+    print(trainX.shape)
+    print(trainX.columns)
 
-## Create and update dataset
-tbl.save(str(Path(args.train_data)))
+    testX = testX.assign(cost=testy)
+    print(testX.shape)
 
-## Save register dataset
+    #Saving test split and its mlflow table to test_data location
+    test_data_location = save_split(testX, test_data, "test_data", output_format)
 
-my_data = Data(
-    path=str(Path(args.train_data)),
-    type=AssetTypes.MLTABLE,
-    description="The titanic dataset.",
-    name="cat-sample-train-data",)
+    trainX = trainX.assign(cost=trainy)
+    print(trainX.shape)
 
-ml_client.data.create_or_update(my_data)
\ No newline at end of file
+    #Saving train split and its mlflow table to train_data location
+    train_data_location = save_split(trainX, train_data, "train_data", output_format)
+    return train_data_location, test_data_location
+
+
+# Tag on registered Data versions holding the digest of the split files they were created from.
+FINGERPRINT_TAG = "content_sha256"
+
+
+def fingerprint_split(output_folder: str) -> str:
+    """Digest the data files of a split folder, ignoring the MLTable file that embeds absolute paths."""
+    from common.step_cache import file_digest
+
+    digest = hashlib.sha256()
+    for path in sorted(Path(output_folder).iterdir()):
+        if path.suffix not in DATA_SUFFIXES:
+            continue
+        digest.update(f"{path.name}:{file_digest(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def register_split(ml_client, output_folder: str, name: str, description: str):
+    """Register ``output_folder`` as an MLTable Data asset unless the latest version has the same content."""
+    from azure.ai.ml.constants import AssetTypes
+    from azure.ai.ml.entities import Data
+    from azure.core.exceptions import ResourceNotFoundError
+
+    fingerprint = fingerprint_split(output_folder)
+    try:
+        latest = ml_client.data.get(name=name, label="latest")
+    except ResourceNotFoundError:
+        latest = None
+
+    if latest is not None and (latest.tags or {}).get(FINGERPRINT_TAG) == fingerprint:
+        print(f"Data asset {name}:{latest.version} already holds this content; skipping upload and registration")
+        return latest
+
+    my_data = Data(
+        path=str(Path(output_folder)),
+        type=AssetTypes.MLTABLE,
+        description=description,
+        name=name,
+        tags={FINGERPRINT_TAG: fingerprint},
+    )
+    registered = ml_client.data.create_or_update(my_data)
+    print(f"Registered data asset {name}:{getattr(registered, 'version', None)}")
+    return registered
+
+
+#### Out-of-core engine
+
+
+class CostQuantileSketch:
+    """Streaming quantile sketch that keeps one count per distinct cost value.
+
+    Fares are recorded in cents, so the distinct-value histogram stays small and the
+    quantiles are exactly those of ``Series.quantile`` (linear interpolation). If more than
+    ``max_bins`` distinct values are seen, keys are rounded to one fewer decimal place, which
+    bounds memory at the price of approximate edges.
+    """
+
+    def __init__(self, max_bins: int = 1_000_000) -> None:
+        self.max_bins = max_bins
+        self.decimals: Optional[int] = None
+        self.values = np.empty(0, dtype="float64")
+        self.counts = np.empty(0, dtype="int64")
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        if self.decimals is not None:
+            values = np.round(values, self.decimals)
+        chunk_values, chunk_counts = np.unique(values, return_counts=True)
+        self._merge(chunk_values, chunk_counts)
+        while self.values.size > self.max_bins:
+            self.decimals = 6 if self.decimals is None else self.decimals - 1
+            self._merge(np.round(self.values, self.decimals), self.counts, replace=True)
+
+    def _merge(self, values: np.ndarray, counts: np.ndarray, replace: bool = False) -> None:
+        if not replace:
+            values = np.concatenate([self.values, values])
+            counts = np.concatenate([self.counts, counts])
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=self.values.size).astype("int64")
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def _value_at_rank(self, cumulative: np.ndarray, rank: int) -> float:
+        return float(self.values[np.searchsorted(cumulative, rank, side="right")])
+
+    def quantiles(self, probabilities: Sequence[float]) -> List[float]:
+        if self.count == 0:
+            raise ValueError("Cannot compute quantiles of an empty sketch")
+        cumulative = np.cumsum(self.counts)
+        edges = []
+        for probability in probabilities:
+            position = probability * (self.count - 1)
+            lower_rank = int(np.floor(position))
+            upper_rank = int(np.ceil(position))
+            lower = self._value_at_rank(cumulative, lower_rank)
+            upper = self._value_at_rank(cumulative, upper_rank)
+            fraction = position - lower_rank
+            # Same interpolation as numpy's "linear" method, so edges match Series.quantile bit for bit.
+            diff = upper - lower
+            edges.append(lower + diff * fraction if fraction < 0.5 else upper - diff * (1 - fraction))
+        return edges
+
+
+def assign_test_rows(features: pd.DataFrame, test_split_ratio: float, seed: int = 42) -> np.ndarray:
+    """Deterministically assign rows to the test split from a hash of their content.
+
+    Each row is kept or held out independently of its position in the input, so every cost
+    class is split at ``test_split_ratio`` in expectation and reruns produce the same split.
+    """
+    key = pd.DataFrame(
+        {
+            column: features[column].astype("float64")
+            if pd.api.types.is_numeric_dtype(features[column]) and not isinstance(features[column].dtype, pd.CategoricalDtype)
+            else features[column].astype(str)
+            for column in features.columns
+        }
+    )
+    hashes = pd.util.hash_pandas_object(key, index=False, hash_key=f"transform{seed:07d}"[:16]).to_numpy()
+    uniform = (hashes >> np.uint64(11)).astype("float64") / float(1 << 53)
+    return uniform < test_split_ratio
+
+
+class _SplitWriter:
+    """Append chunks of one split to a single CSV or Parquet file."""
+
+    def __init__(self, output_folder: str, stem: str, output_format: str) -> None:
+        self.output_folder = output_folder
+        self.output_format = output_format
+        self.data_location = str(Path(output_folder) / f"{stem}.{output_format}")
+        self.rows = 0
+        self._handle = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                self._schema = pa.Schema.from_pandas(apply_output_schema(df.iloc[:0]), preserve_index=False)
+                self._writer = pq.ParquetWriter(self.data_location, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(apply_output_schema(df), schema=self._schema, preserve_index=False))
+        else:
+            if self._handle is None:
+                self._handle = open(self.data_location, "w", encoding="utf-8", newline="")
+                df.to_csv(self._handle, index=False)
+            else:
+                df.to_csv(self._handle, index=False, header=False)
+        self.rows += len(df)
+
+    def close(self) -> str:
+        if self.rows == 0:
+            empty = pd.DataFrame({column: pd.Series(dtype="object") for column in feature_columns + ["cost"]})
+            self.write(empty)
+        if self._writer is not None:
+            self._writer.close()
+        if self._handle is not None:
+            self._handle.close()
+        _save_mltable(self.data_location, self.output_folder, self.output_format)
+        return self.data_location
+
+
+def transform_out_of_core(
+    clean_data: str,
+    train_data: str,
+    test_data: str,
+    test_split_ratio: float,
+    chunk_rows: int,
+    output_format: str,
+) -> Tuple[str, str]:
+    """Two passes over chunked input: global cost edges first, then featurize, label and split."""
+    sketch = CostQuantileSketch()
+    for chunk in iter_data_chunks(clean_data, chunk_rows):
+        sketch.update(engineer_features(chunk)["cost"].to_numpy())
+    if sketch.decimals is not None:
+        print(f"Cost sketch coarsened to {sketch.decimals} decimals; bin edges are approximate")
+    edges = sketch.quantiles(COST_QUANTILES)
+    print(f"Cost bin edges over {sketch.count} rows: {edges}")
+
+    train_writer = _SplitWriter(train_data, "train_data", output_format)
+    test_writer = _SplitWriter(test_data, "test_data", output_format)
+    class_counts: Dict[str, List[int]] = {}
+    for chunk in iter_data_chunks(clean_data, chunk_rows):
+        final_df = engineer_features(chunk)
+        final_df["cost"] = label_cost(final_df["cost"], edges)
+        final_df = final_df[feature_columns + ["cost"]]
+        is_test = assign_test_rows(final_df, test_split_ratio)
+        train_writer.write(final_df[~is_test])
+        test_writer.write(final_df[is_test])
+        chunk_counts = pd.Series(is_test).groupby(final_df["cost"].to_numpy()).agg(["size", "sum"])
+        for label, (rows, test_rows) in chunk_counts.iterrows():
+            counts = class_counts.setdefault(label, [0, 0])
+            counts[0] += int(rows - test_rows)
+            counts[1] += int(test_rows)
+
+    for label in sorted(class_counts):
+        train_rows, test_rows = class_counts[label]
+        print(f"Class {label}: {train_rows} train rows, {test_rows} test rows")
+    print(f"Out-of-core split: {train_writer.rows} train rows, {test_writer.rows} test rows")
+    return train_writer.close(), test_writer.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("transform")
+    parser.add_argument("--clean_data", type=str, help="Path to prepped data")
+    parser.add_argument("--train_data", type=str, help="Path of train output data")
+    parser.add_argument("--test_data", type=str, help="Path of test output data")
+    parser.add_argument("--test_split_ratio", type=float, help="ratio of train test split")
+    parser.add_argument("--output_format", type=str, choices=["csv", "parquet"], default="csv", help="File format of the train/test outputs")
+    parser.add_argument("--chunk_rows", type=int, default=0, help="Rows per chunk for the two-pass out-of-core transform; 0 transforms in memory")
+    parser.add_argument("--cache_dir", type=str, required=False, help="Persistent folder for the step output cache; caching is off when omitted")
+    parser.add_argument("--cache_max_gb", type=float, default=20.0, help="Size bound of the step cache before LRU eviction")
+    parser.add_argument("--read_workers", type=int, default=None, help="Threads used to read input shards in memory; defaults to one per shard up to cpu_count + 4")
+
+    args = parser.parse_args()
+    if args.chunk_rows < 0:
+        raise SystemExit("chunk_rows must be zero or a positive integer")
+
+    #### Client Getting ML Client
+    from common.ml_clients import get_workspace_client
+
+    ml_client = get_workspace_client()
+    ####
+
+    lines = [
+        f"Clean data path: {args.clean_data}",
+        f"Transformed data output path for train data: {args.train_data}",
+        f"Transformed data output path for test data: {args.test_data}",
+    ]
+
+    for line in lines:
+        print(line)
+
+    cache = None
+    cache_hit = False
+    cache_outputs = {"train_data": args.train_data, "test_data": args.test_data}
+    if args.cache_dir:
+        from common.step_cache import StepCache, compute_key
+
+        cache = StepCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
+        cache_key = compute_key(
+            __file__,
+            {path.name: path for path in list_data_files(args.clean_data)},
+            {"test_split_ratio": args.test_split_ratio, "output_format": args.output_format, "chunk_rows": args.chunk_rows},
+            modules=[column_types.__file__, data_files.__file__],
+        )
+        cache_hit = cache.restore(cache_key, cache_outputs)
+        if not cache_hit:
+            print(f"Step cache miss for {cache_key}; transforming")
+
+    if cache_hit:
+        print(f"Restored train/test data from step cache entry {cache_key}")
+        # MLTable definitions reference absolute file paths, so point them at the restored copies.
+        train_data_location = str(Path(args.train_data) / f"train_data.{args.output_format}")
+        test_data_location = str(Path(args.test_data) / f"test_data.{args.output_format}")
+        _save_mltable(train_data_location, args.train_data, args.output_format)
+        _save_mltable(test_data_location, args.test_data, args.output_format)
+    elif args.chunk_rows:
+        print(f"Out-of-core transform with chunks of {args.chunk_rows} rows")
+        train_data_location, test_data_location = transform_out_of_core(
+            args.clean_data,
+            args.train_data,
+            args.test_data,
+            args.test_split_ratio,
+            args.chunk_rows,
+            args.output_format,
+        )
+    else:
+        train_data_location, test_data_location = transform_in_memory(
+            args.clean_data,
+            args.train_data,
+            args.test_data,
+            args.test_split_ratio,
+            args.output_format,
+            args.read_workers,
+        )
+    if cache is not None and not cache_hit:
+        cache.store(cache_key, cache_outputs)
+
+    ## Save register dataset
+    register_split(ml_client, args.test_data, "cat-sample-test-data", "The titanic dataset.")
+    register_split(ml_client, args.train_data, "cat-sample-train-data", "The titanic dataset.")
+
+
+if __name__ == "__main__":
+    main()
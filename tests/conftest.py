@@ -0,0 +1,27 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+# Components ship src/common next to each step script via additional_includes, so the scripts
+# import it as the top-level package ``common``; putting src on the path gives tests the same layout.
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+ONLINE_SCORING_DIR = (
+    Path(__file__).resolve().parents[1]
+    / "notebooks" / "deployments" / "online" / "custom_scoring_script" / "model-1" / "onlinescoring"
+)
+
+
+@pytest.fixture
+def load_scoring_script():
+    """Return a loader that executes an online scoring script by file name as a fresh module."""
+
+    def load(filename, module_name="online_score"):
+        spec = importlib.util.spec_from_file_location(module_name, ONLINE_SCORING_DIR / filename)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,104 @@
+"""Startup benchmark for the pipeline step scripts.
+
+Runs every step script with ``--help`` under ``python -X importtime`` and records the wall time,
+the time spent importing modules and the slowest top-level imports. ``--help`` exits right after
+argument parsing, so the numbers show what a step pays before it does any work.
+
+    python tests/import_time_benchmark.py --repeat 3 --output import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+STEP_SCRIPTS = [
+    "src/merge_data/merge_data.py",
+    "src/transform/transform.py",
+    "src/train/train.py",
+    "src/predict/predict.py",
+    "src/compare/compare.py",
+    "src/score/score.py",
+    "src/register/register.py",
+    "src/deploy/deploy.py",
+    "src/traffic/select_slot.py",
+    "src/traffic/update_traffic.py",
+    "src/test_endpoint/test_endpoint.py",
+    "src/create_env/create_env.py",
+    "src/cleanup_models/cleanup_models.py",
+]
+
+# Packages a step should only import once it actually needs them.
+HEAVY_PACKAGES = ("mlflow", "sklearn", "mltable", "azure.ai.ml", "azureml")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return ``(module, depth, cumulative_us)`` for every line of ``-X importtime`` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        imports.append((stripped.strip(), (len(name) - len(stripped) - 1) // 2, int(cumulative)))
+    return imports
+
+
+def measure(script: str) -> Dict[str, object]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", str(REPO_ROOT / script), "--help"],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        # Components ship src/common next to each script, so the package must be importable as ``common``.
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT / "src")},
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    imports = parse_importtime(completed.stderr)
+    top_level = sorted(((name, us) for name, depth, us in imports if depth == 0), key=lambda item: -item[1])
+    return {
+        "returncode": completed.returncode,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(us for _, us in top_level) / 1000, 1),
+        "modules": [name for name, _, _ in imports],
+        "slowest_imports": [{"module": name, "ms": round(us / 1000, 1)} for name, us in top_level[:5]],
+    }
+
+
+def heavy_imports(modules: List[str]) -> List[str]:
+    return sorted({name for name in modules if any(name == package or name.startswith(f"{package}.") for package in HEAVY_PACKAGES)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("import_time_benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per script; the median wall time is reported")
+    parser.add_argument("--output", type=str, required=False, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    report = {}
+    for script in STEP_SCRIPTS:
+        runs = [measure(script) for _ in range(max(1, args.repeat))]
+        median = sorted(runs, key=lambda run: run["wall_ms"])[len(runs) // 2]
+        report[script] = {
+            "returncode": median["returncode"],
+            "wall_ms": statistics.median(run["wall_ms"] for run in runs),
+            "import_ms": median["import_ms"],
+            "heavy_imports": heavy_imports(median["modules"]),
+            "slowest_imports": median["slowest_imports"],
+        }
+        print(f"{script:45s} {report[script]['wall_ms']:8.1f} ms  imports {median['import_ms']:8.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Local load test for the online scoring script's micro-batching.
+
+Drives ``run()`` of the custom scoring script from many threads with small requests, like the
+10-row samples test_endpoint.py sends, once with one ``predict`` call per request and once with the
+MicroBatcher, and reports throughput and latency percentiles for both. The model is a
+LinearRegression fitted on random data with the endpoint's 10 features, so no model download is needed.
+
+    python tests/online_scoring_load_test.py --requests 5000 --concurrency 32 --output load_test.json
+"""
+
+import argparse
+import importlib.util
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+SCORING_SCRIPT = (
+    Path(__file__).resolve().parents[1]
+    / "notebooks" / "deployments" / "online" / "custom_scoring_script" / "model-1" / "onlinescoring" / "score.py"
+)
+
+
+def load_scoring_script():
+    spec = importlib.util.spec_from_file_location("online_score", SCORING_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fit_model(feature_count: int, seed: int = 0):
+    from sklearn.linear_model import LinearRegression
+
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(1000, feature_count))
+    return LinearRegression().fit(features, features @ rng.normal(size=feature_count))
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def drive(score, requests: int, concurrency: int, rows: int, seed: int = 0) -> Dict[str, float]:
+    """Send ``requests`` requests of ``rows`` rows through ``score.run`` from ``concurrency`` threads."""
+    rng = np.random.default_rng(seed)
+    bodies = [json.dumps({"data": rng.normal(size=(rows, score.FEATURE_COUNT)).round(3).tolist()}) for _ in range(64)]
+
+    def send(index: int) -> float:
+        started = time.perf_counter()
+        score.run(bodies[index % len(bodies)])
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(send, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def run_load_test(requests: int, concurrency: int, rows: int, max_batch_rows: int, max_wait_ms: float) -> Dict[str, Dict[str, float]]:
+    score = load_scoring_script()
+    score.model = fit_model(score.FEATURE_COUNT)
+    score.collection = None
+    score.cache = None
+
+    report = {}
+    score.batcher = None
+    report["per_request"] = drive(score, requests, concurrency, rows)
+    score.batcher = score.MicroBatcher(score.model.predict, max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms)
+    try:
+        report["batched"] = drive(score, requests, concurrency, rows)
+        stats = score.batcher.stats()
+    finally:
+        score.batcher.close(5)
+    report["batched"]["mean_batch_requests"] = round(stats["requests"] / max(stats["batches"], 1), 1)
+    report["speedup"] = round(report["batched"]["requests_per_second"] / report["per_request"]["requests_per_second"], 2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser("online_scoring_load_test")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Threads calling run() at the same time")
+    parser.add_argument("--rows", type=int, default=10, help="Rows per request")
+    parser.add_argument("--max_batch_rows", type=int, default=256, help="MicroBatcher batch size limit")
+    parser.add_argument("--max_wait_ms", type=float, default=0.0, help="MicroBatcher wait for more requests")
+    parser.add_argument("--output", type=str, required=False, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    report = run_load_test(args.requests, args.concurrency, args.rows, args.max_batch_rows, args.max_wait_ms)
+    for mode in ("per_request", "batched"):
+        result = report[mode]
+        print(f"{mode:12s} {result['requests_per_second']:10.1f} req/s  p50 {result['p50_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms")
+    print(f"speedup x{report['speedup']} (mean batch {report['batched']['mean_batch_requests']} requests)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
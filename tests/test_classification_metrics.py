@@ -0,0 +1,20 @@
+import numpy as np
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+
+from common.classification_metrics import confusion_metrics
+
+
+def test_confusion_metrics_match_sklearn_for_single_and_stacked_matrices():
+    rng = np.random.default_rng(0)
+    labels = list("ABCD")
+    actual = rng.choice(labels[:3], size=200)
+    predicted = rng.choice(labels, size=200)
+    confusion = confusion_matrix(actual, predicted, labels=labels)
+
+    single = confusion_metrics(confusion)
+    stacked = confusion_metrics(np.stack([confusion, np.zeros_like(confusion)]))
+
+    assert np.isclose(single["accuracy"], accuracy_score(actual, predicted))
+    assert np.isclose(single["macro_f1"], f1_score(actual, predicted, average="macro"))
+    assert np.allclose(stacked["macro_f1"], [single["macro_f1"], 0.0])
+    assert single["support"].tolist() == confusion.sum(axis=1).tolist()
@@ -0,0 +1,240 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.cleanup_models import cleanup_models
+
+
+class FakeModelStore:
+    """Workspace-style model store whose deletions only show up in listings ``lag`` lists later."""
+
+    def __init__(self, versions, lag=1, failing=(), registry=False):
+        self.versions = {str(version) for version in versions}
+        self.lag = lag
+        self.failing = set(failing)
+        self.pending = {}
+        self.list_calls = 0
+        self.deleted = []
+        self.delete_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(
+            list=self.list,
+            get=self.get,
+            _model_versions_operation=SimpleNamespace(delete=self.registry_delete if registry else self.delete),
+            _operation_scope=SimpleNamespace(
+                _registry_name="shared" if registry else None, _resource_group_name="rg", _workspace_name="ws"
+            ),
+        )
+
+    def list(self, name):
+        with self._lock:
+            self.list_calls += 1
+            for version, remaining in list(self.pending.items()):
+                if remaining <= 1:
+                    self.versions.discard(version)
+                    del self.pending[version]
+                else:
+                    self.pending[version] = remaining - 1
+            return [SimpleNamespace(name=name, version=version) for version in self.versions]
+
+    def get(self, name, version):
+        raise AssertionError("deletions are confirmed by listing, not per-version polling")
+
+    def delete(self, resource_group, workspace_name, name, version):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.delete_times.append(time.monotonic())
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+            if version in self.failing:
+                raise HttpResponseError(message=f"cannot delete {version}")
+            if version not in self.versions:
+                raise ResourceNotFoundError(f"{version} not found")
+            self.deleted.append(version)
+            self.pending[version] = self.lag
+
+    def registry_delete(self, name, version, resource_group, registry_name):
+        self.delete(resource_group, None, name, version)
+
+
+def _cleanup(store, retain_count=2, keep_versions=(), **kwargs):
+    options = {"dry_run": False, "confirm_initial_delay": 0.001}
+    options.update(kwargs)
+    policy = cleanup_models.RetentionPolicy(keep_last=retain_count, pinned=keep_versions)
+    return cleanup_models._cleanup_for_client("workspace", store, "taxi", policy, **options)
+
+
+def test_deletes_concurrently_and_confirms_with_batched_lists():
+    store = FakeModelStore(range(1, 21), lag=2)
+
+    report = _cleanup(store, max_workers=4)
+
+    assert sorted(report["deleted_versions"], key=int) == [str(v) for v in range(1, 19)]
+    assert report["kept_versions"] == ["20", "19"]
+    assert store.versions == {"19", "20"}
+    assert store.max_in_flight == 4
+    # One initial list plus a couple of confirmation rounds, not a poll per version.
+    assert store.list_calls <= 4
+
+
+def test_keeps_deployed_version_and_supports_registry_scope():
+    store = FakeModelStore(range(1, 6), registry=True)
+
+    report = _cleanup(store, keep_versions={"2"}, retain_count=2)
+
+    # Pinned versions are kept on top of the latest N.
+    assert set(report["deleted_versions"]) == {"1", "3"}
+    assert store.versions == {"2", "4", "5"}
+    assert report["keep_reasons"]["2"] == ["pinned"]
+
+
+def test_rate_limiter_spaces_deletions():
+    store = FakeModelStore(range(1, 7))
+
+    _cleanup(store, retain_count=1, max_workers=5, rate_limiter=cleanup_models.RateLimiter(50))
+
+    gaps = [later - earlier for earlier, later in zip(store.delete_times, store.delete_times[1:])]
+    assert len(gaps) == 4 and min(gaps) >= 0.015
+
+
+def test_failed_deletion_is_raised_after_others_are_confirmed():
+    store = FakeModelStore(range(1, 6), failing={"2"})
+
+    with pytest.raises(HttpResponseError, match="cannot delete 2"):
+        _cleanup(store, retain_count=1)
+
+    assert store.versions == {"2", "5"}
+
+
+def test_unconfirmed_deletions_raise():
+    store = FakeModelStore(range(1, 4), lag=100)
+
+    with pytest.raises(HttpResponseError, match="still exist"):
+        cleanup_models._confirm_deletions(store, "taxi", ["1"], retries=2, initial_delay=0.001)
+
+
+def test_dry_run_deletes_nothing():
+    store = FakeModelStore(range(1, 4))
+
+    report = _cleanup(store, retain_count=1, dry_run=True)
+
+    assert report["deleted_versions"] == ["2", "1"] and store.deleted == []
+
+
+def _model(version, days_old=0, tags=None):
+    created = datetime(2026, 10, 16, tzinfo=timezone.utc) - timedelta(days=days_old)
+    return SimpleNamespace(version=str(version), tags=tags or {}, creation_context=SimpleNamespace(created_at=created))
+
+
+def test_retention_policy_combines_rules():
+    models = [_model(v, days_old=40 - v) for v in range(1, 41)]
+    models[4].tags = {"stage": "production"}
+    models[9].tags = {"stage": "archived"}
+    deployed = {
+        (None, "taxi", "3"): ["taxi-ep/green (0%)"],
+        ("shared", "taxi", "7"): ["taxi-ep/blue (100%)"],
+        (None, "other", "8"): ["other-ep/blue (100%)"],
+    }
+    policy = cleanup_models.RetentionPolicy(
+        keep_last=2, keep_days=3, pinned={"11"}, keep_tags={"stage": "production"}, deployed=deployed
+    )
+    now = datetime(2026, 10, 16, tzinfo=timezone.utc)
+
+    workspace = policy.evaluate(models, "taxi", now=now)
+    registry = policy.evaluate(models, "taxi", registry_name="shared", now=now)
+
+    assert sorted(workspace, key=int) == ["3", "5", "11", "37", "38", "39", "40"]
+    assert workspace["3"] == ["deployed at taxi-ep/green (0%)"]
+    assert workspace["5"] == ["tag stage=production"]
+    assert workspace["40"] == ["latest 2", "newer than 3 days"]
+    assert "7" in registry and "3" not in registry
+
+
+def test_deployed_model_refs_parse_every_reference_style():
+    deployments = {
+        "taxi-ep": [
+            SimpleNamespace(name="blue", model="azureml://registries/shared/models/taxi/versions/7"),
+            SimpleNamespace(name="green", model="azureml:taxi:9"),
+        ],
+        "other-ep": [
+            SimpleNamespace(name="blue", model=SimpleNamespace(id="/subscriptions/s/resourceGroups/rg/providers/Microsoft.MachineLearningServices/workspaces/ws/models/taxi/versions/4")),
+        ],
+    }
+    client = SimpleNamespace(
+        online_endpoints=SimpleNamespace(list=lambda: [SimpleNamespace(name=name, traffic={"blue": 100}) for name in deployments]),
+        online_deployments=SimpleNamespace(list=lambda endpoint_name: deployments[endpoint_name]),
+    )
+
+    refs = cleanup_models._deployed_model_refs(client)
+
+    assert refs == {
+        ("shared", "taxi", "7"): ["taxi-ep/blue (100%)"],
+        (None, "taxi", "9"): ["taxi-ep/green (0%)"],
+        (None, "taxi", "4"): ["other-ep/blue (100%)"],
+    }
+
+
+def test_parse_tag_rules():
+    assert cleanup_models.parse_tag_rules("stage=production, pinned") == {"stage": "production", "pinned": None}
+    assert cleanup_models.parse_tag_rules(None) == {}
+
+
+def test_retention_policy_evaluates_thousands_of_versions_quickly():
+    models = [_model(v, days_old=v % 100, tags={"keep": "yes"} if v % 500 == 0 else {}) for v in range(5000)]
+    policy = cleanup_models.RetentionPolicy(keep_last=10, keep_days=1, keep_tags={"keep": "yes"})
+
+    started = time.perf_counter()
+    reasons = policy.evaluate(models, "taxi", now=datetime(2026, 10, 16, tzinfo=timezone.utc))
+
+    assert time.perf_counter() - started < 1.0
+    # The latest 10 plus the 100 versions at most a day old; every tagged version is among the latter.
+    assert len(reasons) == 10 + 100
+
+
+def _deployment_client(workspace_name, models):
+    return SimpleNamespace(
+        workspace_name=workspace_name,
+        online_endpoints=SimpleNamespace(list=lambda: [SimpleNamespace(name="taxi-ep", traffic={"blue": 100})]),
+        online_deployments=SimpleNamespace(
+            list=lambda endpoint_name: [SimpleNamespace(name="blue", model=model) for model in models]
+        ),
+    )
+
+
+def test_scan_deployments_protects_registry_versions_served_by_other_workspaces():
+    dev = _deployment_client("dev-ws", ["azureml://registries/shared/models/taxi/versions/7"])
+    prod = _deployment_client("prod-ws", ["azureml://registries/shared/models/taxi/versions/5", "azureml:taxi:3"])
+
+    refs, scanned = cleanup_models._scan_deployments(dev, {"prod-ws": prod})
+
+    assert scanned == ["dev-ws", "prod-ws"]
+    # prod's own workspace model is not the one cleaned up here, so only its registry reference counts.
+    assert refs == {
+        ("shared", "taxi", "7"): ["taxi-ep/blue (100%)"],
+        ("shared", "taxi", "5"): ["prod-ws:taxi-ep/blue (100%)"],
+    }
+
+
+def test_scan_deployments_without_a_workspace_client():
+    assert cleanup_models._scan_deployments(None, {}) == ({}, [])
+
+
+def test_parse_workspaces():
+    assert cleanup_models.parse_workspaces("sub/rg/prod-ws, sub2/rg2/test-ws") == [
+        ("sub", "rg", "prod-ws"),
+        ("sub2", "rg2", "test-ws"),
+    ]
+    with pytest.raises(ValueError, match="must look like"):
+        cleanup_models.parse_workspaces("prod-ws")
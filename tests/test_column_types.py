@@ -0,0 +1,22 @@
+import pandas as pd
+
+from common import column_types
+
+
+def test_to_category_stores_integer_codes_as_strings():
+    vendor = pd.Series([1.0, 2.0, None])
+
+    typed = column_types.to_category(vendor)
+
+    assert isinstance(typed.dtype, pd.CategoricalDtype)
+    assert list(typed.cat.categories) == ["1", "2"]
+    assert typed.isna().tolist() == [False, False, True]
+
+
+def test_parse_timestamps_uses_raw_format_and_falls_back():
+    raw = column_types.parse_timestamps(pd.Series(["1/3/2016 21:02", "12/31/2016 00:15"]))
+    iso = column_types.parse_timestamps(pd.Series(["2016-01-03 21:02:05"]))
+
+    assert raw.dt.hour.tolist() == [21, 0]
+    assert iso.dt.second.tolist() == [5]
+    assert column_types.parse_timestamps(raw) is raw
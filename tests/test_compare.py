@@ -0,0 +1,113 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import mlflow
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, f1_score
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.compare import compare
+
+
+class _ThresholdModel(mlflow.pyfunc.PythonModel):
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def predict(self, context, model_input, params=None):
+        return np.where(model_input["distance"].to_numpy() > self.threshold, "B", "A")
+
+
+def _features(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({column: np.arange(rows, dtype="float64") for column in compare.feature_columns})
+
+
+def test_evaluate_models_scores_every_model_in_one_pass(tmp_path):
+    features = _features(10)
+    actual = pd.Series(np.where(features["distance"] > 4, "B", "A"))
+    model_uris = {}
+    for label, threshold in ((compare.CANDIDATE, 4), (compare.BASELINE, 6), ("baseline_v1", 8)):
+        model_uris[label] = str(tmp_path / label)
+        mlflow.pyfunc.save_model(model_uris[label], python_model=_ThresholdModel(threshold), pip_requirements=["mlflow"])
+
+    predictions, metrics = compare.evaluate_models(model_uris, features, actual)
+
+    assert metrics == {compare.CANDIDATE: 1.0, compare.BASELINE: 0.8, "baseline_v1": 0.6}
+    output = compare.build_output(features, actual, predictions)
+    assert list(output.columns[-4:]) == [
+        "actual_cost",
+        "predicted_cost",
+        "baseline_predicted_cost",
+        "baseline_v1_predicted_cost",
+    ]
+    assert output["baseline_predicted_cost"].tolist() == list("AAAAAAABBB")
+
+
+def test_evaluate_models_skips_baselines_that_fail_to_load(tmp_path):
+    features = _features(10)
+    actual = pd.Series(np.where(features["distance"] > 4, "B", "A"))
+    model_uris = {compare.CANDIDATE: str(tmp_path / "candidate"), compare.BASELINE: str(tmp_path / "deleted")}
+    mlflow.pyfunc.save_model(model_uris[compare.CANDIDATE], python_model=_ThresholdModel(4), pip_requirements=["mlflow"])
+
+    predictions, metrics = compare.evaluate_models(model_uris, features, actual)
+
+    assert metrics == {compare.CANDIDATE: 1.0}
+    assert list(predictions) == [compare.CANDIDATE]
+
+    model_uris[compare.CANDIDATE] = str(tmp_path / "missing-candidate")
+    with pytest.raises(Exception):
+        compare.evaluate_models(model_uris, features, actual)
+
+
+def test_baseline_model_uris_picks_highest_versions_first(tmp_path):
+    downloads = []
+    models = SimpleNamespace(
+        list=lambda name: [SimpleNamespace(version=version) for version in ("9", "10", "2")],
+        download=lambda name, version, download_path: downloads.append(version),
+    )
+
+    model_uris = compare.baseline_model_uris(SimpleNamespace(models=models), "taxi-model", 2, str(tmp_path))
+
+    assert list(model_uris) == [compare.BASELINE, "baseline_v9"]
+    assert downloads == ["10", "9"]
+
+
+def _labels(rng, actual, hit_rate):
+    return np.where(rng.random(actual.size) < hit_rate, actual, rng.choice(list("ABCDEFGHIJ"), size=actual.size))
+
+
+def test_paired_bootstrap_point_estimates_match_sklearn():
+    rng = np.random.default_rng(0)
+    actual = rng.choice(list("ABCDEFGHIJ"), size=3000)
+    candidate, baseline = _labels(rng, actual, 0.6), _labels(rng, actual, 0.5)
+
+    intervals = compare.paired_bootstrap(actual, candidate, baseline, resamples=500, seed=1)
+
+    accuracy = intervals["accuracy"]
+    assert np.isclose(accuracy["difference"], accuracy_score(actual, candidate) - accuracy_score(actual, baseline))
+    assert np.isclose(
+        intervals["macro_f1"]["difference"],
+        f1_score(actual, candidate, average="macro") - f1_score(actual, baseline, average="macro"),
+    )
+    assert 0 < accuracy["lower"] < accuracy["difference"] < accuracy["upper"]
+    assert intervals == compare.paired_bootstrap(actual, candidate, baseline, resamples=500, seed=1)
+
+
+def test_compare_bootstrap_fails_only_when_candidate_is_significantly_worse():
+    rng = np.random.default_rng(0)
+    actual = rng.choice(list("ABCDEFGHIJ"), size=200)
+    noisy = _labels(rng, actual, 0.6)
+    # A handful of flipped rows is noise on 200 rows and must not fail the gate.
+    slightly_worse = noisy.copy()
+    slightly_worse[:3] = np.where(slightly_worse[:3] == "A", "B", "A")
+
+    assert compare.compare_bootstrap(
+        compare.paired_bootstrap(actual, slightly_worse, noisy)["accuracy"], "accuracy", 0.95
+    )
+    with pytest.raises(Exception, match="significantly below"):
+        compare.compare_bootstrap(
+            compare.paired_bootstrap(actual, _labels(rng, actual, 0.2), noisy)["accuracy"], "accuracy", 0.95
+        )
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from common import data_files
+
+
+def _write_shards(folder):
+    frame = pd.DataFrame({"cost": list("ABCDE"), "distance": [1.0, 2.0, 3.0, 4.0, 5.0]})
+    frame.iloc[:3].to_csv(folder / "part-0.csv", index=False)
+    frame.iloc[3:].to_parquet(folder / "part-1.parquet", index=False)
+    (folder / "MLTable").write_text("paths: []", encoding="utf-8")
+    return frame
+
+
+def test_iter_data_chunks_reads_csv_and_parquet_in_name_order(tmp_path):
+    frame = _write_shards(tmp_path)
+
+    chunks = list(data_files.iter_data_chunks(tmp_path, chunk_rows=2, columns=["cost"]))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1, 2]
+    assert all(list(chunk.columns) == ["cost"] for chunk in chunks)
+    assert pd.concat(chunks)["cost"].tolist() == frame["cost"].tolist()
+
+
+def test_read_data_folder_concatenates_every_file(tmp_path):
+    frame = _write_shards(tmp_path)
+    empty = tmp_path / "empty"
+    empty.mkdir()
+
+    combined = data_files.read_data_folder(tmp_path)
+
+    assert [path.name for path in data_files.list_data_files(tmp_path)] == ["part-0.csv", "part-1.parquet"]
+    pd.testing.assert_frame_equal(combined, frame)
+    with pytest.raises(FileNotFoundError):
+        data_files.read_data_folder(empty)
+
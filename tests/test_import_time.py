@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tests import import_time_benchmark
+
+
+@pytest.mark.parametrize("script", import_time_benchmark.STEP_SCRIPTS)
+def test_step_script_help_skips_heavy_imports(script):
+    result = import_time_benchmark.measure(script)
+
+    assert result["returncode"] == 0
+    assert import_time_benchmark.heavy_imports(result["modules"]) == []
+
+
+def test_parse_importtime_reads_depth_and_cumulative_time():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _json",
+            "import time:       300 |        420 | json",
+        ]
+    )
+
+    assert import_time_benchmark.parse_importtime(stderr) == [("_json", 1, 120), ("json", 0, 420)]
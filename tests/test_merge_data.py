@@ -0,0 +1,103 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.merge_data import merge_data
+
+
+def _write_sources(tmp_path: Path):
+    green = pd.DataFrame(
+        {
+            "vendorID": [2, 2, 1],
+            "lpepPickupDatetime": ["1/3/2016 21:02", "1/19/2016 21:49", "1/5/2016 08:10"],
+            "lpepDropoffDatetime": ["1/3/2016 21:05", "1/19/2016 21:54", "1/5/2016 08:31"],
+            "passengerCount": [1, 1, 2],
+            "tripDistance": [0.83, 1.27, 4.1],
+            "pickupLongitude": [-73.98, -73.94, -73.95],
+            "pickupLatitude": [40.69, 40.80, 40.71],
+            "dropoffLongitude": [-73.97, -73.95, -73.99],
+            "dropoffLatitude": [40.69, 40.81, 40.75],
+            "storeAndFwdFlag": ["N", "N", "Y"],
+            "fareAmount": [4.5, 6.0, 15.5],
+            "tipAmount": [0, 1, 2],
+        }
+    )
+    yellow = pd.DataFrame(
+        {
+            "vendorID": [2, 1],
+            "tpepPickupDateTime": ["1/6/2016 12:09", "1/3/2016 17:57"],
+            "tpepDropoffDateTime": ["1/6/2016 12:22", "1/3/2016 18:08"],
+            "passengerCount": [1, 3],
+            "tripDistance": [2.09, 1.5],
+            "startLon": [-73.98, -73.96],
+            "startLat": [40.74, 40.76],
+            "endLon": [-74.00, -73.98],
+            "endLat": [40.73, 40.75],
+            "storeAndFwdFlag": ["N", "N"],
+            "fareAmount": [10.5, 8.5],
+            "totalAmount": [13.56, 10.3],
+        }
+    )
+    green_path = tmp_path / "green.csv"
+    yellow_path = tmp_path / "yellow.csv"
+    green.to_csv(green_path, index=False)
+    yellow.to_csv(yellow_path, index=False)
+    return str(green_path), str(yellow_path)
+
+
+def test_streaming_merge_matches_in_memory_merge(tmp_path):
+    green_path, yellow_path = _write_sources(tmp_path)
+    output_file = tmp_path / "merged.csv"
+
+    rows_written = merge_data.merge_streaming(green_path, yellow_path, output_file, chunk_rows=2)
+
+    expected = merge_data.merge_in_memory(green_path, yellow_path)
+    streamed = pd.read_csv(output_file)
+    assert rows_written == 5
+    assert list(streamed.columns) == merge_data.columns_taxi_data_combined
+    pd.testing.assert_frame_equal(streamed, pd.read_csv(io.StringIO(expected.to_csv(index=False))))
+
+
+def test_streaming_merge_skips_blank_rows(tmp_path):
+    green_path, yellow_path = _write_sources(tmp_path)
+    with open(green_path, "a", encoding="utf-8") as handle:
+        handle.write("," * 11 + "\n")
+
+    rows_written = merge_data.merge_streaming(green_path, yellow_path, tmp_path / "merged.csv", chunk_rows=1)
+
+    assert rows_written == 5
+
+
+def test_streaming_parquet_merge_applies_typed_schema(tmp_path):
+    green_path, yellow_path = _write_sources(tmp_path)
+    output_file = merge_data.merged_output_file(str(tmp_path), "parquet")
+
+    merge_data.merge_streaming(green_path, yellow_path, output_file, chunk_rows=2, output_format="parquet")
+
+    merged = pd.read_parquet(output_file)
+    assert output_file.name == "merged_taxi_data.parquet"
+    assert len(merged) == 5
+    assert merged["pickup_latitude"].dtype == "float32"
+    assert str(merged["vendor"].dtype) == "Int8"
+    assert merged["vendor"].tolist() == [2, 1, 2, 2, 1]
+    assert str(merged["store_forward"].dtype) == "category"
+    assert str(merged["pickup_datetime"].dtype) == "datetime64[ns]"
+
+
+def test_csv_and_parquet_outputs_read_back_with_the_same_values(tmp_path):
+    green_path, yellow_path = _write_sources(tmp_path)
+    csv_file = merge_data.merged_output_file(str(tmp_path), "csv")
+    parquet_file = merge_data.merged_output_file(str(tmp_path), "parquet")
+
+    merge_data.merge_streaming(green_path, yellow_path, csv_file, chunk_rows=2)
+    merge_data.merge_streaming(green_path, yellow_path, parquet_file, chunk_rows=2, output_format="parquet")
+
+    from_csv = pd.read_csv(csv_file)
+    from_parquet = pd.read_parquet(parquet_file)
+    for column in ("vendor", "passengers", "store_forward"):
+        assert from_parquet[column].astype(object).tolist() == from_csv[column].astype(object).tolist()
+        assert pd.api.types.is_numeric_dtype(from_parquet[column]) == pd.api.types.is_numeric_dtype(from_csv[column])
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from common import ml_clients
+from src.traffic import select_slot
+
+
+class _CountingCredential:
+    def __init__(self, lifetime):
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(token=f"token-{self.calls}", expires_on=ml_clients.time.time() + self.lifetime)
+
+
+@pytest.fixture(autouse=True)
+def _reset_clients():
+    ml_clients.reset()
+    yield
+    ml_clients.reset()
+
+
+def test_caching_credential_reuses_tokens_until_refresh_margin():
+    long_lived = _CountingCredential(lifetime=3600)
+    credential = ml_clients.CachingCredential(long_lived)
+
+    first = credential.get_token(ml_clients.ARM_SCOPE)
+    assert credential.get_token(ml_clients.ARM_SCOPE) is first
+    credential.get_token("https://storage.azure.com/.default")
+    credential.get_token(ml_clients.ARM_SCOPE, claims="challenge")
+    assert long_lived.calls == 3
+
+    short_lived = _CountingCredential(lifetime=60)
+    credential = ml_clients.CachingCredential(short_lived)
+    credential.get_token(ml_clients.ARM_SCOPE)
+    credential.get_token(ml_clients.ARM_SCOPE)
+    assert short_lived.calls == 2
+
+
+def test_injected_workspace_client_is_used_by_step_scripts(tmp_path, monkeypatch):
+    endpoints = SimpleNamespace(get=lambda name: SimpleNamespace(traffic={"blue": 100}))
+    ml_clients.set_workspace_client(SimpleNamespace(online_endpoints=endpoints))
+    output_slot = tmp_path / "slot.txt"
+    monkeypatch.setattr(
+        sys, "argv", ["select_slot.py", "--endpoint_name", "taxi-endpoint", "--output_slot", str(output_slot)]
+    )
+
+    select_slot.main()
+
+    assert output_slot.read_text(encoding="utf-8") == "green"
+    assert ml_clients.get_workspace_client() is ml_clients.get_workspace_client()
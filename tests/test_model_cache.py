@@ -0,0 +1,152 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.common import model_cache
+
+
+class _FakeModelOperations:
+    """Local stand-in for ``MLClient.models`` that writes a tiny model on download."""
+
+    def __init__(self):
+        self.downloads = []
+
+    def download(self, name, version, download_path):
+        self.downloads.append((name, version))
+        model_dir = Path(download_path) / name / "mlflow-model"
+        model_dir.mkdir(parents=True)
+        (model_dir / "MLmodel").write_text(f"version: {version}\n", encoding="utf-8")
+
+
+def _client(workspace_name="ws"):
+    return SimpleNamespace(
+        subscription_id="sub",
+        resource_group_name="rg",
+        workspace_name=workspace_name,
+        models=_FakeModelOperations(),
+    )
+
+
+def test_fetch_downloads_once_per_model_version(tmp_path):
+    cache = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    client = _client()
+
+    first = cache.fetch(client, "taxi-model", "3")
+    second = cache.fetch(client, "taxi-model", "3")
+    cache.fetch(client, "taxi-model", "4")
+    cache.fetch(_client("other-ws"), "taxi-model", "3")
+
+    assert first == second
+    assert (first / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 3\n"
+    assert client.models.downloads == [("taxi-model", "3"), ("taxi-model", "4")]
+
+
+def test_fetch_downloads_again_when_cached_files_are_modified(tmp_path):
+    cache = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    client = _client()
+    model_dir = cache.fetch(client, "taxi-model", "3")
+
+    (model_dir / "taxi-model" / "mlflow-model" / "MLmodel").write_text("tampered", encoding="utf-8")
+    restored = cache.fetch(client, "taxi-model", "3")
+
+    assert (restored / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 3\n"
+    assert len(client.models.downloads) == 2
+
+
+def test_fetch_never_evicts_the_returned_or_earlier_fetched_models(tmp_path):
+    # Every model is larger than the bound, so an eviction after the download would remove it.
+    cache = model_cache.ModelCache(tmp_path / "cache", max_bytes=1)
+    client = _client()
+
+    first = cache.fetch(client, "taxi-model", "3")
+    second = cache.fetch(client, "taxi-model", "4")
+
+    assert (first / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 3\n"
+    assert (second / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 4\n"
+
+
+def test_fetch_evicts_released_entries_before_downloading(tmp_path):
+    cache = model_cache.ModelCache(tmp_path / "cache", max_bytes=1)
+    client = _client()
+    first = cache.fetch(client, "taxi-model", "3")
+    cache.release()
+
+    evicted_before_download = []
+    download = client.models.download
+
+    def record_then_download(name, version, download_path):
+        evicted_before_download.append(first.exists())
+        download(name, version, download_path)
+
+    client.models.download = record_then_download
+    cache.fetch(client, "taxi-model", "4")
+
+    assert evicted_before_download == [False]
+
+
+def test_evict_skips_entries_leased_by_another_job(tmp_path):
+    other_job = model_cache.ModelCache(tmp_path / "cache", max_bytes=1)
+    leased = other_job.fetch(_client(), "taxi-model", "3")
+
+    model_cache.ModelCache(tmp_path / "cache", max_bytes=1).fetch(_client(), "taxi-model", "4")
+    assert leased.exists()
+
+    other_job.release()
+    expired = model_cache.ModelCache(tmp_path / "cache", max_bytes=1)
+    expired.evict()
+    assert not leased.exists()
+
+
+def test_stale_leases_do_not_block_eviction(tmp_path):
+    crashed_job = model_cache.ModelCache(tmp_path / "cache", max_bytes=1)
+    leased = crashed_job.fetch(_client(), "taxi-model", "3")
+
+    model_cache.ModelCache(tmp_path / "cache", max_bytes=1, lease_seconds=0).evict()
+
+    assert not leased.exists()
+
+
+def test_concurrent_hits_never_replace_an_entry_another_job_is_reading(tmp_path):
+    first_job = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    first_client = _client()
+    model_dir = first_job.fetch(first_client, "taxi-model", "3")
+    second_job = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    second_client = _client()
+    unreadable = []
+
+    def fetch_repeatedly():
+        for _ in range(200):
+            second_job.fetch(second_client, "taxi-model", "3")
+
+    def read_repeatedly():
+        for _ in range(200):
+            if not first_job._verified(model_dir.parent):
+                unreadable.append(model_dir)
+
+    threads = [threading.Thread(target=fetch_repeatedly), threading.Thread(target=read_repeatedly)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert unreadable == []
+    assert first_client.models.downloads == [("taxi-model", "3")] and second_client.models.downloads == []
+    assert (model_dir / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 3\n"
+
+
+def test_unverified_entry_leased_by_another_job_is_left_alone(tmp_path):
+    other_job = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    leased = other_job.fetch(_client(), "taxi-model", "3")
+    (leased / "taxi-model" / "mlflow-model" / "MLmodel").write_text("being rewritten", encoding="utf-8")
+
+    cache = model_cache.ModelCache(tmp_path / "cache", max_bytes=1 << 20)
+    private = cache.fetch(_client(), "taxi-model", "3")
+
+    assert private != leased and private.parent.name.startswith(".private-")
+    assert (private / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "version: 3\n"
+    assert (leased / "taxi-model" / "mlflow-model" / "MLmodel").read_text(encoding="utf-8") == "being rewritten"
+    cache.release()
+    assert not private.parent.exists() and leased.exists()
@@ -0,0 +1,258 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+class SumModel:
+    def predict(self, data):
+        return data.sum(axis=1, dtype=np.float64)
+
+
+class RecordingCollector:
+    def __init__(self, release=None):
+        self.frames = []
+        self.release = release
+
+    def collect(self, frame, context=None):
+        if self.release is not None:
+            self.release.wait(5)
+        self.frames.append((frame, context))
+        return "context"
+
+
+@pytest.fixture
+def score(load_scoring_script):
+    module = load_scoring_script("score.py")
+    module.model = SumModel()
+    module.inputs_collector = RecordingCollector()
+    module.outputs_collector = RecordingCollector()
+    module.collection = module.BackgroundCollector(module.inputs_collector, module.outputs_collector)
+    module.batcher = None
+    module.cache = None
+    yield module
+    if module.batcher is not None:
+        module.batcher.close(5)
+    if module.collection is not None:
+        module.collection.close(5)
+
+
+def test_run_scores_sample_request_and_collects_frames(score):
+    raw_data = (Path(score.__file__).parents[1] / "sample-request.json").read_text()
+
+    assert score.run(raw_data) == [55.0, 55.0, 55.0, 55.0]
+    assert score.collection.flush(5)
+
+    input_frame, _ = score.inputs_collector.frames[0]
+    output_frame, context = score.outputs_collector.frames[0]
+    assert input_frame.shape == (4, score.FEATURE_COUNT) and list(input_frame.columns) == list(range(10))
+    assert output_frame["prediction"].tolist() == [55.0] * 4
+    assert context == "context"
+
+
+def test_parse_request_fills_float32_array(score):
+    data_array = score.parse_request(json.dumps({"data": [[1.5] * 10, list(range(10))]}))
+
+    assert data_array.dtype == np.float32 and data_array.shape == (2, 10)
+    assert data_array[1].tolist() == list(range(10))
+    assert np.shares_memory(score.input_frame(data_array).to_numpy(), data_array)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        '{"rows": []}',
+        '{"data": []}',
+        '{"data": [[1, 2, 3]]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,"x"]]}',
+        "not json",
+        '{"data": [[1,2,3,4,5,6,7,8,9,null]]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,true]]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,"1"]]}',
+        '{"data": [5]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,[10]]]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,1e300]]}',
+        '{"data": [[1,2,3,4,5,6,7,8,9,NaN]]}',
+    ],
+)
+def test_parse_request_rejects_payloads_outside_schema(score, body):
+    with pytest.raises(ValueError):
+        score.parse_request(body)
+
+
+def test_run_skips_collection_without_collectors(score):
+    score.collection.close(5)
+    score.collection = None
+
+    assert score.run('{"data": [[1,1,1,1,1,1,1,1,1,1]]}') == [10.0]
+
+
+def test_slow_collector_does_not_delay_scoring(score):
+    release = threading.Event()
+    score.collection.close(5)
+    score.collection = score.BackgroundCollector(RecordingCollector(release), RecordingCollector())
+
+    started = time.perf_counter()
+    for _ in range(20):
+        score.run('{"data": [[1,1,1,1,1,1,1,1,1,1]]}')
+    elapsed = time.perf_counter() - started
+    release.set()
+
+    assert elapsed < 1.0
+    assert score.collection.flush(5)
+    assert score.collection.stats()["collected"] == 20
+
+
+def test_full_queue_drops_oldest_requests(score):
+    release = threading.Event()
+    inputs = RecordingCollector(release)
+    collection = score.BackgroundCollector(inputs, RecordingCollector(), max_queued=3)
+    rows = [np.full((1, 10), index, dtype=np.float32) for index in range(6)]
+
+    collection.submit(rows[0], np.zeros(1))
+    # Wait until the worker holds the first request, so the next ones pile up in the queue.
+    while collection.stats()["pending"]:
+        time.sleep(0.001)
+    for row in rows[1:]:
+        collection.submit(row, np.zeros(1))
+    stats = collection.stats()
+    release.set()
+    collection.close(5)
+
+    assert stats["queued"] == 6 and stats["dropped"] == 2 and stats["pending"] == 3
+    assert [frame.iloc[0, 0] for frame, _ in inputs.frames] == [0, 3, 4, 5]
+
+
+def test_sampling_rate_limits_collected_requests(score):
+    collection = score.BackgroundCollector(RecordingCollector(), RecordingCollector(), sampling_rate=0.25)
+    score.random.seed(7)
+
+    submitted = sum(collection.submit(np.ones((1, 10), dtype=np.float32), np.ones(1)) for _ in range(2000))
+    collection.close(5)
+
+    stats = collection.stats()
+    assert 400 < submitted < 600
+    assert stats["sampled_out"] == 2000 - submitted and stats["collected"] == submitted
+
+
+class CountingModel:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def predict(self, data):
+        self.calls.append(len(data))
+        time.sleep(self.delay)
+        if (data == 666).any():
+            raise ValueError("unscorable row")
+        return data[:, 0].astype(np.float64)
+
+
+def test_batcher_coalesces_concurrent_requests_and_scatters_results(score):
+    model = CountingModel(delay=0.005)
+    score.model = model
+    score.batcher = score.MicroBatcher(model.predict, max_batch_rows=64, max_wait_ms=5)
+    bodies = [json.dumps({"data": [[index] * 10, [index + 0.5] * 10]}) for index in range(40)]
+    results = {}
+
+    def call(index):
+        results[index] = score.run(bodies[index])
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {index: [index, index + 0.5] for index in range(40)}
+    assert len(model.calls) < 40 and max(model.calls) <= 64
+    assert score.batcher.stats() == {"requests": 40, "batches": len(model.calls), "rows": 80}
+
+
+def test_batcher_isolates_failing_request(score):
+    model = CountingModel(delay=0.005)
+    batcher = score.MicroBatcher(model.predict, max_wait_ms=20)
+    outcomes = {}
+
+    def call(value):
+        try:
+            outcomes[value] = batcher.predict(np.full((1, 10), value, dtype=np.float32)).tolist()
+        except ValueError as exc:
+            outcomes[value] = str(exc)
+
+    threads = [threading.Thread(target=call, args=(value,)) for value in (1, 666, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    batcher.close(5)
+
+    assert outcomes == {1: [1.0], 666: "unscorable row", 3: [3.0]}
+
+
+def test_load_test_reports_both_modes():
+    from tests import online_scoring_load_test
+
+    report = online_scoring_load_test.run_load_test(requests=200, concurrency=8, rows=10, max_batch_rows=256, max_wait_ms=0)
+
+    assert set(report) == {"per_request", "batched", "speedup"}
+    assert report["batched"]["requests_per_second"] > 0 and report["batched"]["mean_batch_requests"] >= 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_sends_only_missing_rows_to_model(score):
+    model = CountingModel()
+    score.model = model
+    score.cache = score.PredictionCache(100)
+
+    assert score.run(json.dumps({"data": [[1] * 10, [2] * 10]})) == [1.0, 2.0]
+    assert score.run(json.dumps({"data": [[2] * 10, [3] * 10, [-0.0] + [1] * 9]})) == [2.0, 3.0, 0.0]
+    assert score.run(json.dumps({"data": [[0.0] + [1] * 9, [1] * 10]})) == [0.0, 1.0]
+
+    # The third request is fully cached: -0.0 and 0.0 share an entry.
+    assert model.calls == [2, 2]
+    assert score.cache.counters["hits"] == 3 and score.cache.counters["misses"] == 4
+
+
+def test_cache_expires_and_evicts_entries(score):
+    clock = FakeClock()
+    cache = score.PredictionCache(2, ttl_seconds=10, clock=clock)
+    keys = cache.keys(np.arange(30, dtype=np.float32).reshape(3, 10))
+
+    cache.put_many(keys[:2], [0.0, 1.0])
+    assert cache.get_many(keys[:1]) == [0.0]
+    cache.put_many(keys[2:], [2.0])
+    # The least recently used entry (keys[1]) made room for keys[2].
+    assert cache.get_many(keys) == [0.0, None, 2.0]
+
+    clock.now = 11
+    assert cache.get_many(keys) == [None, None, None]
+    assert cache.counters["expired"] == 2 and cache.counters["evicted"] == 1
+
+
+def test_cache_logs_hit_rate_at_interval(score, caplog):
+    clock = FakeClock()
+    cache = score.PredictionCache(10, log_interval_seconds=30, clock=clock)
+    keys = cache.keys(np.ones((1, 10), dtype=np.float32))
+    cache.put_many(keys, [1.0])
+
+    with caplog.at_level("INFO"):
+        cache.get_many(keys)
+        clock.now = 31
+        cache.get_many(keys + cache.keys(np.zeros((1, 10), dtype=np.float32)))
+
+    messages = [record.getMessage() for record in caplog.records if "Prediction cache" in record.getMessage()]
+    assert messages == ["Prediction cache: 2 hits, 1 misses (66.7% hit rate), 1 entries, 0 expired, 0 evicted"]
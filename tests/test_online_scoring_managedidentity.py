@@ -0,0 +1,179 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+MANAGED_IDENTITY_SCRIPT = "score_managedidentity.py"
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves /msi/token like the endpoint's MSI_ENDPOINT and /container/blob.txt like blob storage."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        state["connections"].add(self.client_address)
+        url = urlparse(self.path)
+        if url.path == "/msi/token":
+            state["token_requests"].append(parse_qs(url.query))
+            if self.headers.get("secret") != "msi-secret":
+                return self._send(401)
+            token = f"token-{len(state['token_requests'])}"
+            payload = {"access_token": token, "expires_on": str(int(state["clock"]() + 3600))}
+            return self._send(200, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+        if url.path == "/container/blob.txt":
+            state["blob_requests"].append(self.headers.get("Authorization"))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                return self._send(304)
+            return self._send(200, state["contents"].encode(), {"ETag": state["etag"]})
+        self._send(404)
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.state = {
+        "token_requests": [],
+        "blob_requests": [],
+        "connections": set(),
+        "etag": '"v1"',
+        "contents": "hello",
+        "clock": time.time,
+    }
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def score(stand_in, monkeypatch, load_scoring_script):
+    base = f"http://127.0.0.1:{stand_in.server_address[1]}"
+    monkeypatch.setenv("MSI_ENDPOINT", f"{base}/msi/token")
+    monkeypatch.setenv("MSI_SECRET", "msi-secret")
+    monkeypatch.setenv("STORAGE_ACCOUNT_URL", base)
+    monkeypatch.setenv("STORAGE_CONTAINER_NAME", "container")
+    monkeypatch.setenv("FILE_NAME", "blob.txt")
+    monkeypatch.delenv("UAI_CLIENT_ID", raising=False)
+    monkeypatch.delenv("BLOB_CACHE_REVALIDATE_SECONDS", raising=False)
+
+    module = load_scoring_script(MANAGED_IDENTITY_SCRIPT, "online_score_managedidentity")
+    yield module
+    module.session.close()
+
+
+def test_token_is_reused_until_refresh_margin(score, stand_in):
+    clock = stand_in.state["clock"] = FakeClock()
+    score.token_provider = score.MsiTokenProvider(
+        score.os.environ["MSI_ENDPOINT"], "msi-secret", client_id="uai-client", clock=clock
+    )
+
+    assert [score.get_token_rest() for _ in range(5)] == ["token-1"] * 5
+    clock.now += 3600 - score.TOKEN_REFRESH_MARGIN_SECONDS - 1
+    assert score.get_token_rest() == "token-1"
+    clock.now += 1
+    assert score.get_token_rest() == "token-2"
+
+    requests = stand_in.state["token_requests"]
+    assert len(requests) == 2
+    assert requests[0] == {"resource": [score.STORAGE_RESOURCE], "clientid": ["uai-client"]}
+    # Both token requests went over the same pooled connection.
+    assert len(stand_in.state["connections"]) == 1
+
+
+def test_rest_blob_contents_are_cached_and_revalidated_with_etag(score, stand_in, monkeypatch):
+    monkeypatch.setenv("BLOB_CACHE_REVALIDATE_SECONDS", "60")
+    assert score.access_blob_storage_rest() == "hello"
+    score.rest_blob.clock = clock = FakeClock(score.rest_blob._checked_at)
+
+    assert score.access_blob_storage_rest() == "hello"
+    assert len(stand_in.state["blob_requests"]) == 1
+
+    clock.now += 60
+    assert score.access_blob_storage_rest() == "hello"
+    stand_in.state.update(etag='"v2"', contents="updated")
+    assert score.access_blob_storage_rest() == "hello"
+    clock.now += 60
+    assert score.access_blob_storage_rest() == "updated"
+
+    assert score.rest_blob.counters == {"downloads": 2, "not_modified": 1, "hits": 2}
+    assert stand_in.state["blob_requests"] == ["Bearer token-1"] * 3
+    assert len(stand_in.state["token_requests"]) == 1
+
+
+def test_rest_blob_contents_are_never_revalidated_by_default(score, stand_in):
+    for _ in range(3):
+        assert score.access_blob_storage_rest() == "hello"
+
+    assert len(stand_in.state["blob_requests"]) == 1
+
+
+def test_token_expiry_formats(load_scoring_script):
+    module = load_scoring_script(MANAGED_IDENTITY_SCRIPT, "online_score_managedidentity")
+
+    assert module._token_expiry({"expires_on": "1700000000"}, 0) == 1700000000
+    assert module._token_expiry({"expires_on": "11/14/2023 22:13:20 +00:00"}, 0) == 1700000000
+    assert module._token_expiry({"expires_in": "3599"}, 100) == 3699
+
+
+class FakeBlobClient:
+    def __init__(self, score):
+        self.score = score
+        self.etag = '"v1"'
+        self.calls = []
+
+    def download_blob(self, etag=None, match_condition=None):
+        self.calls.append((etag, match_condition))
+        if match_condition == self.score.MatchConditions.IfModified and etag == self.etag:
+            raise self.score.ResourceNotModifiedError("not modified")
+        return SimpleNamespace(content_as_text=lambda: f"contents {self.etag}", properties=SimpleNamespace(etag=self.etag))
+
+
+def test_sdk_path_reuses_one_blob_client(score, monkeypatch):
+    built = []
+    monkeypatch.setattr(score, "build_blob_client", lambda: built.append(FakeBlobClient(score)) or built[-1])
+    monkeypatch.setenv("BLOB_CACHE_REVALIDATE_SECONDS", "0")
+
+    assert score.access_blob_storage_sdk() == 'contents "v1"'
+    assert score.access_blob_storage_sdk() == 'contents "v1"'
+    built[0].etag = '"v2"'
+    assert score.access_blob_storage_sdk() == 'contents "v2"'
+
+    assert len(built) == 1
+    assert built[0].calls == [
+        (None, None),
+        ('"v1"', score.MatchConditions.IfModified),
+        ('"v1"', score.MatchConditions.IfModified),
+    ]
+    assert score.sdk_blob.counters == {"downloads": 2, "not_modified": 1, "hits": 0}
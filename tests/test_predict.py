@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+import mlflow
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.predict import predict
+
+
+class _FareModel(mlflow.pyfunc.PythonModel):
+    def predict(self, context, model_input, params=None):
+        return model_input["distance"].to_numpy() * 2.5 + 3.0
+
+
+def _test_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({column: rng.integers(0, 10, size=rows).astype("float64") for column in predict.feature_columns})
+    frame["cost"] = frame["distance"] * 2.5 + 3.0 + rng.normal(size=rows)
+    return frame
+
+
+def test_predict_in_batches_matches_single_pass(tmp_path):
+    frame = _test_frame(250)
+    model_path = str(tmp_path / "model")
+    mlflow.pyfunc.save_model(model_path, python_model=_FareModel(), pip_requirements=["mlflow"])
+    test_data = tmp_path / "test"
+    test_data.mkdir()
+    frame.iloc[:100].to_csv(test_data / "test_data.csv", index=False)
+    frame.iloc[100:].to_parquet(test_data / "test_data.parquet", index=False)
+    predictions = tmp_path / "predictions"
+    predictions.mkdir()
+
+    rows_scored, _ = predict.predict_in_batches(model_path, str(test_data), str(predictions), batch_rows=40, workers=2)
+
+    shards = sorted(predictions.glob("predictions-*.csv"))
+    assert rows_scored == 250
+    assert len(shards) == 7
+    produced = pd.concat([pd.read_csv(shard) for shard in shards], ignore_index=True)
+    expected = predict.predict_batch(mlflow.pyfunc.load_model(model_path), frame)
+    assert list(produced.columns) == list(expected.columns)
+    np.testing.assert_allclose(produced["predicted_cost"], expected["predicted_cost"])
+    np.testing.assert_allclose(produced["actual_cost"], frame["cost"])
@@ -0,0 +1,108 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from common import ml_clients
+from src.register import register
+
+
+class FakeModels:
+    def __init__(self, barrier=None, latest=None, fail=None):
+        self.barrier = barrier
+        self.latest = latest
+        self.fail = fail
+        self.created = []
+        self.lookups = 0
+
+    def get(self, name, label=None):
+        self.lookups += 1
+        if self.fail:
+            raise self.fail
+        if self.latest is None:
+            raise ResourceNotFoundError("model not found")
+        return self.latest
+
+    def create_or_update(self, model):
+        if self.barrier is not None:
+            # Only passes when the other target registers at the same time.
+            self.barrier.wait()
+        self.created.append(model)
+        self.latest = SimpleNamespace(version=str(len(self.created)), tags=model.tags)
+        return self.latest
+
+
+@pytest.fixture(autouse=True)
+def _reset_clients():
+    ml_clients.reset()
+    yield
+    ml_clients.reset()
+
+
+@pytest.fixture
+def mlflow_model(tmp_path):
+    model_dir = tmp_path / "outputs" / "mlflow-model"
+    model_dir.mkdir(parents=True)
+    (model_dir / "MLmodel").write_text("flavors: {}\n")
+    (model_dir / "model.pkl").write_bytes(b"weights")
+    return str(model_dir)
+
+
+def test_registers_workspace_and_registry_concurrently(mlflow_model, tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+    workspace = SimpleNamespace(models=FakeModels(barrier))
+    registry = SimpleNamespace(models=FakeModels(barrier))
+    ml_clients.set_registry_client("shared", registry)
+
+    workspace_model, registry_model, timings, digest = register.register_everywhere(workspace, "shared", mlflow_model, "taxi")
+
+    assert workspace_model.version == registry_model.version == "1"
+    assert workspace.models.created[0].tags == {register.DIGEST_TAG: digest}
+    assert registry.models.lookups == 1
+    assert set(timings) == {"workspace", "registry"} and not timings["registry"]["reused"]
+
+    metadata = register.write_metadata(tmp_path, "taxi", workspace_model, registry_model, timings, digest)
+    assert json.loads((tmp_path / "model_versions.json").read_text()) == metadata
+    assert metadata["registry_version"] == "1" and metadata["timings"]["workspace"]["seconds"] >= 0
+
+
+def test_identical_artifacts_reuse_latest_version(mlflow_model):
+    digest = register.model_digest(mlflow_model)
+    workspace = SimpleNamespace(models=FakeModels(latest=SimpleNamespace(version="7", tags={register.DIGEST_TAG: digest})))
+
+    workspace_model, registry_model, timings, _ = register.register_everywhere(workspace, None, mlflow_model, "taxi")
+
+    assert workspace_model.version == "7" and registry_model is None
+    assert workspace.models.created == []
+    assert timings == {"workspace": {"seconds": timings["workspace"]["seconds"], "reused": True}}
+
+
+def test_changed_artifacts_register_new_version(mlflow_model):
+    workspace = SimpleNamespace(models=FakeModels(latest=SimpleNamespace(version="7", tags={register.DIGEST_TAG: "old"})))
+
+    register.register_everywhere(workspace, None, mlflow_model, "taxi")
+
+    assert len(workspace.models.created) == 1
+
+
+def test_model_digest_tracks_file_content(mlflow_model):
+    before = register.model_digest(mlflow_model)
+    (Path(mlflow_model) / "model.pkl").write_bytes(b"retrained")
+
+    assert register.model_digest(mlflow_model) != before
+
+
+def test_registry_access_failure_fails_registration(mlflow_model):
+    workspace = SimpleNamespace(models=FakeModels())
+    ml_clients.set_registry_client("shared", SimpleNamespace(models=FakeModels(fail=HttpResponseError("Identity is not allowed to access registry"))))
+
+    with pytest.raises(HttpResponseError, match="not allowed"):
+        register.register_everywhere(workspace, "shared", mlflow_model, "taxi")
+
+    assert len(workspace.models.created) == 1
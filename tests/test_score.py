@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.score import score
+
+
+def test_score_predictions_matches_sklearn_across_shards_and_chunks(tmp_path):
+    rng = np.random.default_rng(0)
+    actual = rng.choice(list("ABCDEFGHIJ"), size=900)
+    # Predictions skip class J and sometimes emit an unknown label.
+    predicted = np.where(rng.random(900) < 0.6, actual, rng.choice(list("ABCDEFGHIK"), size=900))
+    frame = pd.DataFrame({"distance": np.arange(900), "actual_cost": actual, "predicted_cost": predicted})
+    frame.iloc[:400].to_csv(tmp_path / "predictions-00000.csv", index=False)
+    frame.iloc[400:].to_parquet(tmp_path / "predictions-00001.parquet", index=False)
+
+    report = score.score_predictions(str(tmp_path), chunk_rows=64).report()
+
+    assert report["rows"] == 900
+    assert report["accuracy"] == accuracy_score(actual, predicted)
+    assert np.isclose(report["macro_f1"], f1_score(actual, predicted, average="macro"))
+    assert report["labels"][-1] == "K"
+    labels = report["labels"]
+    per_class_precision = precision_score(actual, predicted, labels=labels, average=None, zero_division=0)
+    per_class_recall = recall_score(actual, predicted, labels=labels, average=None, zero_division=0)
+    for index, label in enumerate(labels):
+        assert np.isclose(report["per_class"][label]["precision"], per_class_precision[index])
+        assert np.isclose(report["per_class"][label]["recall"], per_class_recall[index])
@@ -0,0 +1,87 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.common import step_cache
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_compute_key_changes_with_inputs_script_and_params(tmp_path):
+    script = _write(tmp_path / "step.py", "print('v1')")
+    data = _write(tmp_path / "data.csv", "a,b\n1,2\n")
+
+    base = step_cache.compute_key(script, {"data": data}, {"ratio": 0.3})
+
+    assert base == step_cache.compute_key(script, {"data": data}, {"ratio": 0.3})
+    assert base != step_cache.compute_key(script, {"data": data}, {"ratio": 0.5})
+    _write(data, "a,b\n1,3\n")
+    changed_input = step_cache.compute_key(script, {"data": data}, {"ratio": 0.3})
+    assert changed_input != base
+    _write(script, "print('v2')")
+    changed_script = step_cache.compute_key(script, {"data": data}, {"ratio": 0.3})
+    assert changed_script != changed_input
+
+    module = _write(tmp_path / "helpers.py", "X = 1")
+    with_module = step_cache.compute_key(script, {"data": data}, {"ratio": 0.3}, modules=[module])
+    assert with_module != changed_script
+    _write(module, "X = 2")
+    assert step_cache.compute_key(script, {"data": data}, {"ratio": 0.3}, modules=[module]) != with_module
+
+
+def test_store_then_restore_round_trips_outputs(tmp_path):
+    cache = step_cache.StepCache(tmp_path / "cache", max_bytes=1 << 20)
+    _write(tmp_path / "out" / "merged.csv", "x\n1\n")
+
+    assert not cache.restore("key", {"merged_data": tmp_path / "restored"})
+    cache.store("key", {"merged_data": tmp_path / "out"})
+
+    assert cache.restore("key", {"merged_data": tmp_path / "restored"})
+    assert (tmp_path / "restored" / "merged.csv").read_text(encoding="utf-8") == "x\n1\n"
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    cache = step_cache.StepCache(tmp_path / "cache", max_bytes=250)
+    _write(tmp_path / "out" / "data.bin", "x" * 100)
+
+    cache.store("first", {"data": tmp_path / "out"})
+    time.sleep(0.01)
+    cache.store("second", {"data": tmp_path / "out"})
+    time.sleep(0.01)
+    assert cache.restore("first", {"data": tmp_path / "restored"})
+    cache.store("third", {"data": tmp_path / "out"})
+
+    remaining = sorted(path.name for path in (tmp_path / "cache").iterdir())
+    assert remaining == ["first", "third"]
+
+
+def test_concurrent_restores_never_read_a_partial_entry(tmp_path):
+    cache = step_cache.StepCache(tmp_path / "cache", max_bytes=1 << 20)
+    _write(tmp_path / "out" / "merged.csv", "x\n1\n")
+    cache.store("key", {"merged": tmp_path / "out"})
+    other_job = step_cache.StepCache(tmp_path / "cache", max_bytes=1 << 20)
+    misses = []
+
+    def restore_repeatedly(cache, destination):
+        for _ in range(200):
+            if not cache.restore("key", {"merged": destination}):
+                misses.append(destination)
+
+    threads = [
+        threading.Thread(target=restore_repeatedly, args=(cache, tmp_path / "a")),
+        threading.Thread(target=restore_repeatedly, args=(other_job, tmp_path / "b")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert misses == []
+    assert [path.name for path in (tmp_path / "cache" / "key").iterdir() if path.name.startswith(".")] == []
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.train import train
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeJobService:
+    """Replays one status per poll; the last status repeats."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.polls = 0
+        self.cancelled = []
+
+    def get(self, name):
+        status = self.statuses[min(self.polls, len(self.statuses) - 1)]
+        self.polls += 1
+        return SimpleNamespace(name=name, status=status)
+
+    def begin_cancel(self, name):
+        self.cancelled.append(name)
+
+
+class FakeMlflowClient:
+    """Exposes the best child tag from the given poll on, as AutoML does once a trial finishes."""
+
+    def __init__(self, jobs, tag_from_poll, best_child="best-child", final_best_child=None):
+        self.jobs = jobs
+        self.tag_from_poll = tag_from_poll
+        self.best_child = best_child
+        self.final_best_child = final_best_child or best_child
+
+    def get_run(self, run_id):
+        tags = {}
+        if self.jobs.polls >= self.tag_from_poll:
+            finished = self.jobs.statuses[min(self.jobs.polls, len(self.jobs.statuses)) - 1] == "Completed"
+            tags[train.BEST_CHILD_TAG] = self.final_best_child if finished else self.best_child
+        return SimpleNamespace(data=SimpleNamespace(tags=tags))
+
+
+def _downloader(calls):
+    def download(run_id, dst_path):
+        calls.append((run_id, dst_path))
+        outputs = Path(dst_path) / "outputs"
+        (outputs / "mlflow-model").mkdir(parents=True)
+        (outputs / "mlflow-model" / "MLmodel").write_text(run_id)
+        return str(outputs)
+
+    return download
+
+
+def _watcher(jobs, mlflow_client, download, clock, **kwargs):
+    return train.AutoMLJobWatcher(
+        jobs, mlflow_client, download=download, initial_delay=1.0, max_delay=4.0, clock=clock, sleep=clock.sleep, **kwargs
+    )
+
+
+def test_watcher_prefetches_best_child_before_job_completes(tmp_path):
+    jobs = FakeJobService(["Queued", "Queued", "Running", "Running", "Running", "Running", "Completed"])
+    calls = []
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=4), _downloader(calls), clock)
+
+    timings = asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    # Only the prefetch downloaded anything; it was started while the job was still running.
+    assert [(call[0], Path(call[1]).name) for call in calls] == [("best-child", ".prefetch-best-child")]
+    assert (tmp_path / "outputs" / "mlflow-model" / "MLmodel").read_text() == "best-child"
+    assert [path.name for path in tmp_path.iterdir()] == ["outputs"]
+    assert set(timings) == {"queue", "run", "artifact_download"}
+    # The interval restarts at 1s when the job leaves the queue.
+    assert timings["queue"] == 1.0 + 2.0
+    assert timings["run"] == 1.0 + 2.0 + 4.0 + 4.0
+
+
+def test_watcher_backs_off_while_status_is_unchanged(tmp_path):
+    jobs = FakeJobService(["Running"] * 6 + ["Completed"])
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=99), _downloader([]), clock)
+
+    with pytest.raises(RuntimeError, match="without a automl_best_child_run_id tag"):
+        asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert clock.sleeps == [1.0, 2.0, 4.0, 4.0, 4.0, 4.0]
+
+
+def test_watcher_downloads_final_best_child_when_it_changes(tmp_path):
+    jobs = FakeJobService(["Running", "Running", "Running", "Completed"])
+    calls = []
+    clock = FakeClock()
+    mlflow_client = FakeMlflowClient(jobs, tag_from_poll=1, best_child="early-child", final_best_child="ensemble-child")
+    watcher = _watcher(jobs, mlflow_client, _downloader(calls), clock)
+
+    asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert [call[0] for call in calls] == ["early-child", "ensemble-child"]
+    assert (tmp_path / "outputs" / "mlflow-model" / "MLmodel").read_text() == "ensemble-child"
+    assert [path.name for path in tmp_path.iterdir()] == ["outputs"]
+
+
+def test_watcher_cancels_job_after_deadline(tmp_path):
+    jobs = FakeJobService(["Queued"])
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=99), _downloader([]), clock, deadline_seconds=10)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert jobs.cancelled == ["automl-job"]
+    assert sum(clock.sleeps) == 10
+
+
+def test_watcher_raises_on_failed_job(tmp_path):
+    jobs = FakeJobService(["Queued", "Running", "Failed"])
+    calls = []
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=2), _downloader(calls), clock)
+
+    with pytest.raises(RuntimeError, match="status Failed"):
+        asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+
+def test_watcher_stops_polling_a_paused_job(tmp_path):
+    jobs = FakeJobService(["Running", "Paused"])
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=99), _downloader([]), clock)
+
+    with pytest.raises(RuntimeError, match="status Paused"):
+        asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert clock.sleeps == [1.0]
+
+
+def test_watcher_downloads_again_when_the_prefetch_fails(tmp_path):
+    jobs = FakeJobService(["Running", "Running", "Completed"])
+    calls = []
+    succeed = _downloader(calls)
+
+    def flaky_download(run_id, dst_path):
+        if not calls:
+            calls.append((run_id, dst_path))
+            (Path(dst_path) / "outputs").mkdir(parents=True)
+            raise OSError("connection reset")
+        return succeed(run_id, dst_path)
+
+    watcher = _watcher(jobs, FakeMlflowClient(jobs, tag_from_poll=1), flaky_download, FakeClock())
+
+    asyncio.run(watcher.watch("automl-job", str(tmp_path)))
+
+    assert [(call[0], Path(call[1]).name) for call in calls] == [
+        ("best-child", ".prefetch-best-child"),
+        ("best-child", tmp_path.name),
+    ]
+    assert (tmp_path / "outputs" / "mlflow-model" / "MLmodel").read_text() == "best-child"
+    assert [path.name for path in tmp_path.iterdir()] == ["outputs"]
+
+
+def test_expand_sweep_grid_builds_every_combination():
+    configs = train.expand_sweep_grid({"enable_vote_ensemble": [True, False], "primary_metric": ["accuracy", "AUC_weighted"], "max_automl_trials": 3})
+
+    assert len(configs) == 4
+    assert {"enable_vote_ensemble": False, "primary_metric": "AUC_weighted", "max_automl_trials": 3} in configs
+    with pytest.raises(ValueError, match="Unsupported sweep parameters"):
+        train.expand_sweep_grid({"learning_rate": [0.1]})
+
+
+class FakeSweepService:
+    """Runs every submitted job for ``polls`` polls; jobs listed in ``failing`` end Failed."""
+
+    def __init__(self, polls, failing=()):
+        self.polls = polls
+        self.failing = set(failing)
+        self.seen = {}
+        self.running = 0
+        self.max_running = 0
+
+    def create_or_update(self, job):
+        self.seen[job] = 0
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        return SimpleNamespace(name=job)
+
+    def get(self, name):
+        self.seen[name] += 1
+        if self.seen[name] < self.polls:
+            return SimpleNamespace(name=name, status="Running")
+        self.running -= 1
+        return SimpleNamespace(name=name, status="Failed" if name in self.failing else "Completed")
+
+
+class FakeSweepMlflow:
+    def __init__(self, scores):
+        self.scores = scores
+
+    def get_run(self, run_id):
+        if run_id in self.scores:
+            return SimpleNamespace(data=SimpleNamespace(tags={}, metrics={"accuracy": self.scores[run_id]}))
+        return SimpleNamespace(data=SimpleNamespace(tags={train.BEST_CHILD_TAG: f"{run_id}-child"}, metrics={}))
+
+
+def test_sweep_runs_under_concurrency_limit_and_downloads_global_best(tmp_path):
+    jobs = FakeSweepService(polls=3, failing={"job-d"})
+    scores = {"job-a-child": 0.71, "job-b-child": 0.84, "job-c-child": 0.79}
+    calls = []
+    clock = FakeClock()
+    watcher = _watcher(jobs, FakeSweepMlflow(scores), _downloader(calls), clock)
+    submissions = [({"primary_metric": name}, f"job-{name}") for name in "abcd"]
+
+    best = asyncio.run(train.sweep_and_download(watcher, submissions, "accuracy", 2, str(tmp_path)))
+
+    assert best["job_name"] == "job-b" and best["metric"] == 0.84
+    assert jobs.max_running == 2
+    assert [call[0] for call in calls] == ["job-b-child"]
+    summary = json.loads((tmp_path / train.SWEEP_RESULTS_FILE).read_text())
+    assert summary["best"]["config"] == {"primary_metric": "b"}
+    assert "status Failed" in summary["results"][3]["error"]
+    assert (tmp_path / "outputs" / "mlflow-model" / "MLmodel").read_text() == "job-b-child"
+
+
+
+def test_select_best_result_minimizes_log_loss():
+    results = [
+        {"job_name": "job-a", "metric": 0.41},
+        {"job_name": "job-b", "metric": 0.27},
+        {"job_name": "job-c", "error": "status Failed"},
+    ]
+
+    assert train.select_best_result(results, "log_loss")["job_name"] == "job-b"
+    assert train.select_best_result(results, "accuracy")["job_name"] == "job-a"
+    with pytest.raises(ValueError, match="Unsupported sweep metric"):
+        train.select_best_result(results, "my_metric")
+
+
+def _transformed_split(rows=300, seed=0):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({column: rng.integers(0, 5, rows) for column in train.feature_columns})
+    frame["distance"] = rng.uniform(0.1, 20, rows)
+    frame["cost"] = np.where(frame["distance"] > 10, "J", "B")
+    return frame
+
+
+def test_local_backend_writes_loadable_mlflow_model(tmp_path):
+    import mlflow
+
+    training_data = tmp_path / "train_data"
+    training_data.mkdir()
+    split = _transformed_split()
+    split.to_csv(training_data / "train_data.csv", index=False)
+    model_output = tmp_path / "model_output"
+
+    metrics = train.train_local(str(training_data), str(model_output), str(tmp_path / "mlruns"), max_iter=20)
+
+    assert metrics["training_accuracy"] > 0.95
+    model = mlflow.pyfunc.load_model(str(model_output / "outputs" / "mlflow-model"))
+    # Parquet splits carry the integer codes as nullable integers; the model accepts them like CSV ints.
+    typed = split[train.feature_columns].astype({"vendor": "Int8", "store_forward": "int8"})
+    assert list(model.predict(typed)) == list(model.predict(split[train.feature_columns]))
+    assert set(model.predict(split[train.feature_columns])) <= {"B", "J"}
+
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    runs = mlflow.search_runs(experiment_names=[train.EXPERIMENT_NAME])
+    assert len(runs) == 1 and runs.loc[0, "params.backend"] == "local"
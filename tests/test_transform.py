@@ -0,0 +1,172 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from azure.core.exceptions import ResourceNotFoundError
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.transform import transform
+
+
+def _merged_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "cost": [10.5, 8.5, 0.0, 6.0],
+            "distance": [2.09, ".00", 1.2, 1.27],
+            "dropoff_datetime": ["1/6/2016 12:22", "1/3/2016 18:08", "1/4/2016 09:00", "1/19/2016 21:54"],
+            "dropoff_latitude": [40.73, 40.75, 40.70, 40.81],
+            "dropoff_longitude": [-74.00, -73.98, -73.99, -73.95],
+            "passengers": [1, 3, 1, 2],
+            "pickup_datetime": ["1/6/2016 12:09", "1/3/2016 17:57", "1/4/2016 08:40", "1/19/2016 21:49"],
+            "pickup_latitude": [40.74, 40.76, 40.71, 40.80],
+            "pickup_longitude": [-73.98, -73.96, -73.97, -73.94],
+            "store_forward": ["N", "Y", None, "0"],
+            "vendor": [2, 1, 2, 2],
+        }
+    )
+
+
+def test_engineer_features_filters_and_derives_int8_calendar_parts():
+    features = transform.engineer_features(_merged_frame())
+
+    # Row 1 has a zero distance and row 2 a zero cost; both are dropped.
+    assert features["cost"].tolist() == [10.5, 6.0]
+    assert features["store_forward"].tolist() == [0, 0]
+    assert features["pickup_weekday"].tolist() == [2, 1]
+    assert features["pickup_monthday"].tolist() == [6, 19]
+    assert features["dropoff_hour"].tolist() == [12, 21]
+    assert features["dropoff_minute"].tolist() == [22, 54]
+    calendar_columns = [column for column in features.columns if column.startswith(("pickup_", "dropoff_"))
+                        and not column.endswith(("latitude", "longitude"))]
+    assert len(calendar_columns) == 12
+    assert all(features[column].dtype == np.int8 for column in calendar_columns)
+    assert not any(features[column].dtype == object for column in features.columns)
+
+
+def test_engineer_features_drops_out_of_city_trips():
+    merged = _merged_frame()
+    merged.loc[0, "pickup_longitude"] = 0.0
+
+    features = transform.engineer_features(merged)
+
+    assert features["cost"].tolist() == [6.0]
+
+
+def test_bin_cost_labels_lowest_decile_as_a():
+    final_df = pd.DataFrame({"cost": np.arange(1, 21, dtype="float64")})
+
+    labelled = transform.bin_cost(final_df)
+
+    assert labelled["cost"].iloc[0] == "A"
+    assert labelled["cost"].iloc[-1] == "J"
+    assert set(labelled["cost"]) == set("ABCDEFGHIJ")
+
+
+def test_cost_quantile_sketch_matches_pandas_quantiles_across_chunks():
+    rng = np.random.default_rng(0)
+    costs = np.round(rng.gamma(2.0, 6.0, size=5000), 2)
+    sketch = transform.CostQuantileSketch()
+    for chunk in np.array_split(costs, 7):
+        sketch.update(chunk)
+
+    assert sketch.count == costs.size
+    assert sketch.quantiles(transform.COST_QUANTILES) == list(pd.Series(costs).quantile(transform.COST_QUANTILES))
+
+
+def test_cost_quantile_sketch_coarsens_when_bins_overflow():
+    sketch = transform.CostQuantileSketch(max_bins=50)
+    sketch.update(np.linspace(0, 100, 1000))
+
+    assert sketch.values.size <= 50
+    assert sketch.decimals is not None
+    assert abs(sketch.quantiles([0.5])[0] - 50) < 10
+
+
+def test_assign_test_rows_is_deterministic_and_close_to_ratio():
+    features = pd.DataFrame({"distance": np.arange(4000, dtype="float64"), "cost": ["A", "B"] * 2000})
+
+    first = transform.assign_test_rows(features, 0.3)
+    second = transform.assign_test_rows(features.iloc[::-1].reset_index(drop=True), 0.3)[::-1]
+
+    assert (first == second).all()
+    for label in ("A", "B"):
+        assert abs(first[features["cost"].to_numpy() == label].mean() - 0.3) < 0.05
+
+
+def test_out_of_core_transform_matches_in_memory_labels(tmp_path, monkeypatch):
+    monkeypatch.setattr(transform, "_save_mltable", lambda *args: None)
+    merged = pd.concat([_merged_frame()] * 10, ignore_index=True)
+    merged["cost"] = np.arange(1, len(merged) + 1, dtype="float64")
+    clean_data = tmp_path / "clean"
+    clean_data.mkdir()
+    merged.to_csv(clean_data / "merged_taxi_data.csv", index=False)
+    (tmp_path / "train").mkdir()
+    (tmp_path / "test").mkdir()
+
+    train_location, test_location = transform.transform_out_of_core(
+        str(clean_data), str(tmp_path / "train"), str(tmp_path / "test"), 0.3, chunk_rows=7, output_format="csv"
+    )
+
+    expected = transform.bin_cost(transform.engineer_features(merged))
+    produced = pd.concat([pd.read_csv(train_location), pd.read_csv(test_location)])
+    assert sorted(zip(produced["distance"], produced["pickup_monthday"], produced["cost"])) == sorted(
+        zip(expected["distance"], expected["pickup_monthday"], expected["cost"])
+    )
+
+
+def test_read_partitioned_input_reads_every_shard_in_name_order(tmp_path):
+    merged = _merged_frame()
+    merged.iloc[:2].to_csv(tmp_path / "part-0.csv", index=False)
+    merged.iloc[2:].to_parquet(tmp_path / "part-1.parquet", index=False)
+    (tmp_path / "MLTable").write_text("paths: []", encoding="utf-8")
+
+    combined = transform.read_partitioned_input(str(tmp_path), max_workers=2)
+
+    assert combined["cost"].tolist() == merged["cost"].tolist()
+    assert combined.index.tolist() == [0, 1, 2, 3]
+
+
+class _FakeDataOperations:
+    """Local stand-in for ``MLClient.data`` that versions assets in memory."""
+
+    def __init__(self):
+        self.versions = {}
+
+    def get(self, name, label=None):
+        if not self.versions.get(name):
+            raise ResourceNotFoundError(f"Data asset {name} not found")
+        return self.versions[name][-1]
+
+    def create_or_update(self, data):
+        history = self.versions.setdefault(data.name, [])
+        registered = SimpleNamespace(name=data.name, version=str(len(history) + 1), tags=dict(data.tags or {}))
+        history.append(registered)
+        return registered
+
+
+def test_register_split_skips_identical_content(tmp_path):
+    ml_client = SimpleNamespace(data=_FakeDataOperations())
+    (tmp_path / "test_data.csv").write_text("cost\nA\n", encoding="utf-8")
+    (tmp_path / "MLTable").write_text("paths: [/mnt/run-1/test_data.csv]", encoding="utf-8")
+
+    first = transform.register_split(ml_client, str(tmp_path), "cat-sample-test-data", "test split")
+    (tmp_path / "MLTable").write_text("paths: [/mnt/run-2/test_data.csv]", encoding="utf-8")
+    second = transform.register_split(ml_client, str(tmp_path), "cat-sample-test-data", "test split")
+
+    assert first.version == second.version == "1"
+    assert len(ml_client.data.versions["cat-sample-test-data"]) == 1
+
+
+def test_register_split_creates_new_version_when_content_changes(tmp_path):
+    ml_client = SimpleNamespace(data=_FakeDataOperations())
+    (tmp_path / "test_data.csv").write_text("cost\nA\n", encoding="utf-8")
+    transform.register_split(ml_client, str(tmp_path), "cat-sample-test-data", "test split")
+
+    (tmp_path / "test_data.csv").write_text("cost\nB\n", encoding="utf-8")
+    updated = transform.register_split(ml_client, str(tmp_path), "cat-sample-test-data", "test split")
+
+    assert updated.version == "2"
+    assert updated.tags[transform.FINGERPRINT_TAG] == transform.fingerprint_split(str(tmp_path))